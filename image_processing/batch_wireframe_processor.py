@@ -0,0 +1,672 @@
+#!/usr/bin/env python3
+"""
+Batch Wireframe Portrait Processor
+==================================
+
+Runs the wireframe pipeline over many images with a single
+:class:`WireframePortraitProcessor`, so the FaceLandmarker, PoseLandmarker
+and DexiNed weights are loaded once per run instead of once per image.
+
+Inputs can be given as:
+- a directory (searched recursively for images)
+- a glob pattern (e.g. ``"../download_data/aic_sample/images/*.jpg"``)
+- a manifest file: ``.txt`` with one path per line, or ``.jsonl`` with an
+  ``image_file`` / ``image_path`` / ``path`` field per line (the format
+  written by ``aic_portrait_paintings_downloader.py``)
+
+Outputs mirror the input tree below the output directory. With ``--jobs N``
+the images are spread over N worker processes, each holding its own detectors.
+With ``--pipeline`` one process runs decode, detection, DexiNed, rendering and
+encoding as overlapping stages connected by bounded queues (see
+``staged_pipeline.py``).
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import threading
+import multiprocessing
+import cv2
+import numpy as np
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(__file__))
+from wireframe_portrait_processor import (
+    WireframeConfig, WireframePortraitProcessor,
+    add_wireframe_arguments, config_from_args, variant_configs_from_args,
+    merge_feature_configs, variant_output_paths, load_dexined_torch
+)
+from staged_pipeline import DEFAULT_QUEUE_SIZE, Stage, StagedPipeline
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff")
+MANIFEST_PATH_KEYS = ("image_file", "image_path", "path")
+PIPELINE_STAGES = ("decode", "detect", "edge", "render", "write")
+
+@dataclass
+class BatchJob:
+    """Single input image and the output path it renders to"""
+    input_path: str
+    output_path: str
+
+@dataclass
+class PipelineJob:
+    """A batch job travelling through the staged pipeline"""
+    job: BatchJob
+    index: int
+    output_paths: Dict[Optional[str], str]  # Per variant name (None without variants)
+    started: float = 0.0
+    image: Optional[np.ndarray] = None
+    context: Any = None
+    results: Dict[Optional[str], Dict] = field(default_factory=dict)
+    status: str = ""  # Set once the job is finished (e.g. 'no_face')
+
+@dataclass
+class BatchSummary:
+    """Throughput statistics for one batch run"""
+    total: int = 0
+    succeeded: int = 0
+    no_face: int = 0
+    prefiltered: int = 0
+    failed: int = 0
+    skipped: int = 0
+    setup_seconds: float = 0.0
+    processing_seconds: float = 0.0
+    image_seconds: List[float] = field(default_factory=list)
+    stage_report: str = ""
+
+    def record(self, status: str, seconds: float):
+        """Record the outcome of one job"""
+        if status == 'ok':
+            self.succeeded += 1
+        elif status == 'no_face':
+            self.no_face += 1
+        elif status == 'prefiltered':
+            self.prefiltered += 1
+        elif status == 'skipped':
+            self.skipped += 1
+            return
+        else:
+            self.failed += 1
+        self.image_seconds.append(seconds)
+
+    def print_report(self):
+        """Print a per-run throughput summary"""
+        processed = len(self.image_seconds)
+        images_per_second = processed / self.processing_seconds if self.processing_seconds > 0 else 0.0
+        mean_latency = sum(self.image_seconds) / processed if processed else 0.0
+
+        print("\n" + "=" * 50)
+        print("Batch summary")
+        print("=" * 50)
+        print(f"  Images:             {self.total}")
+        print(f"  Succeeded:          {self.succeeded}")
+        print(f"  No face/unreadable: {self.no_face}")
+        print(f"  Prefiltered:        {self.prefiltered}")
+        print(f"  Failed:             {self.failed}")
+        print(f"  Skipped (exists):   {self.skipped}")
+        print(f"  Model setup:        {self.setup_seconds:.2f}s")
+        print(f"  Processing time:    {self.processing_seconds:.2f}s")
+        print(f"  Mean per image:     {mean_latency * 1000:.1f}ms")
+        print(f"  Throughput:         {images_per_second:.2f} images/s")
+        if self.stage_report:
+            print("\nPipeline stages")
+            print(self.stage_report)
+
+def _read_manifest(manifest_path: str) -> List[str]:
+    """Read image paths from a .txt or .jsonl manifest"""
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    entries = []
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            if manifest_path.lower().endswith('.jsonl'):
+                record = json.loads(line)
+                path = next((record[key] for key in MANIFEST_PATH_KEYS if record.get(key)), None)
+                if path is None:
+                    print(f"Warning: Manifest entry without image path skipped: {line[:80]}")
+                    continue
+            else:
+                path = line
+            entries.append(path)
+
+    # Relative entries are resolved against the manifest directory first and
+    # then its parent, which matches the downloader's metadata.jsonl layout.
+    resolved = []
+    for path in entries:
+        if os.path.isabs(path):
+            resolved.append(path)
+            continue
+        for base in (manifest_dir, os.path.dirname(manifest_dir), os.getcwd()):
+            candidate = os.path.join(base, path)
+            if os.path.exists(candidate):
+                resolved.append(os.path.abspath(candidate))
+                break
+        else:
+            print(f"Warning: Manifest entry not found: {path}")
+
+    return resolved
+
+def collect_input_images(input_spec: str) -> List[str]:
+    """
+    Expand a directory, glob pattern or manifest file into image paths
+
+    Args:
+        input_spec: Directory, glob pattern, or .txt/.jsonl manifest path
+
+    Returns:
+        Sorted list of absolute image paths
+    """
+    if os.path.isdir(input_spec):
+        image_paths = []
+        for root, _, files in os.walk(input_spec):
+            for name in files:
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    image_paths.append(os.path.abspath(os.path.join(root, name)))
+    elif os.path.isfile(input_spec) and input_spec.lower().endswith(('.txt', '.jsonl')):
+        image_paths = _read_manifest(input_spec)
+    else:
+        image_paths = [
+            os.path.abspath(path) for path in glob.glob(input_spec, recursive=True)
+            if path.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+
+    return sorted(image_paths)
+
+def build_batch_jobs(image_paths: List[str],
+                     output_dir: str,
+                     input_root: Optional[str] = None,
+                     suffix: str = "_wireframe",
+                     extension: str = ".png") -> List[BatchJob]:
+    """
+    Map input images to output paths that mirror the input tree
+
+    Args:
+        image_paths: Absolute input image paths
+        output_dir: Root of the output tree
+        input_root: Root the relative layout is taken from (defaults to the
+            common directory of all inputs)
+        suffix: Suffix appended to each output file name
+        extension: Output file extension
+
+    Returns:
+        List of batch jobs
+    """
+    if not image_paths:
+        return []
+
+    if input_root is None:
+        input_root = os.path.commonpath([os.path.dirname(path) for path in image_paths])
+    input_root = os.path.abspath(input_root)
+
+    jobs = []
+    for image_path in image_paths:
+        relative = os.path.relpath(image_path, input_root)
+        if relative.startswith('..'):
+            # Input outside the root (e.g. absolute manifest entries) - keep flat
+            relative = os.path.basename(image_path)
+        base = os.path.splitext(relative)[0]
+        jobs.append(BatchJob(image_path, os.path.join(output_dir, f"{base}{suffix}{extension}")))
+
+    return jobs
+
+def build_processor(config: WireframeConfig) -> WireframePortraitProcessor:
+    """Build a batch processor with its models loaded
+
+    Batch runs check the face-presence prefilter themselves before any image
+    is loaded, so the processor does not check it again.
+    """
+    processor = WireframePortraitProcessor(config)
+    processor.prefilter_on_load = False
+    processor.load_models()
+    return processor
+
+def process_job(processor: WireframePortraitProcessor,
+                job: BatchJob,
+                variants: Optional[Dict[str, WireframeConfig]] = None) -> str:
+    """Process one job and return its status ('ok', 'no_face' or 'failed')
+
+    With ``variants`` every configuration is rendered from one detection pass
+    and written next to the job's output path with a ``_<variant>`` suffix.
+    """
+    try:
+        if variants:
+            results = processor.process_variants(
+                job.input_path, variants, variant_output_paths(job.output_path, list(variants))
+            )
+        else:
+            results = processor.process_image(job.input_path, job.output_path)
+    except Exception as e:
+        print(f"Error processing {job.input_path}: {e}")
+        return 'failed'
+
+    if not results:
+        return 'no_face'
+    return 'ok'
+
+def process_job_batch(processor: WireframePortraitProcessor,
+                      jobs: List[BatchJob],
+                      variants: Optional[Dict[str, WireframeConfig]] = None) -> List[str]:
+    """Process several jobs with batched DexiNed inference and return their statuses
+
+    Images the face-presence prefilter rejects get the status 'prefiltered'
+    and never reach detection. If the batch as a whole fails, its jobs are
+    retried one at a time so a single bad image only fails itself.
+    """
+    passed = [processor.passes_prefilter(job.input_path) for job in jobs]
+    kept = [job for job, keep in zip(jobs, passed) if keep]
+    kept_statuses = iter(_process_kept_jobs(processor, kept, variants) if kept else [])
+    return [next(kept_statuses) if keep else 'prefiltered' for keep in passed]
+
+def _process_kept_jobs(processor: WireframePortraitProcessor,
+                       jobs: List[BatchJob],
+                       variants: Optional[Dict[str, WireframeConfig]] = None) -> List[str]:
+    """Process jobs that passed the prefilter (see :func:`process_job_batch`)"""
+    if len(jobs) == 1:
+        return [process_job(processor, jobs[0], variants)]
+
+    try:
+        all_results = processor.process_batch(
+            [job.input_path for job in jobs], [job.output_path for job in jobs], variants
+        )
+    except Exception as e:
+        print(f"Error processing batch, retrying images one by one: {e}")
+        return [process_job(processor, job, variants) for job in jobs]
+
+    return ['ok' if results else 'no_face' for results in all_results]
+
+def parse_stage_workers(spec: str) -> Dict[str, int]:
+    """
+    Parse per-stage worker counts such as ``decode=2,render=3``
+
+    Args:
+        spec: Comma-separated ``stage=count`` pairs (stages not listed keep one worker)
+
+    Returns:
+        Worker count per stage name
+    """
+    workers = {}
+    for part in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, count = part.partition('=')
+        name = name.strip()
+        if name not in PIPELINE_STAGES:
+            raise argparse.ArgumentTypeError(
+                f"Unknown pipeline stage '{name}' (choose from {', '.join(PIPELINE_STAGES)})"
+            )
+        try:
+            workers[name] = int(count)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid worker count in '{part}'")
+        if workers[name] < 1:
+            raise argparse.ArgumentTypeError(f"Stage '{name}' needs at least one worker")
+    return workers
+
+def dexined_batch_size(config: WireframeConfig) -> int:
+    """Jobs processed together: DexiNed's batch size when it runs, otherwise 1"""
+    if config.enable_dexined_outline and config.dexined_model_path:
+        return max(1, config.dexined_batch_size)
+    return 1
+
+def chunk_jobs(jobs: List[BatchJob], size: int) -> List[List[BatchJob]]:
+    """Split jobs into consecutive chunks of at most ``size``"""
+    return [jobs[start:start + size] for start in range(0, len(jobs), size)]
+
+# Per-process state for pool workers. Each worker builds its own processor
+# (FaceLandmarker, PoseLandmarker and DexiNed) once in _init_worker and keeps
+# it for every job it pulls from the pool queue.
+_worker_processor = None
+_worker_variants = None
+_worker_setup_seconds = 0.0
+
+def _init_worker(config: WireframeConfig, variants: Optional[Dict[str, WireframeConfig]]):
+    """Pool initializer: build one processor per worker process"""
+    global _worker_processor, _worker_variants, _worker_setup_seconds
+
+    # One inference thread per process; parallelism comes from the pool.
+    cv2.setNumThreads(1)
+    if config.enable_dexined_outline and config.dexined_backend == "torch" and load_dexined_torch():
+        import torch
+        torch.set_num_threads(1)
+    if not config.dexined_num_threads:
+        config.dexined_num_threads = 1
+
+    setup_start = time.perf_counter()
+    _worker_processor = build_processor(config)
+    _worker_variants = variants
+    _worker_setup_seconds = time.perf_counter() - setup_start
+
+def _run_worker_jobs(jobs: List[BatchJob]) -> Tuple[List[BatchJob], List[str], float, float]:
+    """Process one chunk of jobs in a pool worker
+
+    Returns the jobs, their statuses, the per-image processing time (the
+    chunk's time shared evenly) and the worker's model setup time (reported
+    with the worker's first chunk only).
+    """
+    global _worker_setup_seconds
+
+    setup_seconds = _worker_setup_seconds
+    _worker_setup_seconds = 0.0
+
+    chunk_start = time.perf_counter()
+    statuses = process_job_batch(_worker_processor, jobs, _worker_variants)
+    return jobs, statuses, (time.perf_counter() - chunk_start) / len(jobs), setup_seconds
+
+def run_batch(config: WireframeConfig,
+              jobs: List[BatchJob],
+              skip_existing: bool = False,
+              num_workers: int = 1,
+              ordered: bool = True,
+              variants: Optional[Dict[str, WireframeConfig]] = None,
+              pipeline: bool = False,
+              stage_workers: Optional[Dict[str, int]] = None,
+              queue_size: int = DEFAULT_QUEUE_SIZE) -> BatchSummary:
+    """
+    Process all jobs, reusing one processor per worker
+
+    Args:
+        config: Wireframe configuration shared by every image
+        jobs: Jobs to process
+        skip_existing: Skip jobs whose output already exists
+        num_workers: Number of worker processes (1 runs in-process)
+        ordered: Report results in input order; otherwise as they complete
+        variants: Optional preset configurations rendered for every image
+            from one detection pass (``config`` is then ignored)
+        pipeline: Run decode, detection, DexiNed, rendering and encoding as
+            overlapping stages in this process (``num_workers`` is ignored)
+        stage_workers: Worker threads per pipeline stage (default: one each)
+        queue_size: Capacity of each queue between pipeline stages
+
+    Returns:
+        Batch summary with throughput statistics
+    """
+    summary = BatchSummary(total=len(jobs))
+
+    # A global SVG path would be overwritten by every image; derive the SVG
+    # path from each output path instead. The caller's configs are left as
+    # they are: the batch works on copies.
+    if config.svg_output_path:
+        print("Warning: --svg-output is ignored in batch mode, SVGs are written next to each output")
+        config = replace(config, svg_output_path="")
+
+    if variants:
+        variants = {name: replace(variant_config, svg_output_path="")
+                    for name, variant_config in variants.items()}
+        config = merge_feature_configs(list(variants.values()))
+
+    pending = []
+    for job in jobs:
+        outputs = list(variant_output_paths(job.output_path, list(variants)).values()) if variants else [job.output_path]
+        if skip_existing and all(os.path.exists(path) for path in outputs):
+            summary.record('skipped', 0.0)
+        else:
+            pending.append(job)
+
+    if pipeline and pending:
+        return _run_batch_pipeline(config, pending, summary, ordered, variants,
+                                   stage_workers or {}, queue_size)
+
+    if num_workers > 1 and len(pending) > 1:
+        return _run_batch_pool(config, pending, summary, num_workers, ordered, variants)
+
+    setup_start = time.perf_counter()
+    processor = build_processor(config)
+    summary.setup_seconds = time.perf_counter() - setup_start
+
+    # Jobs are processed in chunks so DexiNed can run over a whole chunk at once
+    batch_start = time.perf_counter()
+    index = 0
+    for chunk in chunk_jobs(pending, dexined_batch_size(config)):
+        chunk_start = time.perf_counter()
+        statuses = process_job_batch(processor, chunk, variants)
+        seconds = (time.perf_counter() - chunk_start) / len(chunk)
+        # Reported once the chunk is done, after the processing logs of its jobs
+        for job, status in zip(chunk, statuses):
+            index += 1
+            summary.record(status, seconds)
+            print(f"[{index}/{len(pending)}] {status:8s} {seconds:6.2f}s  {job.input_path}")
+
+    summary.processing_seconds = time.perf_counter() - batch_start
+    return summary
+
+def _run_batch_pool(config: WireframeConfig,
+                    jobs: List[BatchJob],
+                    summary: BatchSummary,
+                    num_workers: int,
+                    ordered: bool,
+                    variants: Optional[Dict[str, WireframeConfig]]) -> BatchSummary:
+    """Process jobs on a process pool with per-worker detector initialization"""
+    # Workers pull whole chunks so each can batch its DexiNed inference
+    chunks = chunk_jobs(jobs, dexined_batch_size(config))
+    num_workers = min(num_workers, len(chunks))
+    print(f"Starting {num_workers} worker processes ({'ordered' if ordered else 'unordered'} completion)")
+
+    # MediaPipe and PyTorch are not fork-safe once initialized, so workers are
+    # always spawned fresh and build their own detectors.
+    context = multiprocessing.get_context('spawn')
+
+    batch_start = time.perf_counter()
+    with context.Pool(num_workers, initializer=_init_worker, initargs=(config, variants)) as pool:
+        run = pool.imap if ordered else pool.imap_unordered
+        index = 0
+        for chunk, statuses, seconds, setup_seconds in run(_run_worker_jobs, chunks):
+            summary.setup_seconds = max(summary.setup_seconds, setup_seconds)
+            for job, status in zip(chunk, statuses):
+                index += 1
+                summary.record(status, seconds)
+                print(f"[{index}/{len(jobs)}] {status:8s} {seconds:6.2f}s  {job.input_path}")
+
+    summary.processing_seconds = time.perf_counter() - batch_start
+    return summary
+
+def _run_batch_pipeline(config: WireframeConfig,
+                        jobs: List[BatchJob],
+                        summary: BatchSummary,
+                        ordered: bool,
+                        variants: Optional[Dict[str, WireframeConfig]],
+                        stage_workers: Dict[str, int],
+                        queue_size: int) -> BatchSummary:
+    """Process jobs on a staged decode/detect/edge/render/write pipeline
+
+    The face-presence prefilter, if enabled, runs in the decode stage.
+    Stages share one processor, except that every detect worker after the
+    first builds its own FaceLandmarker and PoseLandmarker (MediaPipe
+    detectors are not thread-safe). The edge stage
+    batches DexiNed over whatever images are queued, up to the DexiNed
+    batch size. Reported per-image times are end-to-end latencies, which
+    include time spent waiting in queues.
+    """
+    if config.profile or config.profile_memory or config.trace_path:
+        print("Warning: --profile/--profile-memory/--trace are per image and ignored in "
+              "pipeline mode, per-stage times are reported instead")
+        config = replace(config, profile=False, profile_memory=False, trace_path="")
+
+    setup_start = time.perf_counter()
+    processor = build_processor(config)
+    summary.setup_seconds = time.perf_counter() - setup_start
+    renders = variants or {None: config}
+
+    detect_workers = [0]
+    detect_lock = threading.Lock()
+
+    def make_detect():
+        with detect_lock:
+            detect_workers[0] += 1
+            first = detect_workers[0] == 1
+        # DexiNed runs in the edge stage; extra detect workers skip loading it
+        detector = processor if first else build_processor(
+            replace(config, enable_dexined_outline=False)
+        )
+
+        def detect(item: PipelineJob) -> PipelineJob:
+            if not item.status:
+                item.context = detector.build_inference_context(
+                    item.image, item.job.input_path, detect_edges=False
+                )
+                item.image = None  # Kept by the context
+                if not item.context.landmarks:
+                    processor._log("No face detected in image")
+                    item.status = 'no_face'
+                    item.context = None
+            return item
+        return detect
+
+    def decode(item: PipelineJob) -> PipelineJob:
+        if not processor.passes_prefilter(item.job.input_path):
+            item.status = 'prefiltered'
+            return item
+        item.image = processor._load_image(item.job.input_path)
+        if item.image is None:
+            item.status = 'no_face'
+        return item
+
+    def edge(items: List[PipelineJob]) -> List[PipelineJob]:
+        processor.add_edge_maps([item.context for item in items if not item.status])
+        return items
+
+    def render(item: PipelineJob) -> PipelineJob:
+        if not item.status:
+            for name, render_config in renders.items():
+                item.results[name] = processor.render_context(
+                    item.context, item.output_paths[name], render_config, save=False
+                )
+            item.context = None
+        return item
+
+    def write(item: PipelineJob) -> PipelineJob:
+        if not item.status:
+            for name, results in item.results.items():
+                processor.save_outputs(results, item.output_paths[name], renders[name])
+            item.status = 'ok'
+        item.results = {}
+        return item
+
+    handlers = {'decode': lambda: decode, 'detect': make_detect, 'edge': lambda: edge,
+                'render': lambda: render, 'write': lambda: write}
+    stages = [Stage(name, handlers[name], stage_workers.get(name, 1))
+              for name in PIPELINE_STAGES]
+    stages[PIPELINE_STAGES.index('edge')] = Stage(
+        'edge', handlers['edge'], stage_workers.get('edge', 1),
+        batched=True, batch_size=dexined_batch_size(config)
+    )
+    staged = StagedPipeline(stages, queue_size)
+    print("Starting staged pipeline: " + " -> ".join(
+        f"{stage.name} x{stage.workers}" for stage in stages
+    ) + f" (queues of {staged.queue_size})")
+
+    def feed():
+        for index, job in enumerate(jobs):
+            paths = variant_output_paths(job.output_path, list(variants)) if variants else {None: job.output_path}
+            # Latency is measured from when the job enters the first queue
+            yield PipelineJob(job, index, paths, started=time.perf_counter())
+
+    batch_start = time.perf_counter()
+    finished = {}
+    next_index = 0
+    for item, error in staged.run(feed()):
+        if error is not None:
+            print(f"Error processing {item.job.input_path}: {error}")
+            item.status = 'failed'
+        finished[item.index] = (item, time.perf_counter() - item.started)
+        # In ordered mode, results are held back until every earlier job is done
+        for index in (range(next_index, len(jobs)) if ordered else [item.index]):
+            if index not in finished:
+                break
+            done, seconds = finished.pop(index)
+            summary.record(done.status, seconds)
+            print(f"[{len(summary.image_seconds)}/{len(jobs)}] {done.status:8s} {seconds:6.2f}s  {done.job.input_path}")
+            next_index = index + 1
+
+    summary.processing_seconds = time.perf_counter() - batch_start
+    summary.stage_report = staged.format_stats(summary.processing_seconds)
+    return summary
+
+def main():
+    """Batch command line interface"""
+    parser = argparse.ArgumentParser(
+        description='Batch Wireframe Portrait Processor',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Whole directory, mirrored into out/wireframes/
+  python batch_wireframe_processor.py ../download_data/aic_sample/images -o out/wireframes --preset beginner
+
+  # Glob pattern
+  python batch_wireframe_processor.py "../download_data/aic_sample/images/8*.jpg" -o out/wireframes --mesh
+
+  # Manifest from the AIC downloader
+  python batch_wireframe_processor.py ../download_data/aic_sample/metadata.jsonl -o out/wireframes --preset intermediate
+
+  # All five presets per painting from one detection pass
+  python batch_wireframe_processor.py ../download_data/aic_sample/images -o out/wireframes --presets all
+
+  # 16 worker processes, results reported as they finish
+  python batch_wireframe_processor.py ../download_data/aic_sample/images -o out/wireframes --preset beginner --jobs 16 --unordered
+
+  # Overlapping decode/detect/edge/render/write stages, two decoders and three encoders
+  python batch_wireframe_processor.py ../download_data/aic_sample/images -o out/wireframes --preset beginner --pipeline --stage-workers decode=2,write=3
+        """
+    )
+
+    # Input/Output
+    parser.add_argument('input', help='Input directory, glob pattern, or .txt/.jsonl manifest')
+    parser.add_argument('-o', '--output-dir', required=True, help='Output directory (mirrors the input tree)')
+    parser.add_argument('--input-root', help='Root directory used to mirror the input tree')
+    parser.add_argument('--suffix', default='_wireframe', help='Suffix added to output file names')
+    parser.add_argument('--skip-existing', action='store_true', help='Skip images whose output already exists')
+    parser.add_argument('--limit', type=int, help='Process at most this many images')
+
+    # Parallelism
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                       help='Number of worker processes, each with its own detectors (default: 1)')
+    parser.add_argument('--unordered', action='store_true',
+                       help='Report results as they complete instead of in input order')
+    parser.add_argument('--pipeline', action='store_true',
+                       help='Overlap decode, detection, DexiNed, rendering and encoding in staged threads')
+    parser.add_argument('--stage-workers', type=parse_stage_workers, default={},
+                       help=f'Worker threads per pipeline stage, e.g. decode=2,write=3 '
+                            f'(stages: {", ".join(PIPELINE_STAGES)}; default: 1 each)')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                       help=f'Images buffered between pipeline stages (default: {DEFAULT_QUEUE_SIZE})')
+
+    add_wireframe_arguments(parser)
+
+    args = parser.parse_args()
+    if args.pipeline and args.jobs > 1:
+        parser.error("--pipeline runs in one process; use --stage-workers instead of --jobs")
+    config = config_from_args(args)
+    try:
+        variants = variant_configs_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    image_paths = collect_input_images(args.input)
+    if args.limit:
+        image_paths = image_paths[:args.limit]
+    if not image_paths:
+        print(f"No images found for input: {args.input}")
+        sys.exit(1)
+    print(f"Found {len(image_paths)} images")
+
+    input_root = args.input_root or (args.input if os.path.isdir(args.input) else None)
+    extension = '.svg' if config.output_format == 'svg' else '.png'
+    jobs = build_batch_jobs(image_paths, args.output_dir, input_root, args.suffix, extension)
+
+    summary = run_batch(config, jobs,
+                        skip_existing=args.skip_existing,
+                        num_workers=max(1, args.jobs),
+                        ordered=not args.unordered,
+                        variants=variants,
+                        pipeline=args.pipeline,
+                        stage_workers=args.stage_workers,
+                        queue_size=args.queue_size)
+    summary.print_report()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Detection Proxy for Wireframe Portrait Processing
+Bounded-size copy of the input image that every landmark detector runs on, so
+high-resolution scans and upscaled frames are not wrapped in full-size
+``mp.Image`` objects only for MediaPipe to shrink them again internally.
+"""
+
+from typing import Any, Tuple
+
+import cv2
+import numpy as np
+
+DEFAULT_MAX_SIDE = 1024
+
+
+def proxy_size(image_shape: Tuple[int, ...], max_side: int = DEFAULT_MAX_SIDE) -> Tuple[int, int]:
+    """
+    Proxy (width, height) for an image of the given shape
+
+    Args:
+        image_shape: Shape of the full-resolution image
+        max_side: Longest proxy side in pixels (0 = always use the full image)
+
+    Returns:
+        Proxy size; the image's own size if it is already small enough
+    """
+    height, width = image_shape[:2]
+    longest = max(height, width)
+    if not max_side or longest <= max_side:
+        return width, height
+    ratio = max_side / longest
+    return max(1, int(round(width * ratio))), max(1, int(round(height * ratio)))
+
+
+class DetectionProxy:
+    """Downscaled detector input of one image.
+
+    The proxy keeps the source aspect ratio and covers the whole frame, so
+    the normalized landmarks MediaPipe returns for it are already normalized
+    to the full-resolution image and map back without any correction. Face
+    and pose detection of one image share the same proxy and ``mp.Image``.
+
+    A proxy is built from the pixels the image has at construction time;
+    build a new one for every image (or every refill of a reused buffer).
+    """
+
+    def __init__(self, image: np.ndarray, max_side: int = DEFAULT_MAX_SIDE):
+        """
+        Build the proxy.
+
+        Args:
+            image: Full-resolution RGB image
+            max_side: Longest proxy side in pixels (0 = always use the full image)
+        """
+        self.max_side = max_side
+        width, height = proxy_size(image.shape, max_side)
+        if (width, height) == (image.shape[1], image.shape[0]):
+            proxy = image
+        else:
+            proxy = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+        self.image = np.ascontiguousarray(proxy)
+        self._mp_image: Any = None
+
+    @property
+    def mp_image(self) -> Any:
+        """``mp.Image`` wrapping the proxy (built on first use)"""
+        if self._mp_image is None:
+            import mediapipe as mp
+            self._mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=self.image)
+        return self._mp_image
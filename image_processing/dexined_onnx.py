@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+DexiNed ONNX Runtime Backend
+Exports the DexiNed PyTorch checkpoint to ONNX once and runs it with ONNX
+Runtime, so CPU-only hosts can run edge detection without importing PyTorch.
+
+The exported graph outputs only DexiNed's final (fused) edge map and has
+dynamic batch, height and width axes. Sessions are created with full graph
+optimizations and cached per process.
+
+Usage:
+  # Export next to the checkpoint and compare against PyTorch on an image
+  python dexined_onnx.py --checkpoint ../DexiNed/checkpoints/BIPED2CLASSIC/10_model.pth --verify input.jpg
+"""
+
+import os
+import sys
+import argparse
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEXINED_REPO = os.path.join(os.path.dirname(__file__), '..', 'DexiNed')
+INPUT_NAME = "image"
+OUTPUT_NAME = "edges"
+DEFAULT_OPSET = 17
+
+# Sessions shared by every generator in the process, keyed by model file
+# identity and thread count
+_SESSIONS: Dict[Tuple[str, int, int, int], object] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def default_onnx_path(checkpoint_path: str) -> str:
+    """ONNX file the checkpoint is exported to: ``10_model.pth`` → ``10_model.onnx``"""
+    return os.path.splitext(checkpoint_path)[0] + '.onnx'
+
+
+def _load_torch_model(checkpoint_path: str):
+    """Load the DexiNed checkpoint on the CPU in eval mode"""
+    import torch
+    if DEXINED_REPO not in sys.path:
+        sys.path.append(DEXINED_REPO)
+    from model import DexiNed
+
+    model = DexiNed()
+    model.load_state_dict(torch.load(checkpoint_path, map_location='cpu'))
+    model.eval()
+    return model
+
+
+def export_dexined_onnx(checkpoint_path: str, onnx_path: str = "",
+                        opset: int = DEFAULT_OPSET) -> str:
+    """
+    Export a DexiNed checkpoint to ONNX (requires PyTorch and the DexiNed repo)
+
+    Args:
+        checkpoint_path: Path to the PyTorch ``.pth`` weights
+        onnx_path: Output path (defaults to :func:`default_onnx_path`)
+        opset: ONNX opset version
+
+    Returns:
+        Path of the exported model
+    """
+    import torch
+
+    onnx_path = onnx_path or default_onnx_path(checkpoint_path)
+    model = _load_torch_model(checkpoint_path)
+
+    class FinalEdgeMap(torch.nn.Module):
+        """Keep only the fused prediction, the one the pipeline uses"""
+
+        def __init__(self, dexined):
+            super().__init__()
+            self.dexined = dexined
+
+        def forward(self, image):
+            return self.dexined(image)[-1]
+
+    output_dir = os.path.dirname(onnx_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # Write to a temporary file first so an interrupted export never leaves a
+    # truncated model behind for the next run to pick up
+    temp_path = f"{onnx_path}.{os.getpid()}.tmp"
+    dummy = torch.zeros(1, 3, 352, 352)
+    with torch.inference_mode():
+        torch.onnx.export(
+            FinalEdgeMap(model), dummy, temp_path,
+            input_names=[INPUT_NAME], output_names=[OUTPUT_NAME],
+            dynamic_axes={
+                INPUT_NAME: {0: 'batch', 2: 'height', 3: 'width'},
+                OUTPUT_NAME: {0: 'batch', 2: 'height', 3: 'width'},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    os.replace(temp_path, onnx_path)
+    print(f"DexiNed exported to ONNX: {onnx_path}")
+    return onnx_path
+
+
+def ensure_dexined_onnx(checkpoint_path: str, onnx_path: str = "") -> Optional[str]:
+    """
+    Return an up-to-date ONNX model for a checkpoint, exporting it if needed
+
+    An existing export is reused unless the checkpoint is newer. Without
+    PyTorch an existing export is used as is.
+
+    Args:
+        checkpoint_path: Path to the PyTorch ``.pth`` weights
+        onnx_path: ONNX path (defaults to :func:`default_onnx_path`)
+
+    Returns:
+        Path to the ONNX model, or None if there is none and it can't be exported
+    """
+    onnx_path = onnx_path or default_onnx_path(checkpoint_path)
+    checkpoint_exists = bool(checkpoint_path) and os.path.exists(checkpoint_path)
+
+    if os.path.exists(onnx_path):
+        if not checkpoint_exists or os.path.getmtime(onnx_path) >= os.path.getmtime(checkpoint_path):
+            return onnx_path
+        print(f"DexiNed checkpoint is newer than {onnx_path}, re-exporting")
+
+    if not checkpoint_exists:
+        print(f"Warning: DexiNed ONNX model not found at {onnx_path}")
+        return None
+
+    try:
+        return export_dexined_onnx(checkpoint_path, onnx_path)
+    except ImportError as e:
+        print(f"Warning: Cannot export DexiNed to ONNX without PyTorch/DexiNed ({e})")
+    except Exception as e:
+        print(f"Error exporting DexiNed to ONNX: {e}")
+    return onnx_path if os.path.exists(onnx_path) else None
+
+
+def get_session(onnx_path: str, num_threads: int = 0):
+    """
+    Create (or reuse) an ONNX Runtime session with full graph optimizations
+
+    Args:
+        onnx_path: Path to the exported model
+        num_threads: Intra-op threads (0 lets ONNX Runtime use every core)
+
+    Returns:
+        ``onnxruntime.InferenceSession``
+    """
+    import onnxruntime as ort
+
+    stat = os.stat(onnx_path)
+    key = (os.path.abspath(onnx_path), stat.st_size, int(stat.st_mtime), num_threads)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            sess_opts = ort.SessionOptions()
+            sess_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            sess_opts.intra_op_num_threads = num_threads
+            sess_opts.inter_op_num_threads = 1
+
+            # Same provider priority as run_cutout.py: CUDA -> ROCm -> CPU
+            available_providers = ort.get_available_providers()
+            providers = [provider for provider in ("CUDAExecutionProvider", "ROCMExecutionProvider")
+                         if provider in available_providers][:1]
+            providers.append("CPUExecutionProvider")
+
+            session = ort.InferenceSession(onnx_path, sess_opts, providers=providers)
+            _SESSIONS[key] = session
+    return session
+
+
+class DexiNedOnnxRunner:
+    """Runs the exported DexiNed graph on preprocessed (N, 3, H, W) batches"""
+
+    def __init__(self, onnx_path: str, num_threads: int = 0):
+        """
+        Initialize runner.
+
+        Args:
+            onnx_path: Path to the exported model
+            num_threads: Intra-op threads (0 lets ONNX Runtime use every core)
+        """
+        self.onnx_path = onnx_path
+        self.session = get_session(onnx_path, num_threads)
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run DexiNed on a preprocessed batch
+
+        Args:
+            batch: float32 (N, 3, H, W) mean-subtracted BGR images
+
+        Returns:
+            float32 (N, H, W) raw edge maps
+        """
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        edges = self.session.run([OUTPUT_NAME], {INPUT_NAME: batch})[0]
+        return edges[:, 0]
+
+
+def compare_with_torch(checkpoint_path: str, onnx_path: str,
+                       batch: np.ndarray) -> float:
+    """
+    Largest absolute difference between PyTorch and ONNX Runtime edge maps
+
+    Args:
+        checkpoint_path: Path to the PyTorch ``.pth`` weights
+        onnx_path: Path to the exported model
+        batch: float32 (N, 3, H, W) preprocessed images
+
+    Returns:
+        Maximum absolute difference over the batch
+    """
+    import torch
+
+    model = _load_torch_model(checkpoint_path)
+    with torch.inference_mode():
+        torch_edges = model(torch.from_numpy(batch))[-1].numpy()[:, 0]
+    onnx_edges = DexiNedOnnxRunner(onnx_path).run(batch)
+    return float(np.abs(torch_edges - onnx_edges).max())
+
+
+def main():
+    """Export (and optionally verify) the DexiNed ONNX model"""
+    parser = argparse.ArgumentParser(description='Export DexiNed to ONNX for the onnx backend')
+    parser.add_argument('--checkpoint', default='../DexiNed/checkpoints/BIPED2CLASSIC/10_model.pth',
+                       help='Path to DexiNed PyTorch checkpoint')
+    parser.add_argument('-o', '--output', default='', help='ONNX output path (default: next to checkpoint)')
+    parser.add_argument('--opset', type=int, default=DEFAULT_OPSET, help='ONNX opset version')
+    parser.add_argument('--verify', nargs='*', default=None, metavar='IMAGE',
+                       help='Compare ONNX and PyTorch outputs on these images (random input if none)')
+    parser.add_argument('--tolerance', type=float, default=1e-3,
+                       help='Maximum allowed absolute difference for --verify')
+    args = parser.parse_args()
+
+    onnx_path = export_dexined_onnx(args.checkpoint, args.output, args.opset)
+
+    if args.verify is not None:
+        import cv2
+        from wireframe_portrait_processor import DexiNedGenerator
+
+        if args.verify:
+            images: List[np.ndarray] = [cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)
+                                        for path in args.verify]
+        else:
+            images = [np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)]
+        generator = DexiNedGenerator()
+        batch = np.stack([generator._preprocess_array(image) for image in images])
+
+        max_diff = compare_with_torch(args.checkpoint, onnx_path, batch)
+        print(f"Max |torch - onnx| over {len(images)} image(s): {max_diff:.2e}")
+        if max_diff > args.tolerance:
+            print(f"❌ Difference exceeds tolerance {args.tolerance}")
+            sys.exit(1)
+        print("✅ ONNX output matches PyTorch")
+
+
+if __name__ == '__main__':
+    main()
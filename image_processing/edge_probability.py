@@ -0,0 +1,197 @@
+"""
+Edge Probability Maps for Wireframe Portrait Processing
+Keeps DexiNed's raw output (before thresholding) as a float16 array at model
+resolution, so any number of threshold, colour and enhancement variants can be
+rendered from one inference at resize-and-compare cost.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from geometry_cache import EDGE_MAP, GeometryCache
+
+
+class EdgeProbabilityMap:
+    """Raw DexiNed edge probabilities, stored as float16.
+
+    Binary masks derived from the map are memoized per output size,
+    threshold and interpolation, so re-rendering the same variant is free and
+    a new threshold only costs one resize and one comparison.
+    """
+
+    __slots__ = ('data', '_masks')
+
+    def __init__(self, data: np.ndarray):
+        """
+        Initialize map.
+
+        Args:
+            data: 2-D raw edge map (model output before thresholding)
+        """
+        self.data = np.ascontiguousarray(data, dtype=np.float16)
+        self._masks: Dict[Tuple, np.ndarray] = {}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(height, width) of the stored map"""
+        return self.data.shape[:2]
+
+    def resized(self, size: Tuple[int, int],
+                interpolation: int = cv2.INTER_LINEAR) -> np.ndarray:
+        """
+        Float32 copy of the map at another resolution
+
+        Args:
+            size: Output (width, height)
+            interpolation: OpenCV resize interpolation
+
+        Returns:
+            float32 (height, width) map
+        """
+        # OpenCV cannot resize float16 arrays
+        data = self.data.astype(np.float32)
+        if (size[1], size[0]) == data.shape:
+            return data
+        return cv2.resize(data, size, interpolation=interpolation)
+
+    def mask(self, size: Tuple[int, int], threshold: float,
+             interpolation: int = cv2.INTER_LINEAR) -> np.ndarray:
+        """
+        Binary edge mask at an output resolution (memoized)
+
+        Args:
+            size: Output (width, height)
+            threshold: Probability above which a pixel is an edge
+            interpolation: OpenCV interpolation used to resize the map
+
+        Returns:
+            uint8 mask, 255 on edges and 0 elsewhere
+        """
+        key = (tuple(size), float(threshold), interpolation)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = (self.resized(size, interpolation) > threshold).astype(np.uint8) * 255
+            self._masks[key] = mask
+        return mask
+
+    def outline(self, size: Tuple[int, int], threshold: float,
+                color: Tuple[int, int, int] = (0, 0, 0),
+                interpolation: int = cv2.INTER_LINEAR) -> np.ndarray:
+        """
+        Outline image: ``color`` edges on a white background
+
+        Args:
+            size: Output (width, height)
+            threshold: Probability above which a pixel is an edge
+            color: RGB edge colour
+            interpolation: OpenCV interpolation used to resize the map
+
+        Returns:
+            RGB uint8 image
+        """
+        edge_rgb = np.full((size[1], size[0], 3), 255, dtype=np.uint8)
+        edge_rgb[self.mask(size, threshold, interpolation) > 0] = color
+        return edge_rgb
+
+    def save(self, path: str):
+        """Write the map to a ``.npy`` file"""
+        np.save(path, self.data)
+
+    @classmethod
+    def load(cls, path: str) -> 'EdgeProbabilityMap':
+        """Read a map written by :meth:`save`"""
+        return cls(np.load(path))
+
+
+class EdgeMapMemo:
+    """In-memory LRU of edge probability maps, optionally backed by disk.
+
+    Keyed like the geometry cache (image pixel hash plus model identity).
+    Misses fall through to the on-disk :class:`GeometryCache` when one is
+    attached, and hits from disk are kept in memory. Only the float16 data is
+    kept; every lookup returns a new map object, so the full-resolution masks
+    memoized on it live no longer than the caller's reference.
+    """
+
+    def __init__(self, max_entries: int = 16, cache: Optional[GeometryCache] = None):
+        """
+        Initialize memo.
+
+        Args:
+            max_entries: Maps kept in memory (0 disables the in-memory memo)
+            cache: Optional on-disk cache for persistence across runs
+        """
+        self.max_entries = max_entries
+        self.cache = cache
+        self._maps: 'OrderedDict[Tuple[str, str], np.ndarray]' = OrderedDict()
+        # Tiles of one image may be rendered from several threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of maps held in memory"""
+        return len(self._maps)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether lookups can hit at all (worth hashing the image for)"""
+        return self.max_entries > 0 or self.cache is not None
+
+    @staticmethod
+    def image_key(image: np.ndarray) -> str:
+        """Hash decoded image pixels (same key as the geometry cache)"""
+        return GeometryCache.image_key(image)
+
+    def get(self, image_key: str, model_id: str) -> Optional[EdgeProbabilityMap]:
+        """
+        Look up a map in memory, then on disk
+
+        Returns:
+            Memoized map, or None on a miss
+        """
+        key = (image_key, model_id)
+        with self._lock:
+            data = self._maps.get(key)
+            if data is not None:
+                self._maps.move_to_end(key)
+                return EdgeProbabilityMap(data)
+        if self.cache is not None:
+            cached = self.cache.get(image_key, EDGE_MAP, model_id)
+            if cached is not None:
+                edge_map = EdgeProbabilityMap(cached)
+                self._remember(key, edge_map.data)
+                return edge_map
+        return None
+
+    def put(self, image_key: str, model_id: str, edge_map: EdgeProbabilityMap,
+            persist: bool = True):
+        """
+        Memoize a map
+
+        Args:
+            image_key: Image hash from :meth:`image_key`
+            model_id: Identity of the model (and settings) that produced it
+            edge_map: Map to store
+            persist: Also write it to the on-disk cache, if any
+        """
+        self._remember((image_key, model_id), edge_map.data)
+        if persist and self.cache is not None:
+            self.cache.put(image_key, EDGE_MAP, model_id, edge_map.data)
+
+    def _remember(self, key: Tuple[str, str], data: np.ndarray):
+        """Insert into the in-memory LRU, evicting the oldest entries"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._maps[key] = data
+            self._maps.move_to_end(key)
+            while len(self._maps) > self.max_entries:
+                self._maps.popitem(last=False)
+
+    def clear(self):
+        """Forget every in-memory map"""
+        with self._lock:
+            self._maps.clear()
@@ -0,0 +1,129 @@
+"""
+Face Mesh Renderer for Wireframe Portrait Processing
+Draws MediaPipe face-mesh connections with one batched OpenCV call per style
+instead of building landmark protobufs and iterating connection sets in Python.
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from landmark_array import LandmarkArray
+
+
+def _connection_array(connections) -> np.ndarray:
+    """Convert a MediaPipe connection set to an int32 (E, 2) index array"""
+    # Keep the set's iteration order so exported SVG elements stay in the
+    # order MediaPipe's own drawing code used.
+    return np.array(list(connections), dtype=np.int32).reshape(-1, 2)
+
+
+CONNECTION_SETS = ('FACEMESH_TESSELATION', 'FACEMESH_CONTOURS', 'FACEMESH_IRISES')
+
+
+@lru_cache(maxsize=None)
+def _connection_sets() -> Dict[str, np.ndarray]:
+    """Connection index arrays by name, built on first use"""
+    # Importing anything from mediapipe runs its package __init__, which pulls
+    # in the drawing utilities and matplotlib; only pay for it once a mesh is
+    # actually drawn or exported.
+    from mediapipe.python.solutions import face_mesh_connections
+    return {name: _connection_array(getattr(face_mesh_connections, name)) for name in CONNECTION_SETS}
+
+
+def mesh_styles() -> Tuple[Tuple[str, np.ndarray, int], ...]:
+    """(colour key in config.mesh_colors, connections, extra thickness), bottom → top"""
+    connections = _connection_sets()
+    return (
+        ('tesselation', connections['FACEMESH_TESSELATION'], 0),  # full triangular mesh across the face
+        ('contours', connections['FACEMESH_CONTOURS'], 1),        # emphasis around outer facial features
+        ('irises', connections['FACEMESH_IRISES'], 1),            # eye direction
+    )
+
+
+def __getattr__(name: str):
+    """Lazy module attributes: FACEMESH_* connection arrays and MESH_STYLES"""
+    if name in CONNECTION_SETS:
+        return _connection_sets()[name]
+    if name == 'MESH_STYLES':
+        return mesh_styles()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def mesh_pixel_coordinates(landmarks: LandmarkArray, width: int,
+                           height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert landmarks to pixel coordinates the way MediaPipe's drawing
+    utilities do (floor, clamped to the last row/column)
+
+    Args:
+        landmarks: Face landmarks
+        width: Canvas width in pixels
+        height: Canvas height in pixels
+
+    Returns:
+        Tuple of int32 (N, 2) pixel coordinates and a boolean (N,) mask of
+        landmarks inside the image; connections touching an invalid
+        landmark are not drawn
+    """
+    coords = landmarks.coords[:, :2].astype(np.float64)
+    valid = np.all((coords >= 0.0) & (coords <= 1.0), axis=1)
+    pixels = np.floor(coords * (width, height))
+    np.minimum(pixels, (width - 1, height - 1), out=pixels)
+    return pixels.astype(np.int32), valid
+
+
+def draw_connections(image: np.ndarray, pixels: np.ndarray, valid: np.ndarray,
+                     connections: np.ndarray, color: Tuple[int, int, int], thickness: int):
+    """
+    Draw every connection whose endpoints are both valid in one cv2.polylines call
+
+    Args:
+        image: Image to draw on (modified in place)
+        pixels: Pixel coordinates from :func:`mesh_pixel_coordinates`
+        valid: Validity mask from :func:`mesh_pixel_coordinates`
+        connections: int32 (E, 2) landmark index pairs
+        color: Line colour
+        thickness: Line thickness
+    """
+    connections = connections[np.all(connections < len(pixels), axis=1)]
+    connections = connections[valid[connections[:, 0]] & valid[connections[:, 1]]]
+    if len(connections) == 0:
+        return
+    # Each connection is a two-point open polyline: (E, 2, 2)
+    segments = np.ascontiguousarray(pixels[connections])
+    cv2.polylines(image, segments, False, color, thickness)
+
+
+def draw_face_mesh(image: np.ndarray, landmarks: Sequence,
+                   colors: Dict[str, Optional[Tuple[int, int, int]]], thickness: int,
+                   canvas_size: Optional[Tuple[int, int]] = None,
+                   offset: Tuple[int, int] = (0, 0)):
+    """
+    Draw tesselation, contours and irises of one face in place
+
+    Args:
+        image: RGB image to draw on (modified in place)
+        landmarks: Face landmarks (LandmarkArray or MediaPipe landmark list)
+        colors: Colours keyed like ``config.mesh_colors``; falsy colours are skipped
+        thickness: Tesselation thickness (contours and irises are drawn 1px thicker)
+        canvas_size: (width, height) of the full canvas when ``image`` is one
+            tile of it (defaults to the image size)
+        offset: (x, y) of the tile's top-left corner on the full canvas
+    """
+    landmarks = LandmarkArray.from_landmarks(landmarks)
+    if not landmarks:
+        return
+
+    height, width = image.shape[:2]
+    if canvas_size is not None:
+        width, height = canvas_size
+    pixels, valid = mesh_pixel_coordinates(landmarks, width, height)
+    if offset != (0, 0):
+        pixels = pixels - np.array(offset, dtype=np.int32)
+    for name, connections, extra_thickness in mesh_styles():
+        color = colors.get(name)
+        if color:
+            draw_connections(image, pixels, valid, connections, color, thickness + extra_thickness)
@@ -0,0 +1,218 @@
+"""
+Face-Presence Prefilter for Wireframe Portrait Processing
+Cheap "is there a face at all?" check that runs before an image is fully
+decoded, so faceless paintings never reach the FaceLandmarker, PoseLandmarker
+or DexiNed.
+
+JPEGs are decoded straight at a reduced scale (libjpeg's DCT scaling) into a
+small thumbnail, and a BlazeFace short-range detector runs on it. That is the
+same detector the FaceLandmarker starts with, on a 128x128 input, so the
+thumbnail loses nothing the landmarker would have seen. Backends, in order of
+preference:
+
+- MediaPipe FaceDetector with ``mediapipe_practice/blaze_face_short_range.tflite``
+  or, failing that, the BlazeFace model bundled with the mediapipe package
+- OpenCV Haar cascade (if the OpenCV build ships its cascade files)
+
+Verdicts are cached per file (path, size and modification time) in memory
+and, when one is attached, in the geometry cache, so asking twice is free
+and later runs over the same corpus skip rejected images without decoding
+them at all.
+"""
+
+import os
+import hashlib
+import threading
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from geometry_cache import GeometryCache, model_identity
+
+FACE_PRESENCE = "face_presence"
+DEFAULT_MIN_CONFIDENCE = 0.4
+DEFAULT_THUMBNAIL_SIZE = 256
+# Smallest usable thumbnail side: the BlazeFace input resolution
+MIN_THUMBNAIL_SIDE = 128
+JPEG_EXTENSIONS = ('.jpg', '.jpeg', '.jpe')
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'mediapipe_practice', 'blaze_face_short_range.tflite'
+)
+
+
+def bundled_face_detector_model() -> str:
+    """Path of the BlazeFace short-range model shipped with mediapipe ('' if absent)"""
+    try:
+        import mediapipe as mp
+    except ImportError:
+        return ""
+    path = os.path.join(os.path.dirname(mp.__file__), 'modules', 'face_detection',
+                        'face_detection_short_range.tflite')
+    return path if os.path.exists(path) else ""
+
+
+def load_thumbnail(image_path: str, max_side: int = DEFAULT_THUMBNAIL_SIZE) -> Optional[np.ndarray]:
+    """
+    Decode a small RGB copy of an image
+
+    JPEGs are decoded at 1/4 or 1/2 scale directly when that still leaves a
+    usable thumbnail; other formats are decoded fully and downscaled.
+
+    Args:
+        image_path: Image file path
+        max_side: Longest thumbnail side in pixels
+
+    Returns:
+        RGB thumbnail, or None if the file cannot be read
+    """
+    image = None
+    if image_path.lower().endswith(JPEG_EXTENSIONS):
+        for flag in (cv2.IMREAD_REDUCED_COLOR_4, cv2.IMREAD_REDUCED_COLOR_2):
+            image = cv2.imread(image_path, flag)
+            if image is None or max(image.shape[:2]) >= min(max_side, MIN_THUMBNAIL_SIDE * 2):
+                break
+    if image is None or max(image.shape[:2]) < MIN_THUMBNAIL_SIDE:
+        image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+
+    height, width = image.shape[:2]
+    if max(height, width) > max_side:
+        ratio = max_side / max(height, width)
+        image = cv2.resize(image, (max(1, round(width * ratio)), max(1, round(height * ratio))),
+                           interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+class FacePresenceFilter:
+    """Thumbnail face detector that decides whether an image is worth processing"""
+
+    def __init__(self, min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+                 thumbnail_size: int = DEFAULT_THUMBNAIL_SIZE,
+                 model_path: str = DEFAULT_MODEL_PATH,
+                 cache: Optional[GeometryCache] = None):
+        """
+        Initialize prefilter.
+
+        Args:
+            min_confidence: Detection score an image needs to pass
+            thumbnail_size: Longest thumbnail side in pixels
+            model_path: MediaPipe FaceDetector model (falls back to the model
+                bundled with mediapipe, then to a Haar cascade)
+            cache: Optional geometry cache that keeps verdicts across runs
+        """
+        self.min_confidence = min_confidence
+        self.thumbnail_size = thumbnail_size
+        self.cache = cache
+        self.backend = ""
+        self.model_path = ""
+        self.detector = None
+        self.passed = 0
+        self.rejected = 0
+        self._verdicts: Dict[str, bool] = {}
+        # Batch pipelines may ask from several decode threads
+        self._lock = threading.Lock()
+        self._setup_detector(model_path)
+
+    def _setup_detector(self, model_path: str):
+        """Pick the first available detector backend"""
+        for path in (model_path, bundled_face_detector_model()):
+            if not path or not os.path.exists(path):
+                continue
+            try:
+                import mediapipe.tasks as mp_tasks
+                options = mp_tasks.vision.FaceDetectorOptions(
+                    base_options=mp_tasks.BaseOptions(model_asset_path=path),
+                    min_detection_confidence=self.min_confidence
+                )
+                self.detector = mp_tasks.vision.FaceDetector.create_from_options(options)
+                self.backend, self.model_path = 'mediapipe', path
+                return
+            except Exception as e:
+                print(f"Warning: Could not load face detector {path}: {e}")
+
+        cascade_dir = getattr(getattr(cv2, 'data', None), 'haarcascades', '')
+        cascade_path = os.path.join(cascade_dir, 'haarcascade_frontalface_default.xml')
+        if cascade_dir and os.path.exists(cascade_path):
+            self.detector = cv2.CascadeClassifier(cascade_path)
+            self.backend, self.model_path = 'haar', cascade_path
+            return
+
+        print("Warning: No face detector available for the prefilter, every image passes")
+
+    @property
+    def identity(self) -> str:
+        """Identity of the detector and settings, part of the verdict cache key"""
+        return model_identity(self.model_path,
+                              f"{self.backend}|c{self.min_confidence:g}|t{self.thumbnail_size}")
+
+    @staticmethod
+    def file_key(image_path: str) -> str:
+        """Key a file by path, size and modification time (no decoding needed)"""
+        stat = os.stat(image_path)
+        identity = f"{os.path.abspath(image_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def score(self, thumbnail: np.ndarray) -> float:
+        """
+        Best face score on a thumbnail
+
+        Args:
+            thumbnail: RGB thumbnail
+
+        Returns:
+            Highest detection score (Haar detections count as 1.0), 0.0 if none
+        """
+        if self.backend == 'mediapipe':
+            import mediapipe as mp
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(thumbnail))
+            detections = self.detector.detect(mp_image).detections
+            return max((detection.categories[0].score for detection in detections), default=0.0)
+        if self.backend == 'haar':
+            gray = cv2.cvtColor(thumbnail, cv2.COLOR_RGB2GRAY)
+            faces = self.detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=4)
+            return 1.0 if len(faces) else 0.0
+        return 1.0
+
+    def has_face(self, image_path: str) -> bool:
+        """
+        Decide whether an image is worth running the full pipeline on
+
+        Args:
+            image_path: Image file path
+
+        Returns:
+            False if no face was found on the thumbnail; unreadable files
+            pass, so the regular loader reports them
+        """
+        if self.detector is None or not os.path.exists(image_path):
+            return True
+
+        file_key = self.file_key(image_path)
+        with self._lock:
+            verdict = self._verdicts.get(file_key)
+        if verdict is not None:
+            return verdict
+
+        cached = self.cache.get(file_key, FACE_PRESENCE, self.identity) if self.cache else None
+        if cached is not None:
+            verdict = bool(cached[0] >= self.min_confidence)
+        else:
+            thumbnail = load_thumbnail(image_path, self.thumbnail_size)
+            if thumbnail is None:
+                return True
+            with self._lock:
+                face_score = self.score(thumbnail)
+            verdict = face_score >= self.min_confidence
+            if self.cache:
+                self.cache.put(file_key, FACE_PRESENCE, self.identity,
+                               np.array([face_score], dtype=np.float32))
+
+        with self._lock:
+            self._verdicts[file_key] = verdict
+            if verdict:
+                self.passed += 1
+            else:
+                self.rejected += 1
+        return verdict
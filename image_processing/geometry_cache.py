@@ -0,0 +1,178 @@
+"""
+Geometry Cache for Wireframe Portrait Processing
+Persists detector outputs (face landmarks, pose landmarks, raw DexiNed edge
+maps) on disk so re-rendering an image with a different preset, colour scheme
+or thickness needs no model inference.
+"""
+
+import os
+import hashlib
+import tempfile
+from types import SimpleNamespace
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from landmark_array import LandmarkArray
+
+# Bump when the stored array layout changes so stale entries are ignored
+CACHE_FORMAT_VERSION = 1
+
+# Components stored per image
+FACE_LANDMARKS = "face"
+POSE_LANDMARKS = "pose"
+EDGE_MAP = "edges"
+
+
+def landmarks_to_array(landmarks: Optional[Sequence]) -> np.ndarray:
+    """Convert landmarks to a float32 (N, 3) array ((0, 3) for None)"""
+    if not landmarks:
+        return np.zeros((0, 3), dtype=np.float32)
+    return LandmarkArray.from_landmarks(landmarks).coords
+
+
+def landmarks_from_array(array: np.ndarray) -> Optional[LandmarkArray]:
+    """Wrap a cached (N, 3) array as landmarks (None when empty)"""
+    if array.size == 0:
+        return None
+    return LandmarkArray(array)
+
+
+def face_result_from_landmarks(landmarks: Optional[List]):
+    """Minimal stand-in for a FaceLandmarkerResult built from cached landmarks"""
+    return SimpleNamespace(face_landmarks=[landmarks] if landmarks else [])
+
+
+def model_identity(model_path: str, variant: str = "") -> str:
+    """
+    Identify a model file by name, size and modification time
+
+    Args:
+        model_path: Path to the model weights
+        variant: Extra qualifier (e.g. inference backend) that changes outputs
+
+    Returns:
+        Identity string used as part of cache keys
+    """
+    if not model_path or not os.path.exists(model_path):
+        return f"missing:{os.path.basename(model_path or '')}:{variant}"
+    stat = os.stat(model_path)
+    return f"{os.path.basename(model_path)}:{stat.st_size}:{int(stat.st_mtime)}:{variant}"
+
+
+class GeometryCache:
+    """Content-addressed, size-bounded on-disk cache of detector outputs.
+
+    Entries are keyed by a hash of the decoded image pixels plus the identity
+    of the model that produced them, and stored as raw ``.npy`` arrays
+    (float32 landmarks, float16 edge maps). Reads refresh an entry's
+    modification time, and the least recently used entries are evicted once
+    the cache grows beyond ``max_size_mb``.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: int = 1024):
+        """
+        Initialize geometry cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            max_size_mb: Size limit before least recently used entries are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size_bytes = sum(entry.stat().st_size for entry in self._entries())
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cache entries on disk"""
+        return self._size_bytes
+
+    @staticmethod
+    def image_key(image: np.ndarray) -> str:
+        """Hash decoded image pixels (and shape) into a cache key prefix"""
+        digest = hashlib.sha256()
+        digest.update(str(image.shape).encode())
+        digest.update(np.ascontiguousarray(image).data)
+        return digest.hexdigest()
+
+    def _entry_path(self, image_key: str, component: str, model_id: str) -> str:
+        """Path of the entry for one component of one image"""
+        key = hashlib.sha256(
+            f"{CACHE_FORMAT_VERSION}|{image_key}|{component}|{model_id}".encode()
+        ).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npy")
+
+    def _entries(self):
+        """Iterate over all cache entry files"""
+        for shard in os.scandir(self.cache_dir):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith('.npy'):
+                        yield entry
+
+    def get(self, image_key: str, component: str, model_id: str) -> Optional[np.ndarray]:
+        """
+        Look up a cached array
+
+        Returns:
+            Cached array, or None on a miss
+        """
+        path = self._entry_path(image_key, component, model_id)
+        try:
+            array = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Refresh the access time used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return array
+
+    def put(self, image_key: str, component: str, model_id: str, array: np.ndarray):
+        """Store an array, evicting least recently used entries if needed"""
+        path = self._entry_path(image_key, component, model_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so concurrent batch workers never
+        # read a partially written entry.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, array, allow_pickle=False)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write geometry cache entry: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self._size_bytes += os.path.getsize(path)
+        if self._size_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until under 90% of the limit"""
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        target = int(self.max_bytes * 0.9)
+
+        for entry in entries:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                # Already removed by another worker
+                continue
+
+        self._size_bytes = total
@@ -18,21 +18,27 @@ import os
 import sys
 import cv2
 import numpy as np
-import mediapipe as mp
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 import argparse
 import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 # Import base wireframe processor
 sys.path.append(os.path.dirname(__file__))
 from wireframe_portrait_processor import (
     WireframeConfig, ConstructionLinesGenerator, MeshGenerator, 
     DexiNedGenerator, BackgroundRemover, WireframePortraitProcessor,
-    create_preset_configs
+    LayeredCanvas, create_preset_configs
 )
-from svg_generator import SVGGenerator, SVGWireframeConfig
+from stage_profiler import StageProfiler
+from png_stream import StreamingPNGWriter
+from detection_proxy import DEFAULT_MAX_SIDE
+from edge_probability import EdgeProbabilityMap
+from landmark_array import LandmarkArray
+import face_mesh_renderer
 
 @dataclass
 class HighResolutionConfig(WireframeConfig):
@@ -63,6 +69,7 @@ class HighResolutionConfig(WireframeConfig):
     tile_processing: bool = False         # For extremely large images
     tile_size: Tuple[int, int] = (2048, 2048)
     tile_overlap: int = 256
+    tile_workers: int = 1                 # Tiles of one row rendered in parallel threads
 
 class HighResolutionConstructionLinesGenerator(ConstructionLinesGenerator):
     """High-resolution construction lines with vector-based rendering"""
@@ -70,15 +77,25 @@ class HighResolutionConstructionLinesGenerator(ConstructionLinesGenerator):
     @staticmethod
     def draw_construction_lines(image: np.ndarray, 
                               landmarks: List, 
-                              config: HighResolutionConfig) -> np.ndarray:
+                              config: HighResolutionConfig,
+                              canvas_size: Optional[Tuple[int, int]] = None,
+                              offset: Tuple[int, int] = (0, 0)) -> np.ndarray:
         """
         Draw high-resolution construction lines with adaptive scaling
+        
+        ``canvas_size`` and ``offset`` place ``image`` as one tile of a larger
+        (width, height) canvas; line positions and thickness follow the full
+        canvas.
         """
+        landmarks = LandmarkArray.from_landmarks(landmarks)
         if not landmarks:
             return image.copy()
         
         annotated = image.copy()
         height, width = image.shape[:2]
+        if canvas_size is not None:
+            width, height = canvas_size
+        offset = np.array(offset, dtype=np.int32)
         
         # Scale the guideline thickness so strokes look similar across
         # resolutions.  A 1px line at 1080p becomes thicker at 4K/8K.
@@ -92,49 +109,14 @@ class HighResolutionConstructionLinesGenerator(ConstructionLinesGenerator):
         
         colors = config.construction_line_colors
         
-        def get_pixel_coords(landmark_idx):
-            """Convert normalized landmark coordinates to pixel coordinates"""
-            if landmark_idx >= len(landmarks):
-                return None
-            landmark = landmarks[landmark_idx]
-            return (int(landmark.x * width), int(landmark.y * height))
-        
-        def draw_smooth_line(points, line_color):
-            """Draw anti-aliased line with sub-pixel precision"""
+        # Classical portrait guidelines, each drawn as one anti-aliased
+        # polyline through its landmarks (placed on the full canvas, then
+        # shifted into this tile)
+        for point_indices, color_key in ConstructionLinesGenerator.CONSTRUCTION_LINES:
+            points = landmarks.pixel_points(width, height, point_indices) - offset
             if len(points) < 2:
-                return
-                
-            if config.vector_construction_lines and len(points) > 2:
-                # When vector mode is on we still draw straight segments, but
-                # with heavy anti-aliasing so the result resembles a smooth
-                # Bézier curve.
-                for i in range(len(points) - 1):
-                    cv2.line(annotated, points[i], points[i + 1], line_color, thickness, cv2.LINE_AA)
-            else:
-                # Otherwise we simply connect the points with standard lines.
-                for i in range(len(points) - 1):
-                    cv2.line(annotated, points[i], points[i + 1], line_color, thickness, cv2.LINE_AA)
-        
-        # List of classical portrait guidelines to render. Each tuple pairs
-        # landmark indices with the color used for that guideline.
-        construction_lines = [
-            ([10, 168, 4, 152], colors['vertical_center']),    # Vertical center
-            ([63, 293], colors['eyebrow_line']),               # Eyebrow line
-            ([33, 263], colors['eye_lines']),                  # Eye line 1
-            ([133, 362], colors['eye_lines']),                 # Eye line 2
-            ([145, 159], colors['eye_lines']),                 # Eye line 3
-            ([374, 386], colors['eye_lines']),                 # Eye line 4
-            ([48, 278], colors['nose_line']),                  # Nose line
-            ([61, 291], colors['mouth_line']),                 # Mouth line
-        ]
-        
-        for point_indices, line_color in construction_lines:
-            points = []
-            for idx in point_indices:
-                point = get_pixel_coords(idx)
-                if point:
-                    points.append(point)  # accumulate valid landmark points
-            draw_smooth_line(points, line_color)
+                continue
+            cv2.polylines(annotated, [points], False, colors[color_key], thickness, cv2.LINE_AA)
         
         return annotated
 
@@ -143,8 +125,14 @@ class HighResolutionMeshGenerator(MeshGenerator):
     
     def draw_face_mesh(self, image: np.ndarray, 
                       detection_result, 
-                      config: HighResolutionConfig) -> np.ndarray:
-        """Draw high-resolution face mesh with adaptive density"""
+                      config: HighResolutionConfig,
+                      canvas_size: Optional[Tuple[int, int]] = None,
+                      offset: Tuple[int, int] = (0, 0)) -> np.ndarray:
+        """Draw high-resolution face mesh with adaptive density
+        
+        ``canvas_size`` and ``offset`` place ``image`` as one tile of a larger
+        (width, height) canvas.
+        """
         if not detection_result.face_landmarks:
             return image.copy()
         
@@ -154,207 +142,234 @@ class HighResolutionMeshGenerator(MeshGenerator):
         # Determine how thick the mesh lines should be at the current
         # resolution.  This keeps the grid readable even on massive canvases.
         height, width = image.shape[:2]
+        if canvas_size is not None:
+            width, height = canvas_size
         base_resolution = 1080
         resolution_factor = max(height, width) / base_resolution
         mesh_thickness = max(1, int(
             config.mesh_thickness * resolution_factor * config.mesh_density_scaling
         ))
         
+        # Tesselation with adaptive density plus thicker contours and irises.
+        # Only the connections are drawn (no landmark circles), producing a
+        # cleaner technical style.
         for face_landmarks in detection_result.face_landmarks:
-            # Convert landmarks
-            from mediapipe.framework.formats import landmark_pb2
-            face_landmarks_proto = landmark_pb2.NormalizedLandmarkList()
-            face_landmarks_proto.landmark.extend([
-                landmark_pb2.NormalizedLandmark(x=landmark.x, y=landmark.y, z=landmark.z) 
-                for landmark in face_landmarks
-            ])
-            
-            # Draw with enhanced quality settings.  We omit landmark circles so
-            # only the connections remain, producing a cleaner technical style.
-            drawing_spec = mp.solutions.drawing_utils.DrawingSpec(
-                thickness=mesh_thickness,
-                circle_radius=0  # No landmark circles for clean lines
-            )
-            
-            # Tesselation with adaptive density
-            if colors['tesselation']:
-                self.mp_drawing.draw_landmarks(
-                    image=annotated,
-                    landmark_list=face_landmarks_proto,
-                    connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                        color=colors['tesselation'], 
-                        thickness=mesh_thickness
-                    )
-                )
-            
-            # Enhanced contours
-            if colors['contours']:
-                self.mp_drawing.draw_landmarks(
-                    image=annotated,
-                    landmark_list=face_landmarks_proto,
-                    connections=self.mp_face_mesh.FACEMESH_CONTOURS,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                        color=colors['contours'], 
-                        thickness=mesh_thickness + 1
-                    )
-                )
-            
-            # High-quality iris rendering
-            if colors['irises']:
-                self.mp_drawing.draw_landmarks(
-                    image=annotated,
-                    landmark_list=face_landmarks_proto,
-                    connections=self.mp_face_mesh.FACEMESH_IRISES,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                        color=colors['irises'], 
-                        thickness=mesh_thickness + 1
-                    )
-                )
+            face_mesh_renderer.draw_face_mesh(annotated, face_landmarks, colors, mesh_thickness,
+                                              (width, height), offset)
         
         return annotated
 
 class HighResolutionDexiNedGenerator(DexiNedGenerator):
     """DexiNed with super-resolution techniques"""
     
-    def generate_outline(self, image: np.ndarray, config: HighResolutionConfig) -> np.ndarray:
-        """Generate high-resolution outline using super-resolution techniques"""
-        if not self.model:
-            return self._fallback_edge_detection(image, config)
-        
-        try:
-            original_shape = image.shape
-            
-            # Multi-scale processing for better quality.  By running the edge
-            # detector on several resized versions of the image and merging the
-            # results we preserve both coarse structure and tiny details.
-            scales = [1.0]
-            if config.enable_super_resolution:
-                scales = [0.5, 1.0, 1.5]
-            
-            edge_results = []
-            
-            for scale in scales:
-                # Scale image for processing
-                if scale != 1.0:
-                    h, w = int(image.shape[0] * scale), int(image.shape[1] * scale)
-                    scaled_image = cv2.resize(image, (w, h), interpolation=cv2.INTER_LANCZOS4)
-                else:
-                    scaled_image = image
-                
-                # Process with DexiNed
-                img_tensor = self._preprocess_image(scaled_image)
-                
-                if self.model and img_tensor is not None:
-                    with self.model.eval():
-                        predictions = self.model(img_tensor)
-                        edge_map = predictions[-1].cpu().numpy()[0, 0]
-                else:
-                    edge_map = np.zeros((352, 352))
-                
-                # Post-process edges
-                edge_image = self._postprocess_edges_hires(
-                    edge_map, scaled_image.shape, config, scale
-                )
-                
-                # Scale back to original size
-                if scale != 1.0:
-                    edge_image = cv2.resize(
-                        edge_image, 
-                        (original_shape[1], original_shape[0]), 
-                        interpolation=cv2.INTER_LANCZOS4
-                    )
-                
-                edge_results.append(edge_image)
-            
-            # Combine multi-scale results
-            if len(edge_results) > 1:
-                final_edges = self._combine_multiscale_edges(edge_results, config)
-            else:
-                final_edges = edge_results[0]
-            
-            # Edge enhancement for high-resolution
-            if config.enable_edge_enhancement:
-                final_edges = self._enhance_edges(final_edges, config)
+    # Multi-scale pass: scale factors relative to the base model input
+    MULTISCALE_SCALES = (0.5, 1.0, 1.5)
+    MODEL_INPUT_SIZE = 352
+    SIZE_MULTIPLE = 16  # DexiNed's down/up-sampling path needs multiples of 16
+    
+    def generate_outline(self, image: np.ndarray, config: HighResolutionConfig,
+                         target_shape: Optional[Tuple[int, ...]] = None) -> np.ndarray:
+        """
+        Generate high-resolution outline using super-resolution techniques
+        
+        Args:
+            image: Input RGB image (any resolution; it is resized for the model)
+            config: High-resolution configuration
+            target_shape: Shape of the outline to produce (defaults to the
+                image's own shape), so edges found on a small source can be
+                rendered straight onto a 4K/8K canvas
             
-            return final_edges
+        Returns:
+            RGB outline image of ``target_shape`` on a white background
+        """
+        mask = self.generate_edge_mask(image, config, target_shape)
+        return self.colorize_mask(mask, config.dexined_color)
+    
+    def generate_edge_mask(self, image: np.ndarray, config: HighResolutionConfig,
+                           target_shape: Optional[Tuple[int, ...]] = None) -> np.ndarray:
+        """
+        Generate the high-resolution edge mask (single channel)
+        
+        Edges stay a one-plane mask through thresholding and enhancement and
+        are only coloured when composited onto the canvas.
+        
+        Args:
+            image: Input RGB image (any resolution; it is resized for the model)
+            config: High-resolution configuration
+            target_shape: (height, width, ...) of the mask (defaults to the
+                image's own size)
             
+        Returns:
+            uint8 mask of the target size, 255 on edges and 0 elsewhere
+        """
+        target_shape = target_shape[:2] if target_shape else image.shape[:2]
+        if not self.has_model:
+            return self._fallback_mask(image, target_shape)
+        
+        try:
+            edge_map = self.probability_map(image, config)
         except Exception as e:
             print(f"Error in high-res DexiNed processing: {e}")
-            return self._fallback_edge_detection(image, config)
+            return self._fallback_mask(image, target_shape)
+        return self.render_edge_mask(edge_map, target_shape, config)
     
-    def _postprocess_edges_hires(self, edge_map: np.ndarray, 
-                                target_shape: Tuple[int, int, int],
-                                config: HighResolutionConfig,
-                                scale: float = 1.0) -> np.ndarray:
-        """High-quality edge post-processing"""
-        # Use high-quality interpolation for upscaling
-        edge_resized = cv2.resize(
-            edge_map, 
-            (target_shape[1], target_shape[0]), 
-            interpolation=cv2.INTER_LANCZOS4
-        )
+    def render_edge_mask(self, edge_map: EdgeProbabilityMap, target_shape: Tuple[int, ...],
+                         config: HighResolutionConfig) -> np.ndarray:
+        """
+        Threshold and enhance a fused edge map (no inference)
         
-        # Slightly relax the threshold when working at smaller scales so thin
-        # lines are not lost after resizing.
-        threshold = config.dexined_threshold * (0.8 + 0.2 * scale)
-        edge_binary = (edge_resized > threshold).astype(np.uint8) * 255
+        Args:
+            edge_map: Map from :meth:`probability_map`
+            target_shape: (height, width, ...) of the mask
+            config: High-resolution configuration (threshold and enhancement
+                settings)
+            
+        Returns:
+            uint8 mask, 255 on edges and 0 elsewhere
+        """
+        mask = self._postprocess_edges_hires(edge_map, target_shape, config)
         
-        # Create high-quality edge image
-        edge_rgb = np.ones(target_shape, dtype=np.uint8) * 255
-        edge_rgb[edge_binary > 0] = config.dexined_color
+        # Edge enhancement for high-resolution
+        if config.enable_edge_enhancement:
+            mask = self._enhance_edges(mask, config)
         
-        return edge_rgb
+        return mask
     
-    def _combine_multiscale_edges(self, edge_results: List[np.ndarray], 
-                                 config: HighResolutionConfig) -> np.ndarray:
-        """Combine multi-scale edge detection results"""
-        # Weighted combination of different scales
-        weights = [0.3, 0.4, 0.3]  # Emphasize 1.0 scale
+    def render_outline(self, edge_map: EdgeProbabilityMap, target_shape: Tuple[int, ...],
+                       config: HighResolutionConfig) -> np.ndarray:
+        """
+        Threshold, colour and enhance a fused edge map (no inference)
         
-        combined = np.ones_like(edge_results[0]) * 255  # Start with white
-
-        for i, (edges, weight) in enumerate(zip(edge_results, weights)):
-            # Any pixel that isn't nearly white is treated as part of an edge.
-            edge_mask = np.any(edges < 250, axis=2)
-
-            # Blend the current scale's edges over the accumulated result. This
-            # lets higher-resolution passes reinforce details from lower ones.
-            alpha = weight
-            combined[edge_mask] = (
-                alpha * edges[edge_mask] +
-                (1 - alpha) * combined[edge_mask]
-            ).astype(np.uint8)
+        Args:
+            edge_map: Map from :meth:`probability_map`
+            target_shape: Shape of the outline to produce
+            config: High-resolution configuration (threshold, colour and
+                enhancement settings)
+            
+        Returns:
+            RGB outline image of ``target_shape`` on a white background
+        """
+        return self.colorize_mask(self.render_edge_mask(edge_map, target_shape, config),
+                                  config.dexined_color)
+    
+    def memo_identity(self, config: Optional[HighResolutionConfig] = None) -> str:
+        """Model identity plus the multi-scale settings the fused map depends on"""
+        identity = super().memo_identity(config)
+        if config is None:
+            return identity
+        scales = "ms" if config.enable_super_resolution else "ss"
+        return f"{identity}:{scales}{max(1, config.dexined_upscale_factor)}"
+    
+    def _predict_raw_edge_map(self, image: np.ndarray,
+                              config: Optional[HighResolutionConfig] = None) -> np.ndarray:
+        """Multi-scale inference behind :meth:`probability_map`"""
+        # Multi-scale processing for better quality: DexiNed sees the image
+        # at several real resolutions so both coarse structure and tiny
+        # details are found, and the maps are fused at model resolution.
+        return self.predict_multiscale_edge_map(image, config)
+    
+    def _fallback_mask(self, image: np.ndarray, target_shape: Tuple[int, ...]) -> np.ndarray:
+        """Canny edge mask at the target resolution (Canny lines are one pixel wide
+        at the resolution they are found at, so they are not scaled up)"""
+        if target_shape[:2] != image.shape[:2]:
+            image = cv2.resize(image, (target_shape[1], target_shape[0]), interpolation=cv2.INTER_LINEAR)
+        return self._fallback_edge_mask(image)
+    
+    def model_input_sizes(self, image_shape: Tuple[int, ...],
+                          config: HighResolutionConfig) -> Tuple[Tuple[int, int], List[Tuple[int, int]], List[float]]:
+        """
+        Model input sizes for the base scale and every multi-scale pass
+        
+        The base input keeps the image's aspect ratio with its longest side
+        at ``352 * dexined_upscale_factor``; each scale multiplies that size.
+        All sides are rounded to multiples of 16.
         
-        return combined
+        Args:
+            image_shape: Shape of the input image
+            config: High-resolution configuration
+            
+        Returns:
+            Tuple of the base (width, height), the (width, height) per scale
+            and the scales themselves
+        """
+        height, width = image_shape[:2]
+        longest = self.MODEL_INPUT_SIZE * max(1, config.dexined_upscale_factor)
+        ratio = longest / max(height, width)
+        
+        def input_size(scale: float) -> Tuple[int, int]:
+            return (self._round_to_multiple(width * ratio * scale),
+                    self._round_to_multiple(height * ratio * scale))
+        
+        scales = list(self.MULTISCALE_SCALES) if config.enable_super_resolution else [1.0]
+        return input_size(1.0), [input_size(scale) for scale in scales], scales
     
-    def _enhance_edges(self, edge_image: np.ndarray, 
+    def _round_to_multiple(self, value: float) -> int:
+        """Round a side length to the nearest multiple DexiNed accepts"""
+        return max(self.SIZE_MULTIPLE, int(round(value / self.SIZE_MULTIPLE)) * self.SIZE_MULTIPLE)
+    
+    def predict_multiscale_edge_map(self, image: np.ndarray,
+                                    config: HighResolutionConfig) -> np.ndarray:
+        """
+        Run DexiNed at every scale and fuse the maps
+        
+        Each scale is one forward pass at its own input size: padding the
+        smaller scales to the largest size would roughly double the model's
+        work and put a hard step edge next to their borders, which DexiNed
+        responds to. Smaller scales use a relaxed threshold so thin lines
+        survive; fusion keeps, per pixel, the strongest response relative to
+        each scale's threshold, so an edge found at any scale is kept.
+        
+        Args:
+            image: Input RGB image
+            config: High-resolution configuration
+            
+        Returns:
+            Fused raw edge map at the base model resolution, to be compared
+            against ``config.dexined_threshold``
+        """
+        (base_width, base_height), sizes, scales = self.model_input_sizes(image.shape, config)
+        
+        fused = None
+        for (width, height), scale in zip(sizes, scales):
+            with self.profiler.stage('dexined_preprocess'):
+                shrinking = width * height < image.shape[0] * image.shape[1]
+                batch = self._preprocess_array(
+                    image, (width, height), cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+                )[np.newaxis]
+            with self.profiler.stage('dexined_forward'):
+                edge_map = self._forward(batch)[0]
+            
+            if (width, height) != (base_width, base_height):
+                interpolation = cv2.INTER_AREA if width > base_width else cv2.INTER_LINEAR
+                edge_map = cv2.resize(edge_map, (base_width, base_height), interpolation=interpolation)
+            # Slightly relax the threshold at smaller scales so thin lines
+            # are not lost: edge_map > threshold * (0.8 + 0.2 * scale)
+            edge_map = edge_map / (0.8 + 0.2 * scale)
+            fused = edge_map if fused is None else np.maximum(fused, edge_map)
+        return fused
+    
+    def _postprocess_edges_hires(self, edge_map: EdgeProbabilityMap, 
+                                target_shape: Tuple[int, ...],
+                                config: HighResolutionConfig) -> np.ndarray:
+        """High-quality edge post-processing into a binary mask"""
+        # Use high-quality interpolation for upscaling
+        return edge_map.mask(
+            (target_shape[1], target_shape[0]),
+            config.dexined_threshold,
+            interpolation=cv2.INTER_LANCZOS4
+        )
+    
+    def _enhance_edges(self, edge_mask: np.ndarray, 
                       config: HighResolutionConfig) -> np.ndarray:
-        """Enhance edges for high-resolution display"""
-        # Convert to grayscale for processing
-        if len(edge_image.shape) == 3:
-            gray = cv2.cvtColor(edge_image, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = edge_image
-        
+        """Enhance an edge mask (255 on edges) for high-resolution display"""
         # Morphological operations for cleaner edges
         kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
 
-        # First close tiny gaps between edge segments, then smooth out any
-        # remaining noise for a cleaner final outline.
-        gray = cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
-        gray = cv2.medianBlur(gray, 3)
-        
-        # Convert back to color
-        if len(edge_image.shape) == 3:
-            enhanced = np.ones_like(edge_image) * 255
-            enhanced[gray < 250] = config.dexined_color
-            return enhanced
-        else:
-            return gray
+        # Opening the edge plane is closing the dark-on-white outline: it
+        # drops isolated specks, then the median smooths out any remaining
+        # noise for a cleaner final outline.
+        edge_mask = cv2.morphologyEx(edge_mask, cv2.MORPH_OPEN, kernel)
+        return cv2.medianBlur(edge_mask, 3)
 
 class HighResolutionWireframeProcessor(WireframePortraitProcessor):
     """High-resolution wireframe processor with zoom support"""
@@ -369,7 +384,9 @@ class HighResolutionWireframeProcessor(WireframePortraitProcessor):
         self.mesh_generator = HighResolutionMeshGenerator()
         
         if config.enable_dexined_outline and config.dexined_model_path:
-            self.dexined_generator = HighResolutionDexiNedGenerator(config.dexined_model_path)
+            self.dexined_generator = HighResolutionDexiNedGenerator.from_config(config)
+            self.dexined_generator.memo.cache = self.geometry_cache
+            self.attach_profiler(self.profiler)
         
         # Calculate adaptive scaling factors
         self._calculate_scaling_factors()
@@ -396,28 +413,38 @@ class HighResolutionWireframeProcessor(WireframePortraitProcessor):
         if image is None:
             return {}
         
-        # Check if we need to resize for target resolution
-        original_shape = image.shape[:2]
-        target_height, target_width = self.config.target_resolution
-        
-        if max(original_shape) < max(target_height, target_width):
-            # If the source image is smaller than the requested resolution,
-            # enlarge it first so subsequent drawing steps have enough pixels to
-            # work with.
-            image = self._upscale_image(image, (target_width, target_height))
-            print(f"Upscaled image from {original_shape} to {image.shape[:2]}")
+        # Landmarks are normalized and edges are resized anyway, so detection
+        # runs on the source pixels; only the canvas has the target resolution
+        canvas_width, canvas_height = self._canvas_size(image.shape)
+        if (canvas_width, canvas_height) != (image.shape[1], image.shape[0]):
+            print(f"Rendering {image.shape[1]}x{image.shape[0]} source onto "
+                  f"{canvas_width}x{canvas_height} canvas")
         
         # Process with tile-based approach for extremely large images
-        if (image.shape[0] > 4096 or image.shape[1] > 4096) and self.config.tile_processing:
-            print("Warning: Tile processing not implemented yet. Processing full image.")
-            return self._process_full_image(image, output_path)
+        if (canvas_height > 4096 or canvas_width > 4096) and self.config.tile_processing:
+            return self._process_tiled_image(image, output_path, (canvas_width, canvas_height))
         else:
-            return self._process_full_image(image, output_path)
+            return self._process_full_image(image, output_path, (canvas_width, canvas_height))
     
-    def _upscale_image(self, image: np.ndarray, target_size: Tuple[int, int]) -> np.ndarray:
-        """Upscale image using high-quality interpolation"""
-        target_width, target_height = target_size
-        current_height, current_width = image.shape[:2]
+    def _canvas_size(self, image_shape: Tuple[int, ...]) -> Tuple[int, int]:
+        """
+        Output canvas (width, height) for a source image
+        
+        Sources smaller than ``target_resolution`` are fitted into it keeping
+        their aspect ratio; larger sources keep their own size.
+        
+        Args:
+            image_shape: Shape of the source image
+            
+        Returns:
+            Canvas (width, height)
+        """
+        current_height, current_width = image_shape[:2]
+        # The fitting box is read height-first, as the processor always has
+        # (so the print presets give portrait pages)
+        target_height, target_width = self.config.target_resolution
+        if max(current_height, current_width) >= max(target_width, target_height):
+            return current_width, current_height
         
         # Maintain aspect ratio
         aspect_ratio = current_width / current_height
@@ -425,29 +452,223 @@ class HighResolutionWireframeProcessor(WireframePortraitProcessor):
         
         if aspect_ratio > target_aspect:
             # Image is wider - fit width
-            new_width = target_width
-            new_height = int(target_width / aspect_ratio)
-        else:
-            # Image is taller - fit height
-            new_height = target_height
-            new_width = int(target_height * aspect_ratio)
-        
-        # Upscale using Lanczos interpolation which preserves edges better than
-        # simpler algorithms like bilinear.
-        upscaled = cv2.resize(
-            image,
-            (new_width, new_height),
-            interpolation=cv2.INTER_LANCZOS4
-        )
+            return target_width, int(target_width / aspect_ratio)
+        # Image is taller - fit height
+        return int(target_height * aspect_ratio), target_height
+    
+    def _upscale_image(self, image: np.ndarray, target_size: Tuple[int, int]) -> np.ndarray:
+        """
+        Resize the source photo to a canvas size with Lanczos interpolation
         
-        return upscaled
+        Only needed by layers that composite the photo itself at canvas
+        resolution; the wireframe layers never do.
+        """
+        # Lanczos preserves edges better than simpler algorithms like bilinear
+        return cv2.resize(image, target_size, interpolation=cv2.INTER_LANCZOS4)
     
-    def _process_full_image(self, image: np.ndarray, output_path: str = None) -> Dict[str, np.ndarray]:
+    def _process_full_image(self, image: np.ndarray, output_path: str = None,
+                            canvas_size: Optional[Tuple[int, int]] = None) -> Dict[str, np.ndarray]:
         """Process full image at high resolution"""
-        return self.process_image_from_array(image, output_path)
+        return self.process_image_from_array(image, output_path, canvas_size)
     
-    def process_image_from_array(self, image: np.ndarray, output_path: str = None) -> Dict[str, np.ndarray]:
-        """Process image array (used by parent class)"""
+    def _process_tiled_image(self, image: np.ndarray, output_path: str = None,
+                             canvas_size: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """
+        Render a very large canvas tile by tile and stream it to disk
+        
+        Landmarks are detected once on the whole image. The canvas is then
+        split into overlapping tiles (``tile_size``, ``tile_overlap``); each
+        tile gets its own DexiNed pass and its own vector layers, drawn in
+        full-canvas coordinates. Overlaps are cross-faded so no seams show.
+        Finished rows of tiles are written straight into the PNG, so only one
+        row of tiles is held in memory.
+        
+        Args:
+            image: Source image (any resolution)
+            output_path: Output path; PNGs are streamed, other formats are
+                assembled in memory and saved at the end
+            canvas_size: Output (width, height); defaults to the image size
+            
+        Returns:
+            Results with ``landmarks``, ``tiles`` and ``output_path``; the
+            assembled image (``final_rgba``/``final_rgb``) is only included
+            when it had to be assembled anyway
+        """
+        landmarks, detection_result = self._detect_landmarks(image)
+        if not landmarks:
+            print("No face detected in image")
+            return {}
+        
+        width, height = canvas_size or (image.shape[1], image.shape[0])
+        tile_width, tile_height = self.config.tile_size
+        # Cross-fades from both sides of a tile must not meet
+        overlap = max(1, min(self.config.tile_overlap, tile_width // 2, tile_height // 2))
+        xs = self._tile_starts(width, tile_width, overlap)
+        ys = self._tile_starts(height, tile_height, overlap)
+        channels = 4 if self.config.output_format == "rgba" else 3
+        print(f"Tiled processing: {len(xs)}x{len(ys)} tiles of {tile_width}x{tile_height} "
+              f"(overlap {overlap}px, {self.config.tile_workers} worker(s))")
+        
+        writer = None
+        bands = []
+        if output_path and output_path.lower().endswith('.png'):
+            writer = StreamingPNGWriter(output_path, width, height, channels)
+        
+        workers = max(1, self.config.tile_workers)
+        executor = ThreadPoolExecutor(workers) if workers > 1 else None
+        if executor and self.dexined_generator:
+            # The stage profiler is not thread-safe; time whole rows instead
+            tile_profiler, self.dexined_generator.profiler = self.dexined_generator.profiler, StageProfiler()
+        
+        try:
+            carry = None
+            for row, y0 in enumerate(ys):
+                with self.profiler.stage('tile_row'):
+                    y1 = min(y0 + tile_height, height)
+                    regions = [(x0, y0, min(x0 + tile_width, width), y1) for x0 in xs]
+                    render = partial(self._render_tile, image, landmarks, detection_result,
+                                     (width, height))
+                    tiles = list(executor.map(render, regions) if executor else map(render, regions))
+                    
+                    # Stitch the row, cross-fading horizontal overlaps
+                    band = np.empty((y1 - y0, width, channels), dtype=np.uint8)
+                    previous_end = 0
+                    for (x0, _, x1, _), tile in zip(regions, tiles):
+                        if x0 < previous_end:
+                            band[:, x0:previous_end] = self._cross_fade(
+                                band[:, x0:previous_end], tile[:, :previous_end - x0], axis=1
+                            )
+                        band[:, previous_end:x1] = tile[:, previous_end - x0:]
+                        previous_end = x1
+                    
+                    # Cross-fade with the bottom overlap of the previous row
+                    if carry is not None:
+                        band[:len(carry)] = self._cross_fade(carry, band[:len(carry)], axis=0)
+                    
+                    # Rows above the next row's overlap are final
+                    done = (ys[row + 1] - y0) if row + 1 < len(ys) else len(band)
+                    if writer:
+                        writer.write_rows(band[:done])
+                    else:
+                        bands.append(band[:done])
+                    carry = band[done:].copy()
+            
+            if writer:
+                writer.close()
+                print(f"High-quality wireframe saved to: {output_path}")
+        except BaseException:
+            if writer:
+                writer.abort()
+            raise
+        finally:
+            if executor:
+                executor.shutdown()
+                if self.dexined_generator:
+                    self.dexined_generator.profiler = tile_profiler
+        
+        results = {
+            'landmarks': landmarks,
+            'tiles': len(xs) * len(ys),
+            'output_path': output_path,
+        }
+        if not writer:
+            final_result = np.vstack(bands)
+            results['final_rgba' if channels == 4 else 'final_rgb'] = final_result
+            if output_path:
+                self._save_high_quality_image(final_result, output_path)
+        return results
+    
+    @staticmethod
+    def _tile_starts(length: int, tile: int, overlap: int) -> List[int]:
+        """Start offsets of tiles covering ``length`` with exactly ``overlap`` shared pixels"""
+        step = max(1, tile - overlap)
+        starts = [0]
+        while starts[-1] + tile < length:
+            starts.append(starts[-1] + step)
+        return starts
+    
+    @staticmethod
+    def _cross_fade(fading_out: np.ndarray, fading_in: np.ndarray, axis: int) -> np.ndarray:
+        """Linearly blend two overlapping strips along ``axis``"""
+        length = fading_out.shape[axis]
+        shape = [1] * fading_out.ndim
+        shape[axis] = length
+        ramp = ((np.arange(length, dtype=np.float32) + 0.5) / length).reshape(shape)
+        blended = fading_out * (1.0 - ramp) + fading_in * ramp
+        return np.rint(blended).astype(np.uint8)
+    
+    def _render_tile(self, image: np.ndarray, landmarks, detection_result,
+                     canvas_size: Tuple[int, int],
+                     region: Tuple[int, int, int, int]) -> np.ndarray:
+        """
+        Render every enabled layer for one tile
+        
+        Args:
+            image: Source image (any resolution)
+            landmarks: Face landmarks (normalized, full canvas)
+            detection_result: Face detection result
+            canvas_size: Full canvas (width, height)
+            region: (x0, y0, x1, y1) of the tile on the canvas
+            
+        Returns:
+            Tile in the output format (RGBA or RGB)
+        """
+        x0, y0, x1, y1 = region
+        offset = (x0, y0)
+        tile = np.full((y1 - y0, x1 - x0, 3), 255, dtype=np.uint8)
+        
+        # Same layer order as process_image_from_array
+        if self.config.enable_construction_lines:
+            tile = self.construction_generator.draw_construction_lines(
+                tile, landmarks, self.config, canvas_size=canvas_size, offset=offset
+            )
+        
+        if self.config.enable_mesh:
+            tile = self.mesh_generator.draw_face_mesh(
+                tile, detection_result, self.config, canvas_size=canvas_size, offset=offset
+            )
+        
+        if self.config.enable_dexined_outline and self.dexined_generator:
+            # Source pixels covering the tile, rendered at canvas scale
+            scale_x = image.shape[1] / canvas_size[0]
+            scale_y = image.shape[0] / canvas_size[1]
+            sx0, sy0 = int(x0 * scale_x), int(y0 * scale_y)
+            sx1 = min(image.shape[1], math.ceil(x1 * scale_x))
+            sy1 = min(image.shape[0], math.ceil(y1 * scale_y))
+            cx0, cy0 = int(sx0 / scale_x), int(sy0 / scale_y)
+            cx1, cy1 = max(x1, round(sx1 / scale_x)), max(y1, round(sy1 / scale_y))
+            edge_mask = self.dexined_generator.generate_edge_mask(
+                image[sy0:sy1, sx0:sx1], self.config, target_shape=(cy1 - cy0, cx1 - cx0)
+            )
+            self._paint_edges(tile, edge_mask[y0 - cy0:y1 - cy0, x0 - cx0:x1 - cx0])
+        
+        if self.config.output_format == "rgba":
+            tile = BackgroundRemover.create_wireframe_rgba(
+                tile, landmarks, self.config.background_removal_method,
+                canvas_size=canvas_size, offset=offset
+            )
+        return tile
+    
+    def _paint_edges(self, canvas: np.ndarray, edge_mask: np.ndarray):
+        """Colourize an edge mask onto an RGB canvas in place"""
+        # White edges would only erase lines underneath them
+        if max(self.config.dexined_color) < LayeredCanvas.WHITE_LEVEL:
+            canvas[edge_mask > 0] = self.config.dexined_color
+    
+    def process_image_from_array(self, image: np.ndarray, output_path: str = None,
+                                 canvas_size: Optional[Tuple[int, int]] = None) -> Dict[str, np.ndarray]:
+        """
+        Process image array (used by parent class)
+        
+        Args:
+            image: Source image; detection and edges run at its resolution
+            output_path: Optional path to save result
+            canvas_size: Output (width, height); defaults to the image size.
+                Vector layers are rasterized directly at this size.
+            
+        Returns:
+            Dictionary containing generated images and intermediate steps
+        """
         # Detect landmarks
         landmarks, detection_result = self._detect_landmarks(image)
         if not landmarks:
@@ -460,7 +681,7 @@ class HighResolutionWireframeProcessor(WireframePortraitProcessor):
         }
         
         # Start with high-resolution blank canvas
-        height, width = image.shape[:2]
+        width, height = canvas_size or (image.shape[1], image.shape[0])
         # Work on a pure white canvas so only the generated lines are visible
         # in the final result.
         current_image = np.ones((height, width, 3), dtype=np.uint8) * 255
@@ -479,10 +700,11 @@ class HighResolutionWireframeProcessor(WireframePortraitProcessor):
             results['mesh'] = current_image.copy()
         
         if self.config.enable_dexined_outline and self.dexined_generator:
-            outline_image = self.dexined_generator.generate_outline(image, self.config)
-            # Overlay only the extracted lines, ignoring the white background
-            # produced by DexiNed.
-            current_image = self._add_lines_to_canvas(current_image, outline_image)
+            edge_mask = self.dexined_generator.generate_edge_mask(
+                image, self.config, target_shape=(height, width)
+            )
+            # Colour only the edge pixels, directly on the canvas
+            self._paint_edges(current_image, edge_mask)
             results['dexined_outline'] = current_image.copy()
         
         # Create high-resolution transparent output
@@ -602,10 +824,21 @@ def main():
     parser.add_argument('--dexined-model', 
                        default='DexiNed/checkpoints/BIPED/10/10_model.pth',
                        help='Path to DexiNed model')
+    parser.add_argument('--dexined-backend', choices=['torch', 'onnx'], default='torch',
+                       help='DexiNed inference backend (onnx runs an exported model with ONNX Runtime)')
+    parser.add_argument('--dexined-onnx',
+                       help='Exported DexiNed ONNX model (default: checkpoint path with .onnx)')
+    parser.add_argument('--dexined-mode', choices=['fp32', 'cpu_fast'], default='fp32',
+                       help='PyTorch DexiNed variant (cpu_fast: INT8 conv blocks, channels_last)')
     parser.add_argument('--enable-super-resolution', action='store_true',
                        help='Enable multi-scale super-resolution processing')
     parser.add_argument('--tile-processing', action='store_true',
                        help='Enable tile-based processing for extremely large images')
+    parser.add_argument('--tile-workers', type=int, default=1,
+                       help='Tiles rendered in parallel threads (default: 1)')
+    parser.add_argument('--detection-max-side', type=int, default=DEFAULT_MAX_SIDE,
+                       help='Longest side of the downscaled copy landmark detectors run on '
+                            f'(0 = full resolution, default: {DEFAULT_MAX_SIDE})')
     
     args = parser.parse_args()
     
@@ -638,6 +871,13 @@ def main():
     
     # Set DexiNed model path
     config.dexined_model_path = os.path.abspath(args.dexined_model)
+    config.dexined_backend = args.dexined_backend
+    config.dexined_onnx_path = args.dexined_onnx or ""
+    config.dexined_mode = args.dexined_mode
+    config.tile_workers = max(1, args.tile_workers)
+    config.detection_max_side = max(0, args.detection_max_side)
+    if args.tile_processing:
+        config.tile_processing = True
     
     # Process image
     processor = HighResolutionWireframeProcessor(config)
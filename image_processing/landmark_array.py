@@ -0,0 +1,100 @@
+"""
+Array-backed Landmarks for Wireframe Portrait Processing
+Compact container for MediaPipe face/pose landmarks so drawing and export code
+can use vectorized indexing instead of reading landmark objects one attribute
+at a time.
+"""
+
+from typing import Dict, Iterator, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class CachedLandmark(NamedTuple):
+    """Single landmark (same x/y/z fields as MediaPipe landmark objects)"""
+    x: float
+    y: float
+    z: float
+
+
+class LandmarkArray:
+    """Landmarks stored as a float32 (N, 3) array of normalized x/y/z.
+
+    Pixel coordinates are computed once per canvas size and cached. Indexing
+    and iteration yield :class:`CachedLandmark` objects, so code written for
+    MediaPipe landmark lists keeps working unchanged.
+    """
+
+    __slots__ = ('coords', '_pixel_cache')
+
+    def __init__(self, coords: np.ndarray):
+        """
+        Initialize landmark array.
+
+        Args:
+            coords: Normalized landmark coordinates, shape (N, 3)
+        """
+        self.coords = np.ascontiguousarray(coords, dtype=np.float32).reshape(-1, 3)
+        self._pixel_cache: Dict[Tuple[int, int], np.ndarray] = {}
+
+    @classmethod
+    def from_landmarks(cls, landmarks: Optional[Sequence]) -> Optional['LandmarkArray']:
+        """
+        Convert MediaPipe landmarks once per detection
+
+        Args:
+            landmarks: MediaPipe landmark list, an existing LandmarkArray or None
+
+        Returns:
+            LandmarkArray, or None when there are no landmarks
+        """
+        if landmarks is None or isinstance(landmarks, cls):
+            return landmarks if landmarks else None
+        if len(landmarks) == 0:
+            return None
+        return cls(np.array([[lm.x, lm.y, lm.z] for lm in landmarks], dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def __getitem__(self, idx: int) -> CachedLandmark:
+        x, y, z = self.coords[idx].tolist()
+        return CachedLandmark(x, y, z)
+
+    def __iter__(self) -> Iterator[CachedLandmark]:
+        for x, y, z in self.coords.tolist():
+            yield CachedLandmark(x, y, z)
+
+    def normalized(self) -> np.ndarray:
+        """Normalized coordinates as float64 (N, 3), as used by the SVG exporter"""
+        return self.coords.astype(np.float64)
+
+    def pixels(self, width: int, height: int) -> np.ndarray:
+        """
+        Pixel coordinates for a canvas size (cached per size)
+
+        Matches ``int(landmark.x * width)`` on the original landmark objects,
+        i.e. products are computed in float64 and truncated toward zero.
+
+        Args:
+            width: Canvas width in pixels
+            height: Canvas height in pixels
+
+        Returns:
+            Read-only int32 array of shape (N, 2) with (x, y) per landmark
+        """
+        key = (int(width), int(height))
+        pixels = self._pixel_cache.get(key)
+        if pixels is None:
+            scaled = self.coords[:, :2].astype(np.float64) * key
+            pixels = np.trunc(scaled).astype(np.int32)
+            pixels.setflags(write=False)
+            self._pixel_cache[key] = pixels
+        return pixels
+
+    def pixel_points(self, width: int, height: int,
+                     indices: Union[Sequence[int], np.ndarray]) -> np.ndarray:
+        """Pixel coordinates for a subset of landmarks, skipping out-of-range indices"""
+        indices = np.asarray(indices, dtype=np.int64)
+        return self.pixels(width, height)[indices[indices < len(self)]]
+
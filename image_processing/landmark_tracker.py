@@ -0,0 +1,184 @@
+"""
+Landmark Tracker for Wireframe Portrait Processing
+Propagates face and pose landmarks from one video frame to the next with
+pyramidal Lucas-Kanade optical flow, so the full landmarkers only run on
+keyframes: every ``keyframe_interval`` frames, or earlier when tracking
+quality drops.
+
+Tracking quality is measured with a forward-backward check: every point is
+tracked to the new frame and back again, and the distance to where it
+started is its drift. A frame is handed back to the detectors when the
+median drift exceeds ``max_drift`` or too few points survive the check.
+
+To stay well below the landmarkers' cost, only an evenly spread subset of
+``max_points`` landmarks goes through optical flow and the remaining
+landmarks follow a similarity transform fitted to the tracked subset.
+"""
+
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from landmark_array import LandmarkArray
+
+DEFAULT_KEYFRAME_INTERVAL = 10
+DEFAULT_MAX_DRIFT = 2.0
+DEFAULT_MIN_TRACKED = 0.8
+DEFAULT_MAX_POINTS = 96
+
+
+class LandmarkTracker:
+    """Keyframe scheduler and Lucas-Kanade tracker for landmark sets.
+
+    Usage per frame (``gray`` is the grayscale frame, at any fixed size)::
+
+        if tracker.needs_keyframe():
+            landmarks = detect(frame)
+            tracker.reset(gray, {'face': landmarks})
+        else:
+            landmarks = tracker.track(gray)  # None: tracking lost
+            if landmarks is None:
+                ...  # detect and reset as on a keyframe
+
+    Landmark sets are tracked together in one optical-flow call. Tracked
+    points that pass the forward-backward check move with the flow; all
+    other points (untracked, lost, or outside the frame) follow the
+    similarity transform fitted to the tracked points of their set. z
+    coordinates are kept from the keyframe.
+    """
+
+    def __init__(self, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+                 max_drift: float = DEFAULT_MAX_DRIFT,
+                 min_tracked: float = DEFAULT_MIN_TRACKED,
+                 max_points: int = DEFAULT_MAX_POINTS,
+                 window_size: int = 11, pyramid_levels: int = 3):
+        """
+        Initialize tracker.
+
+        Args:
+            keyframe_interval: Frames between full detections (1 = detect
+                every frame)
+            max_drift: Median forward-backward error, in pixels of the
+                tracked frames, above which tracking is treated as lost
+            min_tracked: Fraction of in-frame points that must pass the
+                forward-backward check
+            max_points: Landmarks per set that go through optical flow
+                (0 = all of them)
+            window_size: Lucas-Kanade search window in pixels
+            pyramid_levels: Image pyramid levels above the base image
+        """
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.max_drift = max_drift
+        self.min_tracked = min_tracked
+        self.max_points = max_points
+        self.window_size = (window_size, window_size)
+        self.pyramid_levels = pyramid_levels
+        self.criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+
+        self._gray: Optional[np.ndarray] = None
+        self._landmarks: Dict[str, LandmarkArray] = {}
+        self.frames_since_keyframe = 0
+        self.last_drift = 0.0
+        self.last_tracked = 1.0
+
+    @property
+    def active(self) -> bool:
+        """Whether there are landmarks to propagate"""
+        return self._gray is not None and bool(self._landmarks)
+
+    def needs_keyframe(self) -> bool:
+        """Whether the next frame should run the full detectors"""
+        return not self.active or self.frames_since_keyframe + 1 >= self.keyframe_interval
+
+    def reset(self, gray: np.ndarray, landmark_sets: Dict[str, Optional[LandmarkArray]]):
+        """
+        Start tracking from freshly detected landmarks (a keyframe)
+
+        Args:
+            gray: Grayscale keyframe
+            landmark_sets: Detected landmarks by name (e.g. 'face', 'pose');
+                None entries are not tracked
+        """
+        self._gray = gray
+        self._landmarks = {name: landmarks for name, landmarks in landmark_sets.items() if landmarks}
+        self.frames_since_keyframe = 0
+        self.last_drift = 0.0
+        self.last_tracked = 1.0
+
+    def _flow(self, source: np.ndarray, target: np.ndarray, points: np.ndarray) -> tuple:
+        """Lucas-Kanade flow of ``points`` between two grayscale frames"""
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(
+            source, target, points, None, winSize=self.window_size,
+            maxLevel=self.pyramid_levels, criteria=self.criteria
+        )
+        return moved, status.ravel() == 1
+
+    def _sample(self, count: int) -> np.ndarray:
+        """Indices of the evenly spread landmarks that go through optical flow"""
+        if not self.max_points or count <= self.max_points:
+            return np.arange(count)
+        return np.linspace(0, count - 1, self.max_points).round().astype(np.int64)
+
+    def track(self, gray: np.ndarray) -> Optional[Dict[str, LandmarkArray]]:
+        """
+        Propagate the landmarks to the next frame
+
+        Args:
+            gray: Grayscale frame, same size as the keyframe
+
+        Returns:
+            Tracked landmarks by name, or None when tracking quality is too
+            low (the caller should detect a new keyframe)
+        """
+        if not self.active:
+            return None
+
+        height, width = gray.shape[:2]
+        scale = np.array([width, height], dtype=np.float32)
+        names = list(self._landmarks)
+        counts = [len(self._landmarks[name]) for name in names]
+        points = np.concatenate([self._landmarks[name].coords[:, :2] for name in names]) * scale
+
+        # Evenly spread subset of each set, restricted to points in the frame
+        offsets = np.cumsum([0] + counts[:-1])
+        sample = np.concatenate([offset + self._sample(count) for offset, count in zip(offsets, counts)])
+        sample = sample[((points[sample] >= 0) & (points[sample] < scale)).all(axis=1)]
+        if len(sample) < 3:
+            return None
+
+        start = points[sample].reshape(-1, 1, 2).astype(np.float32)
+        forward, status = self._flow(self._gray, gray, start)
+        backward, back_status = self._flow(gray, self._gray, forward)
+
+        drift = np.linalg.norm((backward - start).reshape(-1, 2), axis=1)
+        good = status & back_status
+        self.last_tracked = float(good.mean())
+        self.last_drift = float(np.median(drift[good])) if good.any() else float('inf')
+        if self.last_tracked < self.min_tracked or self.last_drift > self.max_drift:
+            return None
+
+        # Outliers of an otherwise good frame do not move their landmark
+        good &= drift <= max(self.max_drift * 2.0, 1.0)
+        forward = forward.reshape(-1, 2)
+
+        tracked = {}
+        for name, offset, count in zip(names, offsets, counts):
+            in_set = good & (sample >= offset) & (sample < offset + count)
+            if in_set.sum() < 3:
+                return None
+            source, target = points[sample[in_set]], forward[in_set]
+            transform, _ = cv2.estimateAffinePartial2D(source, target, method=cv2.LMEDS)
+            if transform is None:
+                return None
+
+            moved = points[offset:offset + count] @ transform[:, :2].T + transform[:, 2]
+            moved[sample[in_set] - offset] = target
+            coords = self._landmarks[name].coords.copy()
+            coords[:, :2] = moved / scale
+            tracked[name] = LandmarkArray(coords)
+
+        self._gray = gray
+        self._landmarks = tracked
+        self.frames_since_keyframe += 1
+        return tracked
@@ -0,0 +1,140 @@
+"""
+Streaming PNG Writer for Wireframe Portrait Processing
+Writes a PNG band by band (rows are filtered, deflated and emitted as IDAT
+chunks as they arrive), so tiled high-resolution jobs never need the whole
+output image in memory.
+"""
+
+import os
+import struct
+import zlib
+from typing import Optional
+
+import numpy as np
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+COLOR_TYPES = {3: 2, 4: 6}  # channels -> PNG colour type (RGB, RGBA)
+IDAT_CHUNK_BYTES = 1 << 20  # Flush compressed data in ~1MB chunks
+FILTER_UP = 2
+
+
+class StreamingPNGWriter:
+    """Incremental 8-bit RGB/RGBA PNG writer.
+
+    Usage::
+
+        with StreamingPNGWriter(path, width, height, channels=4) as writer:
+            for band in bands:  # (rows, width, 4) uint8, top to bottom
+                writer.write_rows(band)
+
+    The file is written under a temporary name and moved into place once
+    every row has been written, so readers never see a partial image.
+    """
+
+    def __init__(self, path: str, width: int, height: int, channels: int = 4,
+                 compression: int = 1):
+        """
+        Initialize writer.
+
+        Args:
+            path: Output PNG path
+            width: Image width in pixels
+            height: Image height in pixels
+            channels: 3 (RGB) or 4 (RGBA)
+            compression: zlib level (1 favours speed, like the raster export)
+        """
+        if channels not in COLOR_TYPES:
+            raise ValueError(f"Unsupported channel count for PNG: {channels}")
+        self.path = path
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.rows_written = 0
+
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self._temp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._temp_path, 'wb')
+        self._compressor = zlib.compressobj(compression)
+        self._pending = []
+        self._pending_bytes = 0
+        self._previous_row: Optional[np.ndarray] = None
+
+        self._file.write(PNG_SIGNATURE)
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8,
+                                               COLOR_TYPES[channels], 0, 0, 0))
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes):
+        """Write one length/type/data/CRC chunk"""
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(chunk_type + data) & 0xFFFFFFFF))
+
+    def _queue_compressed(self, data: bytes, flush: bool = False):
+        """Collect compressed bytes and emit them as IDAT chunks"""
+        if data:
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+        if self._pending_bytes >= IDAT_CHUNK_BYTES or (flush and self._pending_bytes):
+            self._write_chunk(b'IDAT', b''.join(self._pending))
+            self._pending = []
+            self._pending_bytes = 0
+
+    def write_rows(self, rows: np.ndarray):
+        """
+        Append rows to the image
+
+        Args:
+            rows: uint8 array of shape (n, width, channels), next rows from the top
+        """
+        if rows.shape[1:] != (self.width, self.channels):
+            raise ValueError(f"Expected rows of shape (n, {self.width}, {self.channels}), got {rows.shape}")
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("More rows written than the PNG height")
+        if len(rows) == 0:
+            return
+
+        flat = np.ascontiguousarray(rows, dtype=np.uint8).reshape(len(rows), -1)
+        # "Up" filter: each row minus the row above (mostly zeros for line art)
+        above = np.empty_like(flat)
+        above[0] = self._previous_row if self._previous_row is not None else 0
+        above[1:] = flat[:-1]
+        scanlines = np.empty((len(rows), flat.shape[1] + 1), dtype=np.uint8)
+        scanlines[:, 0] = FILTER_UP
+        np.subtract(flat, above, out=scanlines[:, 1:])
+
+        self._queue_compressed(self._compressor.compress(scanlines.tobytes()))
+        self._previous_row = flat[-1].copy()
+        self.rows_written += len(rows)
+
+    def close(self):
+        """Finish the file and move it into place"""
+        if self._file is None:
+            return
+        if self.rows_written != self.height:
+            self.abort()
+            raise ValueError(f"PNG closed after {self.rows_written} of {self.height} rows")
+        self._queue_compressed(self._compressor.flush(), flush=True)
+        self._write_chunk(b'IEND', b'')
+        self._file.close()
+        self._file = None
+        os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        """Discard the partially written file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+
+    def __enter__(self) -> 'StreamingPNGWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
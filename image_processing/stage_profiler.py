@@ -0,0 +1,232 @@
+"""
+Stage Profiler for Wireframe Portrait Processing
+Records wall time, CPU time and peak RSS for each pipeline stage (image load,
+detection, DexiNed, layer rendering, export), optionally per-stage peak
+memory, and can append them as JSON lines to a trace file.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _max_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    divisor = 1024 * 1024 if os.uname().sysname == 'Darwin' else 1024
+    return max_rss / divisor
+
+
+class _StageFrame:
+    """Bookkeeping for one stage that is currently running"""
+    __slots__ = ('name', 'wall_start', 'cpu_start', 'traced_start', 'traced_peak')
+
+    def __init__(self, name: str, traced_start: int):
+        self.name = name
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.traced_start = traced_start
+        self.traced_peak = traced_start
+
+
+class StageProfiler:
+    """Collects per-stage timings for one image at a time.
+
+    Usage::
+
+        profiler.begin(image_path)
+        with profiler.stage('face_detect'):
+            ...
+        timings = profiler.finish()
+
+    ``timings`` maps each stage name to ``calls``, ``wall_ms``, ``cpu_ms``,
+    ``max_rss_mb`` and ``peak_mb``; a stage entered several times (e.g. once
+    per preset) accumulates its times and keeps the largest peaks. Stages may
+    nest.
+
+    ``max_rss_mb`` is the process-wide peak RSS when the stage ended, which
+    costs nothing to read. ``peak_mb`` is the stage's own peak, measured with
+    :mod:`tracemalloc` as the increase over the memory in use when the stage
+    started; it covers Python and NumPy allocations (not PyTorch's or ONNX
+    Runtime's own allocators). Tracing slows allocation-heavy stages down
+    several times, so it only runs with ``track_memory`` and only between
+    :meth:`begin` and :meth:`finish`; ``peak_mb`` is 0 otherwise.
+    """
+
+    def __init__(self, enabled: bool = False, track_memory: bool = False,
+                 trace_path: str = ""):
+        """
+        Initialize profiler.
+
+        Args:
+            enabled: Record timings (when False, stages cost almost nothing)
+            track_memory: Measure per-stage peak memory with tracemalloc
+                (slow; implies ``enabled``)
+            trace_path: Optional JSON-lines file each finished stage is appended to
+        """
+        self.enabled = enabled or track_memory or bool(trace_path)
+        self.track_memory = track_memory
+        self.trace_path = trace_path
+        self.image_path = ""
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self._stack: List[_StageFrame] = []
+        self._trace_records: List[dict] = []
+        # Whether this profiler started tracemalloc (and so has to stop it)
+        self._started_tracing = False
+
+    def begin(self, image_path: str = ""):
+        """Start collecting timings for a new image"""
+        self.image_path = image_path
+        self.timings = {}
+        self._stack = []
+        self._trace_records = []
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage ``name``"""
+        if not self.enabled:
+            yield
+            return
+
+        traced_start = 0
+        if self.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is about to be reset; hand what the enclosing stage has
+            # seen so far to it first.
+            if self._stack:
+                parent = self._stack[-1]
+                parent.traced_peak = max(parent.traced_peak, peak)
+            tracemalloc.reset_peak()
+            traced_start = current
+
+        frame = _StageFrame(name, traced_start)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            self._record(frame)
+
+    def _record(self, frame: _StageFrame):
+        """Store the measurements of a finished stage"""
+        wall_ms = (time.perf_counter() - frame.wall_start) * 1000.0
+        cpu_ms = (time.process_time() - frame.cpu_start) * 1000.0
+        peak_mb = 0.0
+        if self.track_memory and tracemalloc.is_tracing():
+            traced_peak = max(frame.traced_peak, tracemalloc.get_traced_memory()[1])
+            peak_mb = max(traced_peak - frame.traced_start, 0) / (1024 * 1024)
+            if self._stack:
+                parent = self._stack[-1]
+                parent.traced_peak = max(parent.traced_peak, traced_peak)
+
+        max_rss = _max_rss_mb()
+
+        entry = self.timings.setdefault(frame.name, _empty_entry())
+        entry['calls'] += 1
+        entry['wall_ms'] += wall_ms
+        entry['cpu_ms'] += cpu_ms
+        entry['max_rss_mb'] = max(entry['max_rss_mb'], max_rss or 0.0)
+        entry['peak_mb'] = max(entry['peak_mb'], peak_mb)
+
+        if self.trace_path:
+            record = {
+                'image': self.image_path,
+                'stage': frame.name,
+                'depth': len(self._stack),
+                'wall_ms': round(wall_ms, 3),
+                'cpu_ms': round(cpu_ms, 3),
+            }
+            if self.track_memory:
+                record['peak_mb'] = round(peak_mb, 3)
+            if max_rss is not None:
+                record['max_rss_mb'] = round(max_rss, 1)
+            self._trace_records.append(record)
+
+    def finish(self) -> Dict[str, Dict[str, float]]:
+        """
+        Finish the current image, writing its trace records (and stopping
+        tracemalloc if :meth:`begin` started it)
+
+        Returns:
+            Timing dictionary for the image
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        if self.trace_path and self._trace_records:
+            trace_dir = os.path.dirname(self.trace_path)
+            if trace_dir:
+                os.makedirs(trace_dir, exist_ok=True)
+            lines = ''.join(json.dumps(record) + '\n' for record in self._trace_records)
+            # One append per image keeps lines from concurrent batch workers intact
+            with open(self.trace_path, 'a') as f:
+                f.write(lines)
+            self._trace_records = []
+        return dict(self.timings)
+
+
+def _empty_entry() -> Dict[str, float]:
+    """Timing entry of a stage that has not run yet"""
+    return {'calls': 0, 'wall_ms': 0.0, 'cpu_ms': 0.0, 'max_rss_mb': 0.0, 'peak_mb': 0.0}
+
+
+def merge_timings(timings: Optional[Dict[str, Dict[str, float]]],
+                  other: Dict[str, Dict[str, float]],
+                  share: float = 1.0) -> Dict[str, Dict[str, float]]:
+    """
+    Add the stages of ``other`` (scaled by ``share``) to a timing dictionary
+
+    Used when one image's stages are recorded in several passes, e.g. when
+    DexiNed runs once for a whole batch and each image gets its share.
+
+    Args:
+        timings: Timing dictionary to add to (None starts from empty)
+        other: Timing dictionary to add
+        share: Fraction of ``other``'s wall and CPU times attributed to ``timings``
+
+    Returns:
+        New merged timing dictionary
+    """
+    merged = {name: dict(entry) for name, entry in (timings or {}).items()}
+    for name, entry in other.items():
+        target = merged.setdefault(name, _empty_entry())
+        target['calls'] += entry['calls']
+        target['wall_ms'] += entry['wall_ms'] * share
+        target['cpu_ms'] += entry['cpu_ms'] * share
+        target['max_rss_mb'] = max(target['max_rss_mb'], entry.get('max_rss_mb', 0.0))
+        target['peak_mb'] = max(target['peak_mb'], entry['peak_mb'])
+    return merged
+
+
+def format_timings(timings: Dict[str, Dict[str, float]]) -> str:
+    """Render a timing dictionary as an aligned text table
+
+    The per-stage ``Peak MB`` column only appears when memory was tracked.
+    """
+    if not timings:
+        return "No stage timings recorded"
+    width = max(len(name) for name in timings)
+    show_peak = any(entry['peak_mb'] > 0 for entry in timings.values())
+    header = f"{'Stage'.ljust(width)}  {'Calls':>5}  {'Wall ms':>10}  {'CPU ms':>10}  {'RSS MB':>8}"
+    lines = [header + (f"  {'Peak MB':>8}" if show_peak else "")]
+    for name, entry in timings.items():
+        line = (f"{name.ljust(width)}  {entry['calls']:>5}  {entry['wall_ms']:>10.1f}  "
+                f"{entry['cpu_ms']:>10.1f}  {entry.get('max_rss_mb', 0.0):>8.1f}")
+        if show_peak:
+            line += f"  {entry['peak_mb']:>8.1f}"
+        lines.append(line)
+    return '\n'.join(lines)
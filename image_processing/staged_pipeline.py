@@ -0,0 +1,223 @@
+"""
+Staged Pipeline for Wireframe Portrait Processing
+Runs a chain of processing stages (e.g. decode -> detect -> edge -> render ->
+write) on worker threads connected by bounded queues, so disk I/O, detection,
+inference and encoding of different images overlap. A full queue blocks the
+stage feeding it (backpressure), which keeps memory bounded and lets the
+slowest stage set the throughput instead of the sum of all stages.
+
+OpenCV, MediaPipe, PyTorch and ONNX Runtime release the GIL while they work,
+so threads are enough to keep several stages busy at once.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_QUEUE_SIZE = 4
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One pipeline stage.
+
+    ``make_handler`` is called once per worker thread (on that thread) and
+    returns the function the worker applies to its items, so workers can own
+    state that is not thread-safe, such as a MediaPipe detector. A
+    ``batched`` handler receives and returns lists of up to ``batch_size``
+    items: whatever is queued when the worker becomes free, so a busy
+    pipeline batches and an idle one does not wait for a full batch.
+    """
+    name: str
+    make_handler: Callable[[], Callable[[Any], Any]]
+    workers: int = 1
+    batched: bool = False
+    batch_size: int = 1
+
+
+@dataclass
+class StageStats:
+    """Work done by one stage over a pipeline run"""
+    name: str
+    workers: int
+    items: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def seconds_per_item(self) -> float:
+        """Worker time per item (busy time shared over the items)"""
+        return self.busy_seconds / self.items if self.items else 0.0
+
+    @property
+    def capacity(self) -> float:
+        """Items per second the stage sustains with all of its workers busy"""
+        if not self.busy_seconds:
+            return float('inf')
+        return self.items * self.workers / self.busy_seconds
+
+
+class StagedPipeline:
+    """Bounded-queue pipeline of :class:`Stage` objects.
+
+    Usage::
+
+        pipeline = StagedPipeline([Stage('load', lambda: load, workers=2),
+                                   Stage('work', lambda: work)])
+        for item, error in pipeline.run(items):
+            ...
+
+    Items leave the pipeline in completion order. An item whose handler
+    raises skips the remaining stages and comes out with the exception.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Initialize pipeline.
+
+        Args:
+            stages: Stages in processing order
+            queue_size: Capacity of the queue in front of each stage (in items)
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.stats: Dict[str, StageStats] = {}
+
+    def run(self, items: Iterable[Any]) -> Iterator[Tuple[Any, Optional[BaseException]]]:
+        """
+        Push items through every stage
+
+        Args:
+            items: Input items (consumed lazily by a feeder thread)
+
+        Yields:
+            ``(item, error)`` per input item as it completes; ``error`` is
+            None on success
+        """
+        queues = [queue.Queue(self.queue_size) for _ in self.stages]
+        output = queue.Queue(self.queue_size)
+        self.stats = {stage.name: StageStats(stage.name, max(1, stage.workers)) for stage in self.stages}
+        stats_lock = threading.Lock()
+
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]),
+                                    name='pipeline-feed', daemon=True)]
+        for index, stage in enumerate(self.stages):
+            if index + 1 < len(self.stages):
+                downstream, downstream_workers = queues[index + 1], max(1, self.stages[index + 1].workers)
+            else:
+                downstream, downstream_workers = output, 1
+            remaining = [max(1, stage.workers)]
+            for worker in range(remaining[0]):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[index], downstream, downstream_workers,
+                          output, remaining, stats_lock),
+                    name=f'pipeline-{stage.name}-{worker}', daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        while True:
+            entry = output.get()
+            if entry is _DONE:
+                break
+            yield entry
+
+        for thread in threads:
+            thread.join()
+
+    def _feed(self, items: Iterable[Any], first: queue.Queue):
+        """Feeder thread: queue every input item, then one end marker per worker"""
+        try:
+            for item in items:
+                first.put(item)
+        finally:
+            # Even if the input iterator fails, end the run instead of hanging
+            for _ in range(max(1, self.stages[0].workers)):
+                first.put(_DONE)
+
+    def _work(self, stage: Stage, inbox: queue.Queue, downstream: queue.Queue,
+              downstream_workers: int, output: queue.Queue,
+              remaining: List[int], stats_lock: threading.Lock):
+        """Worker thread: apply the stage to its items until the input ends"""
+        try:
+            handler = stage.make_handler()
+        except Exception as e:
+            # Fail this worker's items instead of stalling the pipeline
+            def handler(_, setup_error=e):
+                raise setup_error
+        is_last = downstream is output
+        finished = False
+
+        while not finished:
+            batch = [inbox.get()]
+            if batch[0] is _DONE:
+                break
+            # Batch whatever else is already waiting, without blocking
+            while stage.batched and len(batch) < stage.batch_size:
+                try:
+                    item = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    finished = True
+                    break
+                batch.append(item)
+
+            start = time.perf_counter()
+            try:
+                if stage.batched:
+                    results = list(handler(batch))
+                else:
+                    results = [handler(batch[0])]
+                error = None
+            except Exception as e:
+                results, error = batch, e
+            seconds = time.perf_counter() - start
+
+            with stats_lock:
+                stats = self.stats[stage.name]
+                stats.items += len(batch)
+                stats.busy_seconds += seconds
+
+            for item in results:
+                if error is not None:
+                    output.put((item, error))
+                elif is_last:
+                    output.put((item, None))
+                else:
+                    downstream.put(item)
+
+        # The last worker of a stage to finish closes the next stage's input
+        with stats_lock:
+            remaining[0] -= 1
+            last_worker = remaining[0] == 0
+        if last_worker:
+            for _ in range(downstream_workers):
+                downstream.put(_DONE)
+
+    def format_stats(self, wall_seconds: float = 0.0) -> str:
+        """
+        Per-stage report of the last run
+
+        Args:
+            wall_seconds: Wall time of the run, used for stage utilization
+
+        Returns:
+            Multi-line table; the stage with the lowest capacity is the bottleneck
+        """
+        lines = [f"  {'Stage':<10} {'Workers':>7} {'Items':>6} {'Busy s':>8} {'ms/item':>8} {'Util':>6}"]
+        bottleneck = min(self.stats.values(), key=lambda stats: stats.capacity, default=None)
+        for stats in self.stats.values():
+            utilization = stats.busy_seconds / (wall_seconds * stats.workers) if wall_seconds else 0.0
+            marker = "  <- bottleneck" if stats is bottleneck and stats.items else ""
+            lines.append(f"  {stats.name:<10} {stats.workers:>7} {stats.items:>6} "
+                         f"{stats.busy_seconds:>8.2f} {stats.seconds_per_item * 1000:>8.1f} "
+                         f"{utilization:>5.0%}{marker}")
+        return "\n".join(lines)
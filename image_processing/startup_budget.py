@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Start-up Budget for the Wireframe Portrait CLIs
+Measures how long the command-line tools take in a fresh interpreter and which
+heavy dependencies they load, for the runs that should stay light:
+
+- ``help``: ``--help`` of every CLI
+- ``construction``: a construction-lines-only run
+- ``svg``: an SVG-only run (construction lines, ``--output-format svg``)
+
+The two image runs are measured cold and with a warm geometry cache; a warm
+run reads its landmarks from disk and must not load MediaPipe at all. Every
+scenario has a wall-time budget (median of ``--repeats`` runs) and a list of
+modules it must not import. The script exits with status 1 when a scenario
+goes over its budget or imports one of them.
+
+Usage:
+  python startup_budget.py ../download_data/aic_sample/images/1.jpg
+  python startup_budget.py photo.jpg --repeats 5 --scale 2.0
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLIS = (
+    'wireframe_portrait_processor.py', 'high_resolution_wireframe_processor.py',
+    'batch_wireframe_processor.py', 'video_wireframe_processor.py'
+)
+HEAVY_MODULES = ('mediapipe', 'matplotlib', 'torch', 'onnxruntime', 'svg_generator')
+
+# Runs a CLI as __main__ and writes the top-level modules it imported to a file
+_PROBE = """
+import atexit, json, os, runpy, sys
+report, script = sys.argv[1], sys.argv[2]
+sys.argv = sys.argv[2:]
+sys.path.insert(0, os.path.dirname(script))
+def _report():
+    with open(report, 'w') as f:
+        json.dump(sorted({name.split('.')[0] for name in sys.modules}), f)
+atexit.register(_report)
+runpy.run_path(script, run_name='__main__')
+"""
+
+
+@dataclass
+class Scenario:
+    """One measured start-up case"""
+    name: str
+    script: str
+    args: List[str]
+    budget_ms: float
+    forbidden: Tuple[str, ...]
+
+
+@dataclass
+class Measurement:
+    """Result of one scenario"""
+    scenario: Scenario
+    median_ms: float
+    loaded: List[str]
+    returncode: int
+
+    @property
+    def violations(self) -> List[str]:
+        """Forbidden modules the scenario imported"""
+        return [name for name in self.scenario.forbidden if name in self.loaded]
+
+    @property
+    def passed(self) -> bool:
+        """Within budget, no forbidden imports and a clean exit"""
+        return (self.returncode == 0 and not self.violations
+                and self.median_ms <= self.scenario.budget_ms)
+
+
+def build_scenarios(image_path: Optional[str], work_dir: str, scale: float = 1.0) -> List[Scenario]:
+    """
+    Start-up scenarios and their budgets
+
+    Args:
+        image_path: Portrait for the image runs (None: only the ``--help`` cases)
+        work_dir: Directory for outputs and the warm geometry cache
+        scale: Multiplier applied to every budget (for slower machines)
+
+    Returns:
+        Scenarios in report order
+    """
+    # Neither --help nor a warm-cache run needs any detector, model or writer
+    # beyond OpenCV; cold runs may load MediaPipe (and with it matplotlib)
+    cold_forbidden = ('torch', 'onnxruntime')
+    scenarios = [
+        Scenario(f"help {os.path.splitext(script)[0]}", script, ['--help'],
+                 600 * scale, HEAVY_MODULES)
+        for script in CLIS
+    ]
+    if not image_path:
+        return scenarios
+
+    cache_dir = os.path.join(work_dir, 'cache')
+    construction = [image_path, '--construction-lines', '--quiet',
+                    '-o', os.path.join(work_dir, 'construction.png')]
+    svg = [image_path, '--construction-lines', '--output-format', 'svg', '--quiet',
+           '-o', os.path.join(work_dir, 'construction.svg')]
+    cached = ['--cache-dir', cache_dir]
+    script = 'wireframe_portrait_processor.py'
+    scenarios += [
+        Scenario("construction lines", script, construction,
+                 2000 * scale, cold_forbidden + ('svg_generator',)),
+        Scenario("construction lines, cached", script, construction + cached,
+                 700 * scale, HEAVY_MODULES),
+        Scenario("svg only", script, svg, 2000 * scale, cold_forbidden),
+        Scenario("svg only, cached", script, svg + cached,
+                 700 * scale, tuple(name for name in HEAVY_MODULES if name != 'svg_generator')),
+    ]
+    return scenarios
+
+
+def _run_once(scenario: Scenario, report_path: str) -> Tuple[float, int]:
+    """Run a scenario in a fresh interpreter; returns (wall ms, exit code)"""
+    command = [sys.executable, '-c', _PROBE, report_path,
+               os.path.join(HERE, scenario.script)] + scenario.args
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=HERE, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000, completed.returncode
+
+
+def measure(scenario: Scenario, repeats: int = 3) -> Measurement:
+    """
+    Median wall time and imported modules of a scenario
+
+    Args:
+        scenario: Scenario to run
+        repeats: Measured runs (after one warm-up run)
+
+    Returns:
+        Measurement of the scenario
+    """
+    report_path = os.path.join(tempfile.gettempdir(), f"startup_budget_{os.getpid()}.json")
+    # The warm-up run fills the OS file cache and, for cached scenarios, the
+    # geometry cache; cold scenarios run without one, so they stay cold
+    _run_once(scenario, report_path)
+    timings, returncode = [], 0
+    for _ in range(max(1, repeats)):
+        elapsed_ms, code = _run_once(scenario, report_path)
+        timings.append(elapsed_ms)
+        returncode = returncode or code
+
+    loaded = []
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            loaded = json.load(f)
+        os.remove(report_path)
+    timings.sort()
+    return Measurement(scenario, timings[len(timings) // 2], loaded, returncode)
+
+
+def main():
+    """Measure CLI start-up against the budget"""
+    parser = argparse.ArgumentParser(description='Wireframe CLI start-up budget')
+    parser.add_argument('image', nargs='?',
+                       help='Portrait for the construction-lines and SVG runs '
+                            '(without it only --help is measured)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per scenario')
+    parser.add_argument('--scale', type=float, default=1.0,
+                       help='Multiply every budget by this (for slower machines)')
+    args = parser.parse_args()
+
+    if args.image and not os.path.exists(args.image):
+        print(f"Image not found: {args.image}")
+        sys.exit(1)
+
+    work_dir = tempfile.mkdtemp(prefix='startup_budget_')
+    try:
+        image_path = os.path.abspath(args.image) if args.image else None
+        measurements = [measure(scenario, args.repeats)
+                        for scenario in build_scenarios(image_path, work_dir, args.scale)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n{'Scenario':<46} {'ms':>7} {'Budget':>7}  Heavy modules loaded")
+    for measurement in measurements:
+        heavy = [name for name in HEAVY_MODULES if name in measurement.loaded]
+        status = "✓" if measurement.passed else "❌"
+        print(f"{status} {measurement.scenario.name:<44} {measurement.median_ms:>7.0f} "
+              f"{measurement.scenario.budget_ms:>7.0f}  {', '.join(heavy) or '-'}")
+        if measurement.returncode:
+            print(f"    exited with status {measurement.returncode}")
+        if measurement.violations:
+            print(f"    must not import: {', '.join(measurement.violations)}")
+
+    if not all(measurement.passed for measurement in measurements):
+        print("\n❌ Start-up budget exceeded")
+        sys.exit(1)
+    print("\n✅ All start-up scenarios within budget")
+
+
+if __name__ == '__main__':
+    main()
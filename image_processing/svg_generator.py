@@ -45,6 +45,14 @@ class SVGGenerator:
 
         return svg
     
+    def _to_pixels(self, landmarks: np.ndarray) -> List[List[int]]:
+        """Convert normalized (N, 2+) landmarks to integer pixel coordinates"""
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        if landmarks.size == 0:
+            return []
+        scaled = landmarks[:, :2] * (self.width, self.height)
+        return np.trunc(scaled).astype(np.int64).tolist()
+    
     def add_construction_lines(self, landmarks: np.ndarray, config: dict):
         """
         Add construction lines to SVG based on actual face landmarks.
@@ -61,7 +69,7 @@ class SVGGenerator:
         
         # MediaPipe landmarks are normalized [0,1]. Convert them to absolute
         # pixel coordinates for the SVG canvas.
-        pixel_landmarks = [(int(lm[0] * self.width), int(lm[1] * self.height)) for lm in landmarks]
+        pixel_landmarks = self._to_pixels(landmarks)
         
         def get_pixel_coords(landmark_idx):
             """Get pixel coordinates for a landmark index"""
@@ -126,7 +134,7 @@ class SVGGenerator:
         thickness = config.get('thickness', 1)
         
         # Convert normalized coordinates to pixel coordinates
-        pixel_landmarks = [(int(lm[0] * self.width), int(lm[1] * self.height)) for lm in landmarks]
+        pixel_landmarks = self._to_pixels(landmarks)
         
         # Add mesh connections
         for connection in connections:
@@ -272,6 +280,9 @@ class SVGGenerator:
         connections_group = ET.SubElement(pose_group, 'g')
         connections_group.set('id', 'pose-connections')
         
+        # Convert normalized coordinates to pixel coordinates
+        scaled = np.asarray(pose_landmarks, dtype=np.float64)[:, :2] * (self.width, self.height)
+        
         for start_idx, end_idx in connections:
             # Skip if landmarks are excluded or out of bounds
             if (start_idx in excluded_landmarks or 
@@ -280,14 +291,8 @@ class SVGGenerator:
                 end_idx >= len(pose_landmarks)):
                 continue
                 
-            start_landmark = pose_landmarks[start_idx]
-            end_landmark = pose_landmarks[end_idx]
-            
-            # Convert normalized coordinates to pixel coordinates
-            x1 = start_landmark[0] * self.width
-            y1 = start_landmark[1] * self.height
-            x2 = end_landmark[0] * self.width
-            y2 = end_landmark[1] * self.height
+            x1, y1 = scaled[start_idx]
+            x2, y2 = scaled[end_idx]
             
             # Create connection line
             line = ET.SubElement(connections_group, 'line')
@@ -304,14 +309,10 @@ class SVGGenerator:
         points_group = ET.SubElement(pose_group, 'g')
         points_group.set('id', 'pose-points')
         
-        for idx, landmark in enumerate(pose_landmarks):
+        for idx, (x, y) in enumerate(scaled):
             # Skip excluded landmarks
             if idx in excluded_landmarks:
                 continue
-                
-            # Convert normalized coordinates to pixel coordinates
-            x = landmark[0] * self.width
-            y = landmark[1] * self.height
             
             # Create landmark point
             circle = ET.SubElement(points_group, 'circle')
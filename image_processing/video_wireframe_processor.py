@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Video Wireframe Processor
+=========================
+
+Renders wireframes for every frame of a video file or a capture device
+(webcam) and writes them as a video, optionally showing them live.
+
+The FaceLandmarker and PoseLandmarker run in MediaPipe's VIDEO or
+LIVE_STREAM running mode with a timestamp per frame, so after the first
+detection MediaPipe tracks the face from the previous frame instead of
+running the full detector again:
+
+- ``video`` (default for files): every frame is detected in order, results
+  are deterministic
+- ``live_stream`` (default for devices): detection runs asynchronously and
+  each frame is drawn with the newest finished result, so a slow landmarker
+  never holds up the capture loop
+
+With a :class:`LandmarkTracker` the landmarkers only run on keyframes and
+the landmarks are carried between them with pyramidal Lucas-Kanade optical
+flow (``--keyframe-interval``), so wireframes render at several times the
+detector's frame rate.
+
+Decoding, detection, rendering and encoding overlap as single-worker stages
+of a :class:`StagedPipeline`, which keeps the frames in order.
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import cv2
+import numpy as np
+from dataclasses import dataclass, replace
+from typing import Any, Iterable, Iterator, Optional, Union
+
+sys.path.append(os.path.dirname(__file__))
+from wireframe_portrait_processor import (
+    WireframeConfig, WireframePortraitProcessor, InferenceContext,
+    add_wireframe_arguments, config_from_args
+)
+from edge_probability import EdgeMapMemo
+from geometry_cache import face_result_from_landmarks
+from landmark_tracker import (
+    LandmarkTracker, DEFAULT_KEYFRAME_INTERVAL, DEFAULT_MAX_DRIFT, DEFAULT_MIN_TRACKED
+)
+from staged_pipeline import DEFAULT_QUEUE_SIZE, Stage, StagedPipeline
+
+DEFAULT_FPS = 30.0
+DEFAULT_FOURCC = 'mp4v'
+
+@dataclass
+class VideoFrame:
+    """One frame travelling through the video pipeline"""
+    index: int
+    timestamp_ms: int
+    image: Optional[np.ndarray] = None  # Source RGB frame
+    context: Any = None
+    output: Optional[np.ndarray] = None  # Rendered RGB wireframe
+    has_face: bool = False
+    keyframe: bool = True  # Landmarks came from the detectors, not the tracker
+
+@dataclass
+class VideoSummary:
+    """Frame-rate statistics for one video run"""
+    frames: int = 0
+    frames_with_face: int = 0
+    keyframes: int = 0
+    setup_seconds: float = 0.0
+    processing_seconds: float = 0.0
+    source_fps: float = 0.0
+    stage_report: str = ""
+
+    def print_report(self):
+        """Print a per-run frame-rate summary"""
+        fps = self.frames / self.processing_seconds if self.processing_seconds > 0 else 0.0
+
+        print("\n" + "=" * 50)
+        print("Video summary")
+        print("=" * 50)
+        print(f"  Frames:             {self.frames}")
+        print(f"  Frames with face:   {self.frames_with_face}")
+        print(f"  Keyframes:          {self.keyframes}"
+              + (f" (detectors on 1 in {self.frames / self.keyframes:.1f} frames)" if self.keyframes else ""))
+        print(f"  Model setup:        {self.setup_seconds:.2f}s")
+        print(f"  Processing time:    {self.processing_seconds:.2f}s")
+        print(f"  Frame rate:         {fps:.1f} fps (source {self.source_fps:.1f} fps)")
+        if self.stage_report:
+            print("\nPipeline stages")
+            print(self.stage_report)
+
+def open_capture(source: Union[str, int]) -> cv2.VideoCapture:
+    """
+    Open a video file or capture device
+
+    Args:
+        source: Video path, or a device index (also given as a digit string)
+
+    Returns:
+        Opened capture
+
+    Raises:
+        IOError: If the source cannot be opened
+    """
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise IOError(f"Could not open video source: {source}")
+    return capture
+
+def default_running_mode(source: Union[str, int]) -> str:
+    """'live_stream' for capture devices, 'video' for files"""
+    return 'live_stream' if isinstance(source, int) or str(source).isdigit() else 'video'
+
+class VideoWireframeProcessor(WireframePortraitProcessor):
+    """Wireframe processor for frame sequences (video files and webcams)"""
+
+    def __init__(self, config: WireframeConfig, running_mode: str = 'video',
+                 tracker: Optional[LandmarkTracker] = None):
+        """
+        Initialize processor.
+
+        Args:
+            config: Wireframe configuration; per-image outputs (SVG, RGBA,
+                background merge, intermediate steps) do not apply to video
+                and are switched off
+            running_mode: MediaPipe running mode, 'video' or 'live_stream'
+            tracker: Optional landmark tracker; the landmarkers then run on
+                keyframes only (requires the 'video' running mode)
+        """
+        if running_mode not in ('video', 'live_stream'):
+            raise ValueError(f"Unsupported video running mode: {running_mode}")
+        if tracker is not None and running_mode != 'video':
+            # LIVE_STREAM results lag behind the frame they are tracked from
+            raise ValueError("Landmark tracking requires the 'video' running mode")
+        self.running_mode = running_mode
+        self.tracker = tracker
+        self._last_timestamp_ms = -1
+        config = replace(
+            config, output_format='rgb', enable_svg_export=False, svg_output_path="",
+            enable_background_merge=False, save_intermediate_steps=False
+        )
+        super().__init__(config)
+
+        # Frames almost never repeat, so hashing them for the geometry cache
+        # or the edge-map memo would only cost time
+        self.geometry_cache = None
+        if self.dexined_generator:
+            self.dexined_generator.memo = EdgeMapMemo(0)
+
+    def _next_timestamp(self, timestamp_ms: int) -> int:
+        """MediaPipe requires strictly increasing timestamps"""
+        self._last_timestamp_ms = max(int(timestamp_ms), self._last_timestamp_ms + 1)
+        return self._last_timestamp_ms
+
+    def detect_frame(self, frame: VideoFrame) -> VideoFrame:
+        """
+        Run the landmarkers (and DexiNed) on one frame
+
+        Args:
+            frame: Frame with its source image and timestamp; frames must be
+                passed in timestamp order
+
+        Returns:
+            The same frame with its inference context
+        """
+        # One proxy per frame: callers may refill the same buffer every frame
+        proxy = self.detection_proxy(frame.image)
+        if self.tracker is None:
+            self.frame_timestamp_ms = self._next_timestamp(frame.timestamp_ms)
+            frame.context = self.build_inference_context(frame.image, proxy=proxy)
+            frame.has_face = bool(frame.context.landmarks)
+            return frame
+        
+        # Track on the detection proxy: cheaper, and landmarks are normalized
+        gray = cv2.cvtColor(proxy.image, cv2.COLOR_RGB2GRAY)
+        tracked = None if self.tracker.needs_keyframe() else self.tracker.track(gray)
+        if tracked is not None:
+            frame.keyframe = False
+            frame.context = InferenceContext(
+                image=frame.image, landmarks=tracked['face'],
+                detection_result=face_result_from_landmarks(tracked['face']),
+                pose_landmarks=tracked.get('pose')
+            )
+            self.add_edge_maps([frame.context])
+        else:
+            self.frame_timestamp_ms = self._next_timestamp(frame.timestamp_ms)
+            frame.context = self.build_inference_context(frame.image, proxy=proxy)
+            self.tracker.reset(gray, {'face': frame.context.landmarks,
+                                      'pose': frame.context.pose_landmarks})
+        frame.has_face = bool(frame.context.landmarks)
+        return frame
+
+    def render_frame(self, frame: VideoFrame) -> VideoFrame:
+        """
+        Draw the wireframe of one detected frame
+
+        Frames without a face are rendered as an empty (white) canvas so the
+        output video keeps the source's frame count and timing.
+
+        Args:
+            frame: Frame returned by :meth:`detect_frame`
+
+        Returns:
+            The same frame with its RGB ``output``
+        """
+        if frame.has_face:
+            frame.output = self.render_context(frame.context, save=False)['final_rgb']
+        else:
+            frame.output = np.full_like(frame.image, 255)
+        frame.image = None
+        frame.context = None
+        return frame
+
+    def process_frame(self, image: np.ndarray, timestamp_ms: int) -> np.ndarray:
+        """
+        Detect and render one frame
+
+        Args:
+            image: RGB frame
+            timestamp_ms: Frame timestamp in milliseconds
+
+        Returns:
+            RGB wireframe frame of the same size
+        """
+        frame = VideoFrame(0, timestamp_ms, image)
+        return self.render_frame(self.detect_frame(frame)).output
+
+    def process_frames(self, frames: Iterable[np.ndarray],
+                       fps: float = DEFAULT_FPS) -> Iterator[np.ndarray]:
+        """
+        Render a sequence of frames in order
+
+        Args:
+            frames: RGB frames, all of the same size
+            fps: Frame rate used to derive the MediaPipe timestamps
+
+        Yields:
+            RGB wireframe frame per input frame
+        """
+        for index, image in enumerate(frames):
+            frame = VideoFrame(index, int(round(index * 1000.0 / fps)), image)
+            yield self.render_frame(self.detect_frame(frame)).output
+
+    def process_video(self, source: Union[str, int],
+                      output_path: Optional[str] = None,
+                      max_frames: int = 0,
+                      show: bool = False,
+                      fourcc: str = DEFAULT_FOURCC,
+                      queue_size: int = DEFAULT_QUEUE_SIZE) -> VideoSummary:
+        """
+        Render every frame of a video file or capture device
+
+        Args:
+            source: Video path or device index
+            output_path: Optional output video path
+            max_frames: Stop after this many frames (0 = until the source ends)
+            show: Show the wireframes in a window (press q or Esc to stop)
+            fourcc: Output codec
+            queue_size: Frames buffered between pipeline stages
+
+        Returns:
+            Frame-rate summary
+        """
+        capture = open_capture(source)
+        summary = VideoSummary()
+        live = self.running_mode == 'live_stream'
+        summary.source_fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        stop = threading.Event()
+
+        def frames() -> Iterator[VideoFrame]:
+            index = 0
+            start = time.perf_counter()
+            while not stop.is_set() and (not max_frames or index < max_frames):
+                ok, bgr = capture.read()
+                if not ok:
+                    break
+                # Live frames are stamped with the capture time, file frames
+                # with their position in the video
+                if live:
+                    timestamp_ms = int((time.perf_counter() - start) * 1000)
+                else:
+                    timestamp_ms = int(round(index * 1000.0 / summary.source_fps))
+                yield VideoFrame(index, timestamp_ms, cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+                index += 1
+
+        writer = [None]
+
+        def write(frame: VideoFrame) -> VideoFrame:
+            if output_path:
+                if writer[0] is None:
+                    height, width = frame.output.shape[:2]
+                    output_dir = os.path.dirname(output_path)
+                    if output_dir:
+                        os.makedirs(output_dir, exist_ok=True)
+                    writer[0] = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc),
+                                                summary.source_fps, (width, height))
+                writer[0].write(cv2.cvtColor(frame.output, cv2.COLOR_RGB2BGR))
+            return frame
+
+        # One worker per stage keeps frames (and MediaPipe timestamps) in order
+        pipeline = StagedPipeline([
+            Stage('detect', lambda: self.detect_frame),
+            Stage('render', lambda: self.render_frame),
+            Stage('write', lambda: write),
+        ], queue_size)
+
+        print(f"Processing {'device' if isinstance(source, int) or str(source).isdigit() else 'video'} "
+              f"{source} in {self.running_mode} mode at {summary.source_fps:.1f} fps")
+        processing_start = time.perf_counter()
+        try:
+            for frame, error in pipeline.run(frames()):
+                if error is not None:
+                    print(f"Error processing frame {frame.index}: {error}")
+                    continue
+                summary.frames += 1
+                summary.frames_with_face += frame.has_face
+                summary.keyframes += frame.keyframe
+                if show:
+                    cv2.imshow('Wireframe', cv2.cvtColor(frame.output, cv2.COLOR_RGB2BGR))
+                    if cv2.waitKey(1) & 0xFF in (ord('q'), 27):
+                        stop.set()
+                if not self.config.quiet and summary.frames % 100 == 0:
+                    elapsed = time.perf_counter() - processing_start
+                    print(f"  {summary.frames} frames, {summary.frames / elapsed:.1f} fps")
+        finally:
+            stop.set()
+            capture.release()
+            if writer[0] is not None:
+                writer[0].release()
+            if show:
+                cv2.destroyAllWindows()
+
+        summary.processing_seconds = time.perf_counter() - processing_start
+        summary.stage_report = pipeline.format_stats(summary.processing_seconds)
+        if output_path and writer[0] is not None:
+            print(f"Saved wireframe video to: {output_path}")
+        return summary
+
+def main():
+    """Video command line interface"""
+    parser = argparse.ArgumentParser(
+        description='Video Wireframe Processor',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Video file to wireframe video
+  python video_wireframe_processor.py input.mp4 -o out/wireframe.mp4 --preset beginner
+
+  # Classroom demo: default webcam, shown live (q to quit)
+  python video_wireframe_processor.py 0 --show --construction-lines --mesh --quiet
+
+  # Landmarkers on every 10th frame, optical-flow tracking in between
+  python video_wireframe_processor.py 0 --show --construction-lines --mesh --keyframe-interval 10
+        """
+    )
+
+    parser.add_argument('input', help='Video file, or capture device index (e.g. 0 for the default webcam)')
+    parser.add_argument('-o', '--output', help='Output video path (e.g. wireframe.mp4)')
+    parser.add_argument('--show', action='store_true', help='Show the wireframes in a window (q to quit)')
+    parser.add_argument('--running-mode', choices=['video', 'live_stream'],
+                       help='MediaPipe running mode (default: video for files, live_stream for devices)')
+    parser.add_argument('--max-frames', type=int, default=0, help='Stop after this many frames')
+    parser.add_argument('--fourcc', default=DEFAULT_FOURCC, help=f'Output codec (default: {DEFAULT_FOURCC})')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                       help=f'Frames buffered between pipeline stages (default: {DEFAULT_QUEUE_SIZE})')
+
+    # Keyframes and optical-flow tracking
+    parser.add_argument('--keyframe-interval', type=int, default=0,
+                       help='Run the landmarkers every N frames and track landmarks with optical flow '
+                            f'in between (0 = detect every frame, e.g. {DEFAULT_KEYFRAME_INTERVAL})')
+    parser.add_argument('--max-drift', type=float, default=DEFAULT_MAX_DRIFT,
+                       help='Median forward-backward tracking error in detection-proxy pixels that '
+                            f'forces a keyframe (default: {DEFAULT_MAX_DRIFT})')
+    parser.add_argument('--min-tracked', type=float, default=DEFAULT_MIN_TRACKED,
+                       help='Fraction of landmarks that must track reliably, else a keyframe is '
+                            f'forced (default: {DEFAULT_MIN_TRACKED})')
+
+    add_wireframe_arguments(parser)
+
+    args = parser.parse_args()
+    if not args.output and not args.show:
+        parser.error("nothing to do: give an output path (-o) and/or --show")
+    if args.presets:
+        parser.error("--presets is not supported for video, use --preset")
+    tracker = None
+    running_mode = args.running_mode or default_running_mode(args.input)
+    if args.keyframe_interval > 0:
+        if args.running_mode == 'live_stream':
+            parser.error("--keyframe-interval needs --running-mode video")
+        running_mode = 'video'
+        tracker = LandmarkTracker(args.keyframe_interval, args.max_drift, args.min_tracked)
+    config = config_from_args(args)
+
+    setup_start = time.perf_counter()
+    processor = VideoWireframeProcessor(config, running_mode, tracker)
+    processor.load_models()
+    setup_seconds = time.perf_counter() - setup_start
+
+    try:
+        summary = processor.process_video(args.input, args.output, max_frames=max(0, args.max_frames),
+                                          show=args.show, fourcc=args.fourcc, queue_size=args.queue_size)
+    except IOError as e:
+        print(e)
+        sys.exit(1)
+    summary.setup_seconds = setup_seconds
+    summary.print_report()
+
+if __name__ == '__main__':
+    main()
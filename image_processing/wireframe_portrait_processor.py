@@ -15,31 +15,59 @@ import os
 import sys
 import cv2
 import numpy as np
-import mediapipe as mp
-import mediapipe.tasks as mp_tasks
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Union, Any
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 import argparse
 import json
 from datetime import datetime
 
-# Import SVG generator
-from svg_generator import SVGGenerator, SVGWireframeConfig
+# MediaPipe, PyTorch/DexiNed, ONNX Runtime and the SVG writer are imported
+# where they are used, so --help and configs that never reach those stages
+# start without loading them
+from landmark_array import LandmarkArray
+from detection_proxy import DEFAULT_MAX_SIDE, DetectionProxy
+from edge_probability import EdgeMapMemo, EdgeProbabilityMap
+from face_prefilter import DEFAULT_MIN_CONFIDENCE, DEFAULT_THUMBNAIL_SIZE, FacePresenceFilter
+from stage_profiler import StageProfiler, format_timings, merge_timings
+import face_mesh_renderer
+from geometry_cache import (
+    GeometryCache, model_identity, landmarks_to_array, landmarks_from_array,
+    face_result_from_landmarks, FACE_LANDMARKS, POSE_LANDMARKS
+)
 
 
-# Add DexiNed to path for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'DexiNed'))
+DEXINED_REPO = os.path.join(os.path.dirname(__file__), '..', 'DexiNed')
+
+# Set by load_dexined_torch() the first time a PyTorch DexiNed model is built
+torch = None
+DexiNed = None
+DEXINED_AVAILABLE = None  # None until the import has been attempted
+
+
+def load_dexined_torch() -> bool:
+    """
+    Import PyTorch and the DexiNed model on first use
+    
+    Returns:
+        True if both are available (the module-level ``torch`` and
+        ``DexiNed`` names are then set)
+    """
+    global torch, DexiNed, DEXINED_AVAILABLE
+    if DEXINED_AVAILABLE is None:
+        if DEXINED_REPO not in sys.path:
+            sys.path.append(DEXINED_REPO)
+        try:
+            import torch as torch_module
+            from model import DexiNed as dexined_model
+            torch, DexiNed = torch_module, dexined_model
+            DEXINED_AVAILABLE = True
+        except ImportError:
+            print("Warning: DexiNed dependencies not available. DexiNed outline feature disabled.")
+            DEXINED_AVAILABLE = False
+    return DEXINED_AVAILABLE
 
-try:
-    import torch
-    from model import DexiNed
-    DEXINED_AVAILABLE = True
-except ImportError:
-    print("Warning: DexiNed dependencies not available. DexiNed outline feature disabled.")
-    DEXINED_AVAILABLE = False
-    torch = None
 
 class FeatureType(Enum):
     """Available wireframe features"""
@@ -80,6 +108,17 @@ class WireframeConfig:
     dexined_threshold: float = 0.5
     dexined_line_thickness: int = 1
     dexined_color: Tuple[int, int, int] = (0, 0, 0)  # Black
+    dexined_batch_size: int = 4  # Images per forward pass in batched inference
+    dexined_backend: str = "torch"  # "torch" or "onnx" (ONNX Runtime, no PyTorch needed)
+    dexined_onnx_path: str = ""  # Exported model; defaults to the checkpoint path with .onnx
+    dexined_num_threads: int = 0  # ONNX Runtime / cpu_fast intra-op threads (0 = all cores)
+    dexined_mode: str = "fp32"  # PyTorch variant: "fp32" or "cpu_fast" (INT8 convs, channels_last)
+    dexined_calibration_images: str = ""  # INT8 calibration images for cpu_fast (dir or glob)
+    dexined_roi_mode: bool = False  # Extra near-native DexiNed pass on the face crop, merged into the global map
+    dexined_roi_size: int = 512  # Largest ROI model input side (multiple of 16)
+    dexined_roi_padding: float = 0.3  # Margin around the landmark bounding box, relative to its size
+    dexined_roi_pose: bool = False  # Also crop the pose (body) bounding box when pose landmarks exist
+    edge_map_memo_size: int = 16  # Raw edge maps kept in memory for re-thresholding (0 disables)
     
     # Pose landmarks settings
     pose_model_path: str = ""  # Path to pose_landmarker.task file
@@ -107,9 +146,41 @@ class WireframeConfig:
     foreground_transparency: int = 100  # 0-100 scale (0=transparent, 100=opaque)
     background_transparency: int = 50  # 0-100 scale (0=transparent, 100=opaque)
 
+    # Landmark detectors run on a copy no larger than this (0 = full resolution)
+    detection_max_side: int = DEFAULT_MAX_SIDE
+    
+    # Face-presence prefilter: skip images without a face on a thumbnail
+    # before they are fully decoded (verdicts are kept in the geometry cache)
+    face_prefilter: bool = False
+    face_prefilter_confidence: float = DEFAULT_MIN_CONFIDENCE
+    face_prefilter_size: int = DEFAULT_THUMBNAIL_SIZE
+    
+    # Geometry cache settings (landmarks and raw edge maps persisted on disk)
+    geometry_cache_dir: str = ""  # Empty disables the cache
+    geometry_cache_max_mb: int = 1024
+    
+    # Instrumentation (timings are always returned under results['timings']
+    # when enabled; memory tracing slows processing down)
+    profile: bool = False  # Collect per-stage timings and print them after each image
+    profile_memory: bool = False  # Also measure per-stage peak memory with tracemalloc
+    trace_path: str = ""  # JSON-lines file receiving one record per stage
+    quiet: bool = False  # Suppress per-stage progress messages
+
 class ConstructionLinesGenerator:
     """Generates portrait construction lines based on MediaPipe landmarks"""
     
+    # Landmark chains connected sequentially, with the colour key used for each
+    CONSTRUCTION_LINES = [
+        ([10, 168, 4, 152], 'vertical_center'),  # 1. Vertical Center Line
+        ([63, 293], 'eyebrow_line'),             # 2. Eyebrow Line
+        ([33, 263], 'eye_lines'),                # 3. Eye Lines
+        ([133, 362], 'eye_lines'),
+        ([145, 159], 'eye_lines'),
+        ([374, 386], 'eye_lines'),
+        ([48, 278], 'nose_line'),                # 4. Nose Line
+        ([61, 291], 'mouth_line'),               # 5. Mouth Line
+    ]
+    
     @staticmethod
     def draw_construction_lines(image: np.ndarray, 
                               landmarks: List, 
@@ -125,63 +196,49 @@ class ConstructionLinesGenerator:
         Returns:
             Image with construction lines drawn
         """
+        annotated = image.copy()
+        ConstructionLinesGenerator.draw_construction_lines_into(annotated, landmarks, config)
+        return annotated
+    
+    @staticmethod
+    def draw_construction_lines_into(image: np.ndarray,
+                                     landmarks: List,
+                                     config: WireframeConfig,
+                                     colors: Optional[Dict[str, Tuple[int, int, int]]] = None):
+        """
+        Draw construction lines in place
+        
+        Args:
+            image: RGB image to draw on (modified in place)
+            landmarks: MediaPipe face landmarks
+            config: Wireframe configuration
+            colors: Optional colour overrides keyed like
+                ``config.construction_line_colors``; lines whose colour is
+                None are skipped
+        """
+        landmarks = LandmarkArray.from_landmarks(landmarks)
         if not landmarks:
-            return image.copy()
+            return
         
-        annotated = image.copy()
         height, width = image.shape[:2]
         thickness = config.construction_line_thickness
-        colors = config.construction_line_colors
+        if colors is None:
+            colors = config.construction_line_colors
         
-        def get_pixel_coords(landmark_idx):
-            """Convert normalized landmark coordinates to pixel coordinates"""
-            if landmark_idx >= len(landmarks):
-                return None
-            landmark = landmarks[landmark_idx]
+        for point_indices, color_key in ConstructionLinesGenerator.CONSTRUCTION_LINES:
+            line_color = colors[color_key]
+            if line_color is None:
+                continue
+            
             # Landmarks are in [0,1] range relative to image size
-            return (int(landmark.x * width), int(landmark.y * height))
-        
-        def draw_line_between_points(point_indices, line_color):
-            """Draw line connecting multiple points"""
-            points = []
-            for idx in point_indices:
-                point = get_pixel_coords(idx)
-                if point:
-                    points.append(point)
-
-            # Connect the landmark points sequentially.
-            for i in range(len(points) - 1):
-                cv2.line(annotated, points[i], points[i + 1], line_color, thickness)
+            points = landmarks.pixel_points(width, height, point_indices)
             
-            return points
-        
-        # 1. Vertical Center Line [10→168→4→152]
-        draw_line_between_points([10, 168, 4, 152], colors['vertical_center'])
-        
-        # 2. Eyebrow Line [63→293] 
-        draw_line_between_points([63, 293], colors['eyebrow_line'])
-        
-        # 3. Eye Lines [33→263], [133→362], [145→159], [374→386]
-        draw_line_between_points([33, 263], colors['eye_lines'])
-        draw_line_between_points([133, 362], colors['eye_lines'])
-        draw_line_between_points([145, 159], colors['eye_lines'])
-        draw_line_between_points([374, 386], colors['eye_lines'])
-        
-        # 4. Nose Line [48→278]
-        draw_line_between_points([48, 278], colors['nose_line'])
-        
-        # 5. Mouth Line [61→291]
-        draw_line_between_points([61, 291], colors['mouth_line'])
-        
-        return annotated
+            # Connect the landmark points sequentially in one call
+            if len(points) > 1:
+                cv2.polylines(image, [points], False, line_color, thickness)
 
 class MeshGenerator:
-    """Generates face mesh overlay using MediaPipe"""
-    
-    def __init__(self):
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+    """Generates face mesh overlay from MediaPipe face landmarks"""
     
     def draw_face_mesh(self, image: np.ndarray, 
                       detection_result, 
@@ -197,81 +254,122 @@ class MeshGenerator:
         Returns:
             Image with face mesh drawn
         """
-        if not detection_result.face_landmarks:
-            return image.copy()
-        
         annotated = image.copy()
-        colors = config.mesh_colors
+        self.draw_face_mesh_into(annotated, detection_result, config)
+        return annotated
+    
+    def draw_face_mesh_into(self, image: np.ndarray,
+                            detection_result,
+                            config: WireframeConfig,
+                            colors: Optional[Dict[str, Tuple[int, int, int]]] = None):
+        """
+        Draw face mesh in place
         
-        for face_landmarks in detection_result.face_landmarks:
-            # Convert landmarks for drawing
-            from mediapipe.framework.formats import landmark_pb2
-            face_landmarks_proto = landmark_pb2.NormalizedLandmarkList()
-            face_landmarks_proto.landmark.extend([
-                landmark_pb2.NormalizedLandmark(x=landmark.x, y=landmark.y, z=landmark.z)
-                for landmark in face_landmarks
-            ])
-
-            # Draw tesselation: full triangular mesh across the face
-            if colors['tesselation']:
-                self.mp_drawing.draw_landmarks(
-                    image=annotated,
-                    landmark_list=face_landmarks_proto,
-                    connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                        color=colors['tesselation'], thickness=config.mesh_thickness
-                    )
-                )
-
-            # Draw contours: emphasis around outer facial features
-            if colors['contours']:
-                self.mp_drawing.draw_landmarks(
-                    image=annotated,
-                    landmark_list=face_landmarks_proto,
-                    connections=self.mp_face_mesh.FACEMESH_CONTOURS,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                        color=colors['contours'], thickness=config.mesh_thickness + 1
-                    )
-                )
-
-            # Draw irises to show eye direction
-            if colors['irises']:
-                self.mp_drawing.draw_landmarks(
-                    image=annotated,
-                    landmark_list=face_landmarks_proto,
-                    connections=self.mp_face_mesh.FACEMESH_IRISES,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                        color=colors['irises'], thickness=config.mesh_thickness + 1
-                    )
-                )
+        Args:
+            image: RGB image to draw on (modified in place)
+            detection_result: MediaPipe detection result
+            config: Wireframe configuration
+            colors: Optional colour overrides keyed like ``config.mesh_colors``;
+                falsy colours are skipped
+        """
+        if colors is None:
+            colors = config.mesh_colors
         
-        return annotated
+        for face_landmarks in detection_result.face_landmarks:
+            face_mesh_renderer.draw_face_mesh(image, face_landmarks, colors, config.mesh_thickness)
 
 class DexiNedGenerator:
     """Generates edge outlines using DexiNed model"""
     
-    def __init__(self, model_path: str = ""):
+    def __init__(self, model_path: str = "", backend: str = "torch",
+                 onnx_path: str = "", num_threads: int = 0,
+                 mode: str = "fp32", calibration_images: str = ""):
+        """
+        Initialize generator.
+        
+        Args:
+            model_path: Path to the DexiNed PyTorch checkpoint
+            backend: "torch" (eager PyTorch) or "onnx" (ONNX Runtime, exported
+                from the checkpoint on first use)
+            onnx_path: ONNX model path (defaults to the checkpoint path with .onnx)
+            num_threads: Intra-op threads for ONNX Runtime and the cpu_fast
+                PyTorch model (0 = all cores)
+            mode: PyTorch variant, "fp32" or "cpu_fast" (INT8 conv blocks,
+                channels_last, inference_mode, tuned threading)
+            calibration_images: Directory or glob of INT8 calibration images
+                for cpu_fast (defaults to the AIC sample images)
+        """
         self.model = None
+        self.onnx_runner = None
         self.device = None
         self.model_path = model_path
-        
-        if DEXINED_AVAILABLE and model_path and os.path.exists(model_path):
+        self.backend = backend
+        self.mode = mode
+        self.num_threads = num_threads
+        self.calibration_images = calibration_images
+        self.quantized_blocks: List[str] = []
+        # Replaced by the owning processor's profiler
+        self.profiler = StageProfiler()
+        # Raw edge maps per image, so re-thresholding needs no inference; the
+        # owning processor attaches its on-disk geometry cache
+        self.memo = EdgeMapMemo()
+        
+        if backend == "onnx":
+            self._load_onnx_model(onnx_path, num_threads)
+        elif model_path and os.path.exists(model_path) and load_dexined_torch():
             self._load_model()
     
+    @classmethod
+    def from_config(cls, config: 'WireframeConfig') -> 'DexiNedGenerator':
+        """Create a generator with the model, backend and mode selected in ``config``"""
+        generator = cls(
+            config.dexined_model_path, config.dexined_backend, config.dexined_onnx_path,
+            config.dexined_num_threads, config.dexined_mode, config.dexined_calibration_images
+        )
+        generator.memo.max_entries = config.edge_map_memo_size
+        return generator
+    
+    @property
+    def variant(self) -> str:
+        """Backend and mode, part of the cache identity of the edge maps"""
+        if self.backend == "torch" and self.mode != "fp32":
+            return f"{self.backend}-{self.mode}"
+        return self.backend
+    
+    @property
+    def has_model(self) -> bool:
+        """Whether edge maps come from DexiNed rather than the Canny fallback"""
+        return self.model is not None or self.onnx_runner is not None
+    
+    def _load_onnx_model(self, onnx_path: str, num_threads: int):
+        """Export the checkpoint to ONNX if needed and open a cached session"""
+        try:
+            from dexined_onnx import DexiNedOnnxRunner, ensure_dexined_onnx
+            onnx_path = ensure_dexined_onnx(self.model_path, onnx_path)
+            if onnx_path:
+                self.onnx_runner = DexiNedOnnxRunner(onnx_path, num_threads)
+                print(f"DexiNed ONNX model loaded from {onnx_path}")
+        except ImportError:
+            print("Warning: onnxruntime not available. DexiNed outline feature disabled.")
+        except Exception as e:
+            print(f"Error loading DexiNed ONNX model: {e}")
+            self.onnx_runner = None
+    
     def _load_model(self):
         """Load DexiNed model"""
         try:
             if torch is not None:
-                self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+                # The INT8 kernels of cpu_fast only exist on the CPU
+                use_cuda = torch.cuda.is_available() and self.mode != "cpu_fast"
+                self.device = torch.device('cuda' if use_cuda else 'cpu')
                 self.model = DexiNed().to(self.device)
                 
                 if os.path.exists(self.model_path):
                     self.model.load_state_dict(torch.load(self.model_path, map_location=self.device))
                     self.model.eval()
                     print(f"DexiNed model loaded from {self.model_path}")
+                    if self.mode == "cpu_fast":
+                        self._optimize_for_cpu()
                 else:
                     print(f"Warning: DexiNed model not found at {self.model_path}")
                     self.model = None
@@ -281,6 +379,14 @@ class DexiNedGenerator:
             print(f"Error loading DexiNed model: {e}")
             self.model = None
     
+    def _optimize_for_cpu(self):
+        """Convert the loaded fp32 model into the cpu_fast variant"""
+        from dexined_quantization import load_calibration_images, optimize_for_cpu
+        images = load_calibration_images(self.calibration_images)
+        calibration_batch = np.stack([self._preprocess_array(image) for image in images]) if images else None
+        self.model, self.quantized_blocks = optimize_for_cpu(self.model, calibration_batch, self.num_threads)
+        print(f"DexiNed cpu_fast: {len(self.quantized_blocks)} INT8 blocks, channels_last")
+    
     def generate_outline(self, image: np.ndarray, config: WireframeConfig) -> np.ndarray:
         """
         Generate edge outline using DexiNed
@@ -292,91 +398,388 @@ class DexiNedGenerator:
         Returns:
             Image with edge outline
         """
-        if not DEXINED_AVAILABLE or self.model is None:
+        edge_map = self.probability_map(image, config)
+        return self._postprocess_edges(edge_map, image.shape, config)
+    
+    def memo_identity(self, config: Optional['WireframeConfig'] = None) -> str:
+        """Identity of the model and settings behind :meth:`probability_map`"""
+        return model_identity(self.model_path, self.variant)
+    
+    def probability_map(self, image: np.ndarray,
+                        config: Optional['WireframeConfig'] = None) -> EdgeProbabilityMap:
+        """
+        Raw edge probabilities for an image, memoized per image and model
+        
+        Any number of thresholds, colours and enhancements can be rendered
+        from the returned map without running the model again.
+        
+        Args:
+            image: Input RGB image
+            config: Wireframe configuration (only used by subclasses whose
+                inference depends on it)
+            
+        Returns:
+            Edge probability map (the full-resolution Canny map without a model)
+        """
+        if not self.has_model:
+            return EdgeProbabilityMap(self._fallback_edge_map(image))
+        
+        image_key = self.memo.image_key(image) if self.memo.enabled else None
+        model_id = self.memo_identity(config)
+        edge_map = self.memo.get(image_key, model_id) if image_key else None
+        if edge_map is None:
+            edge_map = EdgeProbabilityMap(self._predict_raw_edge_map(image, config))
+            if image_key:
+                self.memo.put(image_key, model_id, edge_map)
+        return edge_map
+    
+    def _predict_raw_edge_map(self, image: np.ndarray,
+                              config: Optional['WireframeConfig'] = None) -> np.ndarray:
+        """Model inference behind :meth:`probability_map`"""
+        return self.predict_edge_map(image)
+    
+    def generate_outlines(self, images: List[np.ndarray], config: WireframeConfig,
+                          batch_size: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Generate edge outlines for several images with batched inference
+        
+        Args:
+            images: Input RGB images (any sizes)
+            config: Wireframe configuration
+            batch_size: Images per forward pass (defaults to ``config.dexined_batch_size``)
+            
+        Returns:
+            Outline image per input image, in input order
+        """
+        edge_maps = self.predict_edge_maps(images, batch_size or config.dexined_batch_size)
+        return [self._postprocess_edges(edge_map, image.shape, config)
+                for edge_map, image in zip(edge_maps, images)]
+    
+    def predict_edge_map(self, image: np.ndarray) -> np.ndarray:
+        """
+        Run DexiNed and return the raw edge probability map
+        
+        The map stays at model resolution (352x352) and is not thresholded, so
+        it can be post-processed for any number of outputs without rerunning
+        the model.
+        
+        Args:
+            image: Input RGB image
+            
+        Returns:
+            Float edge map (model output before thresholding)
+        """
+        return self.predict_edge_maps([image], batch_size=1)[0]
+    
+    def predict_edge_maps(self, images: List[np.ndarray], batch_size: int = 4) -> List[np.ndarray]:
+        """
+        Run DexiNed over several images in micro-batches
+        
+        Every image is resized to the model input size, so images of different
+        sizes can share a batch. Larger batches amortize the per-call framework
+        overhead and keep more of the CPU's vector units busy, at the cost of
+        memory proportional to ``batch_size``.
+        
+        Args:
+            images: Input RGB images
+            batch_size: Maximum number of images per forward pass
+            
+        Returns:
+            Raw edge map per input image, in input order
+        """
+        if not self.has_model:
             # If the neural model isn't available fall back to a basic Canny
             # edge detector so the pipeline still produces an outline.
-            return self._fallback_edge_detection(image, config)
+            return [self._fallback_edge_map(image) for image in images]
+        
+        batch_size = max(1, batch_size)
+        edge_maps = []
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            try:
+                # Preprocess images for DexiNed and stack them into one batch
+                with self.profiler.stage('dexined_preprocess'):
+                    batch = np.stack([self._preprocess_array(image) for image in chunk])
+                
+                with self.profiler.stage('dexined_forward'):
+                    batch_maps = self._forward(batch)
+                edge_maps.extend(np.ascontiguousarray(edge_map) for edge_map in batch_maps)
+            
+            except Exception as e:
+                print(f"Error in DexiNed processing: {e}")
+                edge_maps.extend(self._fallback_edge_map(image) for image in chunk)
         
-        try:
-            # Preprocess image for DexiNed
-            img_tensor = self._preprocess_image(image)
+        return edge_maps
+    
+    def predict_roi_edge_maps(self, images: List[np.ndarray],
+                              rois: List[List[Tuple[int, int, int, int]]],
+                              batch_size: int = 4, roi_size: int = 512) -> List[np.ndarray]:
+        """
+        Run one coarse global pass plus detailed passes on regions of interest
+        
+        Each ROI is a square pixel box (it may extend past the image border,
+        the outside is zero-padded) that DexiNed sees at up to ``roi_size``
+        pixels, i.e. close to native resolution for a face. ROIs that would
+        not be sharper than the global 352x352 pass are skipped. The ROI maps
+        are feathered into the upsampled global map, so the merged map can be
+        thresholded like any other raw edge map.
+        
+        Args:
+            images: Input RGB images
+            rois: (x0, y0, x1, y1) boxes per image
+            batch_size: Maximum number of inputs per forward pass
+            roi_size: Largest ROI model input side (multiple of 16)
             
-            if torch is not None:
-                with torch.no_grad():
-                    predictions = self.model(img_tensor)
-                    edge_map = predictions[-1].cpu().numpy()[0, 0]  # Use final prediction map
-            else:
-                edge_map = np.zeros((352, 352))
+        Returns:
+            Raw edge map per input image; images with sharper ROIs get a map
+            at the resolution of their sharpest ROI (at most the image size)
+        """
+        edge_maps = self.predict_edge_maps(images, batch_size)
+        if not self.has_model:
+            # The Canny fallback is already computed at full resolution
+            return edge_maps
+        
+        # Model input side per ROI; keep only ROIs that add detail
+        jobs = []
+        for index, (image, boxes) in enumerate(zip(images, rois)):
+            global_scale = 352 / max(image.shape[:2])
+            for box in boxes:
+                side = box[2] - box[0]
+                input_side = min(roi_size, max(16, int(round(side / 16)) * 16))
+                if side > 0 and input_side / side > global_scale * 1.25:
+                    jobs.append((index, box, input_side))
+        if not jobs:
+            return edge_maps
+        
+        # Same-sized ROI inputs share micro-batches
+        roi_maps = [None] * len(jobs)
+        for input_side in sorted({job[2] for job in jobs}):
+            group = [i for i, job in enumerate(jobs) if job[2] == input_side]
+            for start in range(0, len(group), max(1, batch_size)):
+                chunk = group[start:start + max(1, batch_size)]
+                try:
+                    with self.profiler.stage('dexined_preprocess'):
+                        batch = np.stack([self._preprocess_roi(images[jobs[i][0]], jobs[i][1], input_side)
+                                          for i in chunk])
+                    with self.profiler.stage('dexined_forward'):
+                        batch_maps = self._forward(batch)
+                except Exception as e:
+                    print(f"Error in DexiNed ROI processing: {e}")
+                    continue
+                for i, roi_map in zip(chunk, batch_maps):
+                    roi_maps[i] = roi_map
+        
+        merged_maps = []
+        for index, (image, edge_map) in enumerate(zip(images, edge_maps)):
+            image_jobs = [(job, roi_map) for job, roi_map in zip(jobs, roi_maps)
+                          if job[0] == index and roi_map is not None]
+            if not image_jobs:
+                merged_maps.append(edge_map)
+                continue
+            merged_maps.append(self._merge_roi_maps(image.shape, edge_map, image_jobs))
+        return merged_maps
+    
+    def _preprocess_roi(self, image: np.ndarray, box: Tuple[int, int, int, int],
+                        input_side: int) -> np.ndarray:
+        """Crop a square ROI, resize it to ``input_side`` and zero-pad the part outside the image"""
+        x0, y0, x1, y1 = box
+        scale = input_side / (x1 - x0)
+        cx0, cy0 = max(0, x0), max(0, y0)
+        cx1, cy1 = min(image.shape[1], x1), min(image.shape[0], y1)
+        
+        # Zero after mean subtraction, i.e. the mean colour
+        roi = np.zeros((3, input_side, input_side), dtype=np.float32)
+        px0, py0 = int(round((cx0 - x0) * scale)), int(round((cy0 - y0) * scale))
+        width = min(input_side - px0, max(1, int(round((cx1 - cx0) * scale))))
+        height = min(input_side - py0, max(1, int(round((cy1 - cy0) * scale))))
+        shrinking = scale < 1.0
+        roi[:, py0:py0 + height, px0:px0 + width] = self._preprocess_array(
+            image[cy0:cy1, cx0:cx1], (width, height), cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+        )
+        return roi
+    
+    @staticmethod
+    def _merge_roi_maps(image_shape: Tuple[int, ...], global_map: np.ndarray,
+                        image_jobs: List[Tuple[Tuple, np.ndarray]]) -> np.ndarray:
+        """Feather ROI maps into the global map at the sharpest ROI's resolution"""
+        height, width = image_shape[:2]
+        merge_scale = min(1.0, max(input_side / (box[2] - box[0]) for (_, box, input_side), _ in image_jobs))
+        merged_width = max(1, int(round(width * merge_scale)))
+        merged_height = max(1, int(round(height * merge_scale)))
+        merged = cv2.resize(global_map.astype(np.float32), (merged_width, merged_height),
+                            interpolation=cv2.INTER_LINEAR)
+        
+        for (_, box, _), roi_map in image_jobs:
+            x0, y0, x1, y1 = (int(round(value * merge_scale)) for value in box)
+            side = max(1, x1 - x0)
+            roi_map = cv2.resize(roi_map.astype(np.float32), (side, side), interpolation=cv2.INTER_LINEAR)
             
-            # Convert edge map to RGB image
-            edge_image = self._postprocess_edges(edge_map, image.shape, config)
-            return edge_image
+            # Linear ramp over the outer 10% so the ROI border leaves no seam
+            ramp = np.minimum(np.arange(side) + 0.5, side - np.arange(side) - 0.5) / max(1.0, 0.1 * side)
+            ramp = np.clip(ramp, 0.0, 1.0).astype(np.float32)
+            weight = np.outer(ramp, ramp)
             
-        except Exception as e:
-            print(f"Error in DexiNed processing: {e}")
-            return self._fallback_edge_detection(image, config)
+            # Clip the ROI to the merged map
+            mx0, my0 = max(0, x0), max(0, y0)
+            mx1, my1 = min(merged_width, x0 + side), min(merged_height, y0 + side)
+            if mx1 <= mx0 or my1 <= my0:
+                continue
+            region = (slice(my0 - y0, my1 - y0), slice(mx0 - x0, mx1 - x0))
+            target = merged[my0:my1, mx0:mx1]
+            merged[my0:my1, mx0:mx1] = target + (roi_map[region] - target) * weight[region]
+        return merged
     
-    def _preprocess_image(self, image: np.ndarray):
-        """Preprocess image for DexiNed model"""
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run the loaded backend on a preprocessed batch
+        
+        Args:
+            batch: float32 (N, 3, H, W) batch from :meth:`_preprocess_array`
+            
+        Returns:
+            float32 (N, H, W) final prediction maps, one per image
+        """
+        if self.onnx_runner is not None:
+            return self.onnx_runner.run(batch)
+        
+        batch_tensor = torch.from_numpy(batch)
+        if self.device:
+            batch_tensor = batch_tensor.to(self.device)
+        if self.mode == "cpu_fast":
+            batch_tensor = batch_tensor.contiguous(memory_format=torch.channels_last)
+            with torch.inference_mode():
+                return self.model(batch_tensor)[-1].float().numpy()[:, 0]
+        with torch.no_grad():
+            predictions = self.model(batch_tensor)
+            # Use final prediction map, split back into one map per image
+            return predictions[-1].cpu().numpy()[:, 0]
+    
+    def _preprocess_array(self, image: np.ndarray, size: Tuple[int, int] = (352, 352),
+                          interpolation: int = cv2.INTER_LINEAR) -> np.ndarray:
+        """
+        Resize, convert and mean-normalize an image into a (3, H, W) float32 array
+        
+        Args:
+            image: Input RGB image
+            size: Model input (width, height); DexiNed needs multiples of 16
+            interpolation: OpenCV resize interpolation
+        """
         # Resize to model input size (352x352 for DexiNed)
-        img_resized = cv2.resize(image, (352, 352))
+        img_resized = cv2.resize(image, size, interpolation=interpolation)
         
         # Convert to BGR and normalize
         img_bgr = cv2.cvtColor(img_resized, cv2.COLOR_RGB2BGR)
         img_float = img_bgr.astype(np.float32)
         
         # Apply mean subtraction (DexiNed uses ImageNet means)
-        mean_bgr = [103.939, 116.779, 123.68]
-        for i in range(3):
-            img_float[:, :, i] -= mean_bgr[i]
+        img_float -= np.array([103.939, 116.779, 123.68], dtype=np.float32)
+        
+        return img_float.transpose(2, 0, 1)
+    
+    def _preprocess_image(self, image: np.ndarray):
+        """Preprocess image for DexiNed model"""
+        img_chw = self._preprocess_array(image)
         
         # Convert to tensor and add batch dimension
         if torch is not None:
-            img_tensor = torch.from_numpy(img_float.transpose(2, 0, 1)).unsqueeze(0)
+            img_tensor = torch.from_numpy(np.ascontiguousarray(img_chw)).unsqueeze(0)
             
             if self.device:
                 img_tensor = img_tensor.to(self.device)
             
             return img_tensor
         else:
-            return img_float
+            return img_chw.transpose(1, 2, 0)
     
     def _postprocess_edges(self, edge_map: np.ndarray, 
                           target_shape: Tuple[int, int, int],
                           config: WireframeConfig) -> np.ndarray:
         """Convert edge map to RGB image with white background"""
-        # Resize edge map back to the original image resolution
-        edge_resized = cv2.resize(edge_map, (target_shape[1], target_shape[0]))
+        return self.colorize_mask(self.edge_mask(edge_map, target_shape, config), config.dexined_color)
+    
+    @staticmethod
+    def colorize_mask(edge_mask: np.ndarray, color: Tuple[int, int, int]) -> np.ndarray:
+        """
+        Colour an edge mask onto a white RGB image
         
-        # Apply threshold
-        edge_binary = (edge_resized > config.dexined_threshold).astype(np.uint8) * 255
+        Edges are kept as single-channel masks through thresholding and
+        morphology; this is the final step for callers that need an image.
+        
+        Args:
+            edge_mask: uint8 mask, non-zero on edges
+            color: RGB edge colour
+            
+        Returns:
+            RGB image with WHITE background (for wireframe mode)
+        """
+        edge_rgb = np.full((*edge_mask.shape[:2], 3), 255, dtype=np.uint8)
+        edge_rgb[edge_mask > 0] = color
+        return edge_rgb
+    
+    @staticmethod
+    def edge_mask(edge_map: np.ndarray,
+                  target_shape: Tuple[int, ...],
+                  config: WireframeConfig) -> np.ndarray:
+        """
+        Threshold a raw edge map into a binary mask at the target resolution
         
-        # Create RGB image with WHITE background (for wireframe mode)
-        edge_rgb = np.ones(target_shape, dtype=np.uint8) * 255  # White background
+        Args:
+            edge_map: Raw edge map from :meth:`predict_edge_map`, or an
+                :class:`EdgeProbabilityMap` (whose masks are memoized)
+            target_shape: Shape of the image the mask is for
+            config: Wireframe configuration (uses ``dexined_threshold``)
+            
+        Returns:
+            uint8 mask, 255 on edges and 0 elsewhere
+        """
+        if isinstance(edge_map, EdgeProbabilityMap):
+            return edge_map.mask((target_shape[1], target_shape[0]), config.dexined_threshold)
         
-        # Draw edges in specified color
-        edge_rgb[edge_binary > 0] = config.dexined_color
+        # Resize edge map back to the original image resolution
+        edge_resized = cv2.resize(edge_map, (target_shape[1], target_shape[0]))
         
-        return edge_rgb
+        # Apply threshold
+        return (edge_resized > config.dexined_threshold).astype(np.uint8) * 255
     
     def _fallback_edge_detection(self, image: np.ndarray, config: WireframeConfig) -> np.ndarray:
         """Fallback edge detection using Canny with white background"""
+        return self.colorize_mask(self._fallback_edge_mask(image), config.dexined_color)
+    
+    def _fallback_edge_mask(self, image: np.ndarray) -> np.ndarray:
+        """Canny edges as a full-resolution uint8 mask (255 on edges)"""
         gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        edges = cv2.Canny(gray, 50, 150)  # Simple Canny edge detector
-        
-        # Convert to RGB with WHITE background
-        edge_rgb = np.ones_like(image) * 255  # White background
-        edge_rgb[edges > 0] = config.dexined_color
-        
-        return edge_rgb
+        return cv2.Canny(gray, 50, 150)  # Simple Canny edge detector
+    
+    def _fallback_edge_map(self, image: np.ndarray) -> np.ndarray:
+        """Canny edges as a full-resolution 0/1 edge map"""
+        return (self._fallback_edge_mask(image) > 0).astype(np.float32)
     
 
+RUNNING_MODES = ('image', 'video', 'live_stream')
+
+def mediapipe_running_mode(name: str) -> Any:
+    """MediaPipe ``RunningMode`` for one of :data:`RUNNING_MODES`"""
+    if name not in RUNNING_MODES:
+        raise ValueError(f"Unknown running mode '{name}' (choose from {', '.join(RUNNING_MODES)})")
+    import mediapipe.tasks as mp_tasks
+    return getattr(mp_tasks.vision.RunningMode, name.upper())
+
 class PoseLandmarkerGenerator:
     """Generates pose landmarks using MediaPipe Pose Landmarker"""
     
-    def __init__(self, model_path: str = ""):
+    def __init__(self, model_path: str = "", running_mode: str = "image"):
+        """
+        Initialize generator.
+        
+        Args:
+            model_path: Path to the pose_landmarker .task model
+            running_mode: MediaPipe running mode, one of :data:`RUNNING_MODES`
+                ('video' and 'live_stream' need a timestamp per frame)
+        """
         self.detector = None
         self.model_path = model_path
+        self.running_mode = running_mode
+        self._latest_result = None  # Newest LIVE_STREAM result
         
         # Excluded landmarks (face/hands details)
         self.excluded_landmarks = {0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 17, 18, 19, 20, 21, 22}
@@ -416,44 +819,71 @@ class PoseLandmarkerGenerator:
     def _load_model(self):
         """Load MediaPipe Pose Landmarker model"""
         try:
+            import mediapipe.tasks as mp_tasks
             base_options = mp_tasks.BaseOptions(model_asset_path=self.model_path)
             options = mp_tasks.vision.PoseLandmarkerOptions(
                 base_options=base_options,
                 output_segmentation_masks=False,
-                running_mode=mp_tasks.vision.RunningMode.IMAGE
+                running_mode=mediapipe_running_mode(self.running_mode),
+                result_callback=self._on_result if self.running_mode == 'live_stream' else None
             )
             self.detector = mp_tasks.vision.PoseLandmarker.create_from_options(options)
         except Exception as e:
             print(f"Error loading Pose Landmarker model: {e}")
             self.detector = None
     
-    def detect_pose_landmarks(self, image: np.ndarray, config: WireframeConfig) -> Optional[List]:
+    def _on_result(self, result: Any, output_image: Any, timestamp_ms: int):
+        """LIVE_STREAM callback: keep the newest finished detection"""
+        self._latest_result = result
+    
+    def detect_pose_landmarks(self, image: np.ndarray, config: WireframeConfig,
+                              mp_image: Any = None,
+                              timestamp_ms: Optional[int] = None,
+                              raise_errors: bool = False) -> Optional[LandmarkArray]:
         """
         Detect pose landmarks from image
         
         Args:
             image: Input RGB image
             config: Wireframe configuration
+            mp_image: Prepared MediaPipe image to detect on instead (e.g. a
+                downscaled detection proxy of ``image``)
+            timestamp_ms: Frame timestamp, required in the video and live
+                stream running modes (in live stream mode the newest finished
+                result is returned, which may belong to an earlier frame)
+            raise_errors: Let detector errors propagate instead of reporting
+                them as "no pose" (so callers can tell the two apart)
             
         Returns:
-            List of pose landmarks or None if detection fails
+            Pose landmarks (as a LandmarkArray) or None if detection fails
         """
         if self.detector is None:
             return None
             
         try:
             # Convert numpy array to MediaPipe Image
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
+            if mp_image is None:
+                import mediapipe as mp
+                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
             
             # Detect pose landmarks
-            detection_result = self.detector.detect(mp_image)
+            if self.running_mode == 'video':
+                detection_result = self.detector.detect_for_video(mp_image, timestamp_ms)
+            elif self.running_mode == 'live_stream':
+                self.detector.detect_async(mp_image, timestamp_ms)
+                detection_result = self._latest_result
+            else:
+                detection_result = self.detector.detect(mp_image)
             
-            if detection_result.pose_landmarks:
-                return detection_result.pose_landmarks[0]  # Return first detected pose
+            if detection_result is not None and detection_result.pose_landmarks:
+                # Return first detected pose
+                return LandmarkArray.from_landmarks(detection_result.pose_landmarks[0])
             else:
                 return None
                 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error in pose landmark detection: {e}")
             return None
     
@@ -470,52 +900,54 @@ class PoseLandmarkerGenerator:
             Annotated image with pose landmarks
         """
         annotated = image.copy()
+        self.draw_pose_landmarks_into(annotated, landmarks, config)
+        return annotated
+    
+    def draw_pose_landmarks_into(self, image: np.ndarray, landmarks: List,
+                                 config: WireframeConfig,
+                                 colors: Optional[Dict[str, Tuple[int, int, int]]] = None):
+        """
+        Draw pose landmarks and connections in place
+        
+        Args:
+            image: Image to draw on (modified in place)
+            landmarks: Pose landmarks
+            config: Wireframe configuration
+            colors: Optional colour overrides keyed like ``config.pose_colors``;
+                elements whose colour is None are skipped
+        """
+        landmarks = LandmarkArray.from_landmarks(landmarks)
+        if not landmarks:
+            return
+        
         height, width = image.shape[:2]
+        if colors is None:
+            colors = config.pose_colors
+        
+        # Convert normalized coordinates to pixel coordinates
+        points = landmarks.pixels(width, height).tolist()
+        count = len(points)
         
         # Draw connections (skeleton)
-        for connection in self.pose_connections:
-            start_idx, end_idx = connection
-            
-            # Skip if landmarks are excluded
-            if start_idx in self.excluded_landmarks or end_idx in self.excluded_landmarks:
-                continue
-                
-            if start_idx < len(landmarks) and end_idx < len(landmarks):
-                start_landmark = landmarks[start_idx]
-                end_landmark = landmarks[end_idx]
-                
-                # Convert normalized coordinates to pixel coordinates
-                start_point = (
-                    int(start_landmark.x * width),
-                    int(start_landmark.y * height)
-                )
-                end_point = (
-                    int(end_landmark.x * width),
-                    int(end_landmark.y * height)
-                )
-                
-                # Draw connection line
-                cv2.line(annotated, start_point, end_point, 
-                        config.pose_colors['body_connections'], 
-                        config.pose_line_thickness)
+        if colors['body_connections'] is not None:
+            for start_idx, end_idx in self.pose_connections:
+                # Skip if landmarks are excluded
+                if start_idx in self.excluded_landmarks or end_idx in self.excluded_landmarks:
+                    continue
+                if start_idx < count and end_idx < count:
+                    cv2.line(image, points[start_idx], points[end_idx],
+                            colors['body_connections'],
+                            config.pose_line_thickness)
         
         # Draw landmark points
-        for idx, landmark in enumerate(landmarks):
-            # Skip excluded landmarks
-            if idx in self.excluded_landmarks:
-                continue
-                
-            # Convert normalized coordinates to pixel coordinates
-            point = (
-                int(landmark.x * width),
-                int(landmark.y * height)
-            )
-            
-            # Draw landmark point
-            cv2.circle(annotated, point, config.pose_point_radius, 
-                      config.pose_colors['landmark_points'], -1)
-        
-        return annotated
+        if colors['landmark_points'] is not None:
+            for idx in self.drawn_landmark_indices(count):
+                cv2.circle(image, points[idx], config.pose_point_radius,
+                          colors['landmark_points'], -1)
+    
+    def drawn_landmark_indices(self, count: int) -> List[int]:
+        """Indices of the landmarks drawn as points (all but the excluded ones)"""
+        return [idx for idx in range(count) if idx not in self.excluded_landmarks]
 
 
 class BackgroundMerger:
@@ -740,7 +1172,9 @@ class BackgroundRemover:
     @staticmethod
     def create_wireframe_rgba(image: np.ndarray, 
                             landmarks: List,
-                            method: str = "lines_only") -> np.ndarray:
+                            method: str = "lines_only",
+                            canvas_size: Optional[Tuple[int, int]] = None,
+                            offset: Tuple[int, int] = (0, 0)) -> np.ndarray:
         """
         Create RGBA wireframe by removing background
         
@@ -748,6 +1182,9 @@ class BackgroundRemover:
             image: Input RGB image with lines drawn on white canvas
             landmarks: MediaPipe face landmarks (not used for lines_only method)
             method: Background removal method
+            canvas_size: (width, height) of the full canvas when ``image`` is
+                one tile of it (only used by face_mask)
+            offset: (x, y) of the tile's top-left corner on the full canvas
             
         Returns:
             RGBA image with transparent background
@@ -755,7 +1192,7 @@ class BackgroundRemover:
         if method == "lines_only":
             return BackgroundRemover._lines_only_method(image)
         elif method == "face_mask":
-            return BackgroundRemover._face_mask_method(image, landmarks)
+            return BackgroundRemover._face_mask_method(image, landmarks, canvas_size, offset)
         elif method == "color_diff":
             return BackgroundRemover._color_diff_method(image)
         elif method == "color_filter":
@@ -780,9 +1217,12 @@ class BackgroundRemover:
         return rgba_image
     
     @staticmethod
-    def _face_mask_method(image: np.ndarray, landmarks: List) -> np.ndarray:
+    def _face_mask_method(image: np.ndarray, landmarks: List,
+                          canvas_size: Optional[Tuple[int, int]] = None,
+                          offset: Tuple[int, int] = (0, 0)) -> np.ndarray:
         """Remove background using face contour mask"""
         height, width = image.shape[:2]
+        canvas_width, canvas_height = canvas_size or (width, height)
         
         # Define face oval points
         face_oval_points = [
@@ -792,19 +1232,16 @@ class BackgroundRemover:
         ]
         
         # Convert landmarks to pixel coordinates
-        face_points = []
-        for idx in face_oval_points:
-            if idx < len(landmarks):
-                landmark = landmarks[idx]
-                x = int(landmark.x * width)
-                y = int(landmark.y * height)
-                face_points.append((x, y))
+        landmarks = LandmarkArray.from_landmarks(landmarks)
+        face_points = (landmarks.pixel_points(canvas_width, canvas_height, face_oval_points)
+                       if landmarks else np.zeros((0, 2), dtype=np.int32))
+        if offset != (0, 0):
+            face_points = face_points - np.array(offset, dtype=np.int32)
         
         # Create face mask
         mask = np.zeros((height, width), dtype=np.uint8)
         if len(face_points) > 0:
-            face_contour = np.array(face_points, dtype=np.int32)
-            cv2.fillPoly(mask, [face_contour], 255)
+            cv2.fillPoly(mask, [face_points], 255)
             
             # Erode mask slightly
             kernel = np.ones((5, 5), np.uint8)
@@ -849,9 +1286,114 @@ class BackgroundRemover:
         
         return result
 
+class LayeredCanvas:
+    """Single output buffer that wireframe layers are drawn into in z-order.
+
+    Holds one RGB image plus a uint8 alpha plane (255 wherever the pixel is
+    not near-white, i.e. what ``BackgroundRemover._lines_only_method`` would
+    keep). Vector layers draw straight into ``rgb`` and raster layers are
+    pasted inside their bounding box; afterwards only the alpha values inside
+    that box are refreshed, so no per-layer canvases or full-frame masks are
+    needed.
+    """
+    
+    # Pixels with every channel at or above this value count as background
+    WHITE_LEVEL = 250
+    
+    def __init__(self, height: int, width: int, base: Optional[np.ndarray] = None):
+        """
+        Initialize canvas.
+        
+        Args:
+            height: Canvas height in pixels
+            width: Canvas width in pixels
+            base: Optional RGB image to start from (copied); white when omitted
+        """
+        if base is None:
+            self.rgb = np.full((height, width, 3), 255, dtype=np.uint8)
+            self.alpha = np.zeros((height, width), dtype=np.uint8)
+        else:
+            self.rgb = np.array(base, dtype=np.uint8, copy=True)
+            self.alpha = self._coverage(self.rgb)
+    
+    @classmethod
+    def _coverage(cls, rgb: np.ndarray) -> np.ndarray:
+        """Alpha for an RGB region: transparent where all channels are near-white"""
+        background = np.all(rgb >= cls.WHITE_LEVEL, axis=2)
+        return np.where(background, 0, 255).astype(np.uint8)
+    
+    def points_bbox(self, points: np.ndarray, margin: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Bounding box (x0, y0, x1, y1) of pixel points grown by ``margin``
+        and clipped to the canvas, or None when it is empty
+        """
+        if len(points) == 0:
+            return None
+        height, width = self.alpha.shape
+        x0 = max(int(points[:, 0].min()) - margin, 0)
+        y0 = max(int(points[:, 1].min()) - margin, 0)
+        x1 = min(int(points[:, 0].max()) + margin + 1, width)
+        y1 = min(int(points[:, 1].max()) + margin + 1, height)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return (x0, y0, x1, y1)
+    
+    def refresh_alpha(self, bbox: Optional[Tuple[int, int, int, int]]):
+        """Recompute the alpha plane inside a layer's bounding box"""
+        if bbox is None:
+            return
+        x0, y0, x1, y1 = bbox
+        self.alpha[y0:y1, x0:x1] = self._coverage(self.rgb[y0:y1, x0:x1])
+    
+    def paint_mask(self, mask: np.ndarray, color: Tuple[int, int, int]):
+        """
+        Paint a raster layer given as a binary mask in a single colour
+        
+        Args:
+            mask: uint8/bool mask the size of the canvas (non-zero = paint)
+            color: RGB colour for masked pixels
+        """
+        mask = mask.astype(np.uint8, copy=False)
+        x, y, w, h = cv2.boundingRect(mask)
+        if w == 0 or h == 0:
+            return
+        region = mask[y:y + h, x:x + w] > 0
+        self.rgb[y:y + h, x:x + w][region] = color
+        self.refresh_alpha((x, y, x + w, y + h))
+    
+    def to_rgba(self) -> np.ndarray:
+        """RGBA image with the alpha plane attached"""
+        return np.dstack((self.rgb, self.alpha))
+
+
+@dataclass
+class InferenceContext:
+    """Per-image detection results shared by every raster and vector output
+
+    Built once per image by :meth:`WireframePortraitProcessor.build_inference_context`.
+    Layer rendering and SVG export only read from it, so face detection, pose
+    detection and DexiNed each run at most once per image no matter how many
+    outputs are produced.
+    """
+    image: np.ndarray
+    image_path: str = ""
+    landmarks: Optional[List] = None
+    detection_result: Any = None
+    pose_landmarks: Optional[List] = None
+    edge_map: Optional[EdgeProbabilityMap] = None  # Raw DexiNed map before thresholding
+    # Outlines and their contours keyed by (threshold, color); binary masks
+    # are memoized by the edge map itself
+    outlines: Dict[Tuple, np.ndarray] = field(default_factory=dict)
+    contours: Dict[Tuple, List[np.ndarray]] = field(default_factory=dict)
+
 class WireframePortraitProcessor:
     """Main processor for wireframe portrait generation"""
     
+    # MediaPipe running mode of the landmarkers; subclasses for frame
+    # sequences set 'video' or 'live_stream' and a timestamp per frame
+    running_mode = 'image'
+    frame_timestamp_ms: Optional[int] = None
+    
     def __init__(self, config: WireframeConfig):
         self.config = config
         
@@ -863,40 +1405,106 @@ class WireframePortraitProcessor:
         self.background_merger = None
 
         if config.enable_dexined_outline and config.dexined_model_path:
-            self.dexined_generator = DexiNedGenerator(config.dexined_model_path)
+            self.dexined_generator = DexiNedGenerator.from_config(config)
 
         if config.enable_pose_landmarks and config.pose_model_path:
-            self.pose_landmarker_generator = PoseLandmarkerGenerator(config.pose_model_path)
+            self.pose_landmarker_generator = PoseLandmarkerGenerator(config.pose_model_path, self.running_mode)
 
         if config.enable_background_merge:
             self.background_merger = BackgroundMerger(config)
+
+        self.attach_profiler(StageProfiler(
+            enabled=config.profile,
+            track_memory=config.profile_memory,
+            trace_path=config.trace_path
+        ))
+        
+        self.geometry_cache = None
+        if config.geometry_cache_dir:
+            self.geometry_cache = GeometryCache(config.geometry_cache_dir, config.geometry_cache_max_mb)
+        if self.dexined_generator:
+            self.dexined_generator.memo.cache = self.geometry_cache
+        
+        self.face_prefilter = None
+        # Batch runs check the prefilter before loading and switch this off,
+        # so each image is checked once
+        self.prefilter_on_load = True
+        if config.face_prefilter:
+            self.face_prefilter = FacePresenceFilter(
+                config.face_prefilter_confidence, config.face_prefilter_size,
+                cache=self.geometry_cache
+            )
         
-        # Initialize MediaPipe
-        self.mp_face_landmarker = mp.solutions.face_mesh
-        self._setup_face_detector()
-    
-    def _setup_face_detector(self):
-        """Setup MediaPipe face detection"""
-        from mediapipe.tasks import python
-        from mediapipe.tasks.python import vision
-        
-        model_path = os.path.join(
+        # MediaPipe face landmarker, created on the first detection so runs
+        # answered from the geometry cache never load MediaPipe
+        self.face_model_path = os.path.join(
             os.path.dirname(__file__), 
             '..', 'mediapipe_practice', 'face_landmarker.task'
         )
+        self._detector = None
+        self._detector_ready = False
+        self._latest_face_result = None
+        if not os.path.exists(self.face_model_path):
+            print(f"Warning: Face landmarker model not found at {self.face_model_path}")
+    
+    @property
+    def mp_face_landmarker(self) -> Any:
+        """Legacy MediaPipe face-mesh solution module"""
+        import mediapipe as mp
+        return mp.solutions.face_mesh
+    
+    @property
+    def detector(self) -> Any:
+        """MediaPipe FaceLandmarker (None without a model), loaded on first use"""
+        if not self._detector_ready:
+            self._setup_face_detector()
+        return self._detector
+    
+    def load_models(self):
+        """
+        Load what the first image would otherwise load on demand: the face
+        landmarker, plus the face-mesh connections when the mesh is drawn
         
+        Batch and video runs call this inside their setup timer, so model
+        loading is not charged to the first image or frame.
+        """
+        self.detector
+        if self.config.enable_mesh:
+            face_mesh_renderer.mesh_styles()
+    
+    def _setup_face_detector(self):
+        """Setup MediaPipe face detection"""
+        self._detector_ready = True
+        model_path = self.face_model_path
         if os.path.exists(model_path):
+            from mediapipe.tasks import python
+            from mediapipe.tasks.python import vision
+            
             base_options = python.BaseOptions(model_asset_path=model_path)
             options = vision.FaceLandmarkerOptions(
                 base_options=base_options,
                 output_face_blendshapes=False,
                 output_facial_transformation_matrixes=False,
-                num_faces=1
+                num_faces=1,
+                running_mode=mediapipe_running_mode(self.running_mode),
+                result_callback=self._on_face_result if self.running_mode == 'live_stream' else None
             )
-            self.detector = vision.FaceLandmarker.create_from_options(options)
-        else:
-            self.detector = None
-            print(f"Warning: Face landmarker model not found at {model_path}")
+            self._detector = vision.FaceLandmarker.create_from_options(options)
+    
+    def _on_face_result(self, result: Any, output_image: Any, timestamp_ms: int):
+        """LIVE_STREAM callback: keep the newest finished face detection"""
+        self._latest_face_result = result
+    
+    def attach_profiler(self, profiler: StageProfiler):
+        """Record stage timings (including DexiNed's) with ``profiler``"""
+        self.profiler = profiler
+        if self.dexined_generator:
+            self.dexined_generator.profiler = profiler
+    
+    def _log(self, message: str):
+        """Print a progress message unless quiet mode is on"""
+        if not self.config.quiet:
+            print(message)
     
     def process_image(self, image_path: str, output_path: str = None) -> Dict[str, np.ndarray]:
         """
@@ -908,190 +1516,543 @@ class WireframePortraitProcessor:
             
         Returns:
             Dictionary containing generated images and intermediate steps
+            (plus per-stage ``timings`` when profiling or tracing is enabled)
         """
-        # Load and preprocess image
-        image = self._load_image(image_path)
-        if image is None:
-            return {}
+        self.profiler.begin(image_path)
+        with self.profiler.stage('total'):
+            # Load and preprocess image
+            image = self._load_image(image_path)
+            if image is None:
+                results = {}
+            else:
+                # Run every detector the configuration needs exactly once
+                context = self.build_inference_context(image, image_path)
+                if not context.landmarks:
+                    self._log("No face detected in image")
+                    results = {}
+                else:
+                    results = self.render_context(context, output_path)
         
-        # Detect face landmarks
-        landmarks, detection_result = self._detect_landmarks(image)
-        if not landmarks:
-            print("No face detected in image")
-            return {}
+        timings = self._finish_profile()
+        if results and timings is not None:
+            results['timings'] = timings
+        return results
+    
+    def _finish_profile(self) -> Optional[Dict[str, Dict[str, float]]]:
+        """Write the trace for the current image and report its timings"""
+        if not self.profiler.enabled:
+            return None
+        timings = self.profiler.finish()
+        if self.config.profile or self.config.profile_memory:
+            print(f"\nStage timings for {self.profiler.image_path}:")
+            print(format_timings(timings))
+        return timings
+    
+    def build_inference_context(self, image: np.ndarray, image_path: str = "",
+                                detect_edges: bool = True,
+                                proxy: Optional[DetectionProxy] = None) -> InferenceContext:
+        """
+        Run face detection, pose detection and DexiNed once for an image
         
-        results = {
-            'original': image,
-            'landmarks': landmarks
-        }
+        Args:
+            image: Input RGB image
+            image_path: Path the image was loaded from (used for background merge)
+            detect_edges: Run DexiNed as well; pass False to batch it over
+                several contexts afterwards with :meth:`add_edge_maps`
+            proxy: Detection proxy already built for ``image`` (built here,
+                on first detector use, when omitted)
+            
+        Returns:
+            Inference context; ``landmarks`` is None when no face was found, in
+            which case the remaining detectors are skipped
+        """
+        context = InferenceContext(image=image, image_path=image_path)
+        cache = self.geometry_cache
+        image_key = cache.image_key(image) if cache else None
+        
+        # Detect face landmarks (a cached empty entry means "no face"); the
+        # proxy size changes the landmarks slightly, so it is part of the key
+        proxy_variant = f"proxy{self.config.detection_max_side}"
+        face_model_id = model_identity(self.face_model_path, proxy_variant)
+        cached_face = cache.get(image_key, FACE_LANDMARKS, face_model_id) if cache else None
+        if cached_face is not None:
+            context.landmarks = landmarks_from_array(cached_face)
+            context.detection_result = face_result_from_landmarks(context.landmarks)
+        else:
+            # Only a detector call that succeeded is cached: a failed one says
+            # nothing about the image, and caching it would hide the face for good
+            detected = self.detector is not None
+            with self.profiler.stage('face_detect'):
+                if proxy is None:
+                    proxy = self.detection_proxy(image)
+                try:
+                    context.landmarks, context.detection_result = self._detect_landmarks(
+                        image, mp_image=proxy.mp_image, raise_errors=True
+                    )
+                except Exception as e:
+                    print(f"Error in landmark detection: {e}")
+                    detected = False
+            if cache and detected:
+                cache.put(image_key, FACE_LANDMARKS, face_model_id, landmarks_to_array(context.landmarks))
+        if not context.landmarks:
+            return context
         
-        # Start with blank canvas (white background) - the original photo is not
-        # part of the final wireframe output.
-        height, width = image.shape[:2]
-        current_image = np.ones((height, width, 3), dtype=np.uint8) * 255
+        if self.config.enable_pose_landmarks and self.pose_landmarker_generator:
+            pose_model_id = model_identity(self.pose_landmarker_generator.model_path, proxy_variant)
+            cached_pose = cache.get(image_key, POSE_LANDMARKS, pose_model_id) if cache else None
+            if cached_pose is not None:
+                context.pose_landmarks = landmarks_from_array(cached_pose)
+            else:
+                detected = self.pose_landmarker_generator.detector is not None
+                with self.profiler.stage('pose_detect'):
+                    if proxy is None:
+                        proxy = self.detection_proxy(image)
+                    try:
+                        context.pose_landmarks = self.pose_landmarker_generator.detect_pose_landmarks(
+                            image, self.config, mp_image=proxy.mp_image,
+                            timestamp_ms=self.frame_timestamp_ms, raise_errors=True
+                        )
+                    except Exception as e:
+                        print(f"Error in pose landmark detection: {e}")
+                        detected = False
+                if cache and detected:
+                    cache.put(image_key, POSE_LANDMARKS, pose_model_id,
+                              landmarks_to_array(context.pose_landmarks))
+        
+        if detect_edges:
+            self.add_edge_maps([context])
+        
+        return context
+    
+    def add_edge_maps(self, contexts: List[InferenceContext]):
+        """
+        Fill in the DexiNed edge maps of several contexts with batched inference
         
-        # Generate each wireframe layer separately to ensure proper stacking
-        # Layer 1: Face Mesh (drawn directly on white canvas)
-        face_mesh_layer = None
-        if self.config.enable_mesh:
-            print("Generating face mesh layer...")
-            face_mesh_layer = self.mesh_generator.draw_face_mesh(
-                current_image.copy(), detection_result, self.config
-            )
-            results['mesh'] = face_mesh_layer.copy()
-            print("Face mesh layer generated")
-        
-        # Layer 2: Construction Lines (separate layer)
-        construction_lines_layer = None
-        if self.config.enable_construction_lines:
-            print("Generating construction lines layer...")
-            construction_canvas = np.ones((height, width, 3), dtype=np.uint8) * 255
-            construction_lines_layer = self.construction_generator.draw_construction_lines(
-                construction_canvas, landmarks, self.config
-            )
-            results['construction_lines'] = construction_lines_layer.copy()
-            print("Construction lines layer generated")
+        Contexts without a face or with an edge map already set are skipped;
+        maps memoized in memory or cached on disk are reused and the rest go
+        through the model in micro-batches of ``config.dexined_batch_size``.
         
-        # Layer 3: Pose Landmarks (separate layer)
-        pose_landmarks_layer = None
-        if self.config.enable_pose_landmarks and self.pose_landmarker_generator:
-            print("Generating pose landmarks layer...")
-            pose_landmarks = self.pose_landmarker_generator.detect_pose_landmarks(image, self.config)
-            if pose_landmarks:
-                pose_canvas = np.ones((height, width, 3), dtype=np.uint8) * 255
-                pose_landmarks_layer = self.pose_landmarker_generator.draw_pose_landmarks(
-                    pose_canvas, pose_landmarks, self.config
-                )
-                results['pose_landmarks'] = pose_landmarks_layer.copy()
-                print("Pose landmarks layer generated")
+        Args:
+            contexts: Inference contexts built with ``detect_edges=False``
+        """
+        if not (self.config.enable_dexined_outline and self.dexined_generator):
+            return
+        
+        memo = self.dexined_generator.memo
+        variant = self.dexined_generator.variant
+        if self.config.dexined_roi_mode:
+            variant += (f"-roi{self.config.dexined_roi_size}p{self.config.dexined_roi_padding:g}"
+                        f"{'-pose' if self.config.dexined_roi_pose else ''}")
+        edge_model_id = model_identity(self.dexined_generator.model_path, variant)
+        pending = []
+        for context in contexts:
+            if not context.landmarks or context.edge_map is not None:
+                continue
+            # Only model output is memoized; the Canny fallback is cheap
+            use_memo = memo.enabled and self.dexined_generator.has_model
+            image_key = memo.image_key(context.image) if use_memo else None
+            edge_map = memo.get(image_key, edge_model_id) if image_key else None
+            if edge_map is not None:
+                context.edge_map = edge_map
             else:
-                print("No pose landmarks detected")
-        
-        # Layer 4: DexiNed Outline (if enabled)
-        dexined_layer = None
-        if self.config.enable_dexined_outline and self.dexined_generator:
-            print("Generating DexiNed outline layer...")
-            dexined_layer = self.dexined_generator.generate_outline(image, self.config)
-            results['dexined_outline'] = dexined_layer.copy()
-            print("DexiNed outline layer generated")
-
-        # FINAL LAYER COMPOSITION (Bottom → Top)
-        print("Starting final layer composition...")
-        
-        if self.config.enable_background_merge and self.background_merger:
-            # Step 1 & 2: Background + Foreground merge
-            background_path = self.background_merger.find_matching_background(image_path)
-            foreground_path = self.background_merger.find_matching_foreground(image_path)
-
-            if background_path:
-                print("Compositing background and foreground layers...")
-                # Use white canvas as base for background merge
-                base_canvas = np.ones((height, width, 3), dtype=np.uint8) * 255
-                current_image = self.background_merger.merge_with_background(
-                    base_canvas, background_path, foreground_path
+                pending.append((context, image_key))
+        if not pending:
+            return
+        
+        with self.profiler.stage('dexined'):
+            images = [context.image for context, _ in pending]
+            if self.config.dexined_roi_mode:
+                edge_maps = self.dexined_generator.predict_roi_edge_maps(
+                    images, [self._dexined_rois(context) for context, _ in pending],
+                    self.config.dexined_batch_size, self.config.dexined_roi_size
                 )
-                results['background_merged'] = current_image.copy()
-                print("Background/foreground layers composited")
             else:
-                print("Warning: Background merge enabled but no matching background found")
-        else:
-            # Start with white canvas if no background merge
-            current_image = np.ones((height, width, 3), dtype=np.uint8) * 255
+                edge_maps = self.dexined_generator.predict_edge_maps(images, self.config.dexined_batch_size)
+        for (context, image_key), edge_map in zip(pending, edge_maps):
+            context.edge_map = EdgeProbabilityMap(edge_map)
+            if image_key:
+                memo.put(image_key, edge_model_id, context.edge_map)
+    
+    def _dexined_rois(self, context: InferenceContext) -> List[Tuple[int, int, int, int]]:
+        """
+        Square DexiNed ROIs around the face (and optionally the pose) landmarks
+        
+        Args:
+            context: Inference context with landmarks
             
-        # Step 3: Overlay Face Mesh
-        if face_mesh_layer is not None:
-            print("Overlaying face mesh layer...")
-            mesh_mask = np.all(face_mesh_layer < 250, axis=2)
-            mesh_pixel_count = np.sum(mesh_mask)
-            if mesh_pixel_count > 0:
-                current_image[mesh_mask] = face_mesh_layer[mesh_mask]
-                print(f"Face mesh overlaid: {mesh_pixel_count} pixels")
+        Returns:
+            (x0, y0, x1, y1) pixel boxes; they may extend past the image
+        """
+        height, width = context.image.shape[:2]
+        landmark_sets = [context.landmarks]
+        if self.config.dexined_roi_pose and context.pose_landmarks:
+            landmark_sets.append(context.pose_landmarks)
+        
+        rois = []
+        for landmarks in landmark_sets:
+            landmarks = LandmarkArray.from_landmarks(landmarks)
+            if not landmarks:
+                continue
+            points = landmarks.coords[:, :2]
+            # Pose landmarks may lie outside the frame
+            points = np.clip(points, 0.0, 1.0) * (width, height)
+            (left, top), (right, bottom) = points.min(axis=0), points.max(axis=0)
+            side = max(right - left, bottom - top) * (1.0 + 2.0 * self.config.dexined_roi_padding)
+            if side < 1:
+                continue
+            center_x, center_y = (left + right) / 2, (top + bottom) / 2
+            x0, y0 = int(round(center_x - side / 2)), int(round(center_y - side / 2))
+            rois.append((x0, y0, x0 + int(round(side)), y0 + int(round(side))))
+        return rois
+    
+    def render_context(self, context: InferenceContext, output_path: str = None,
+                       config: Optional[WireframeConfig] = None,
+                       save: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Render raster and vector outputs from a precomputed inference context
+        
+        Args:
+            context: Detection results for one image
+            output_path: Optional path to save result
+            config: Styling/feature configuration to render with (defaults to
+                the processor's configuration). Features it enables must have
+                been detected when the context was built.
+            save: Write the outputs; pass False to write them later (e.g. on
+                another thread) with :meth:`save_outputs`
             
-        # Step 4: Overlay Construction Lines (Top layer)
-        if construction_lines_layer is not None:
-            print("Overlaying construction lines layer...")
-            # More lenient mask detection - not pure white (255,255,255)
-            construction_mask = ~np.all(construction_lines_layer == 255, axis=2)
-            construction_pixel_count = np.sum(construction_mask)
-            if construction_pixel_count > 0:
-                # Make construction lines darker for better visibility
-                darkened_construction = np.clip(construction_lines_layer[construction_mask] * 0.8, 0, 180)
-                current_image[construction_mask] = darkened_construction
-                print(f"Construction lines overlaid: {construction_pixel_count} pixels")
-            else:
-                print("WARNING: No construction line pixels found")
+        Returns:
+            Dictionary containing generated images and intermediate steps
+        """
+        if config is None:
+            config = self.config
+        background_merger = self.background_merger
+        if config is not self.config:
+            background_merger = BackgroundMerger(config) if config.enable_background_merge else None
+        
+        image = context.image
+        image_path = context.image_path
+        landmarks = context.landmarks
+        detection_result = context.detection_result
+        
+        results = {
+            'original': image,
+            'landmarks': landmarks
+        }
+        
+        # The original photo is not part of the final wireframe output: layers
+        # are drawn in z-order (bottom → top) into one canvas that starts out
+        # white, or as the merged background when background merging is on.
+        with self.profiler.stage('composite'):
+            height, width = image.shape[:2]
+            base_image = None
+            if config.enable_background_merge and background_merger:
+                # Step 1 & 2: Background + Foreground merge
+                background_path = background_merger.find_matching_background(image_path)
+                foreground_path = background_merger.find_matching_foreground(image_path)
+
+                if background_path:
+                    self._log("Compositing background and foreground layers...")
+                    # Use white canvas as base for background merge
+                    base_canvas = np.full((height, width, 3), 255, dtype=np.uint8)
+                    base_image = background_merger.merge_with_background(
+                        base_canvas, background_path, foreground_path
+                    )
+                    results['background_merged'] = base_image
+                    self._log("Background/foreground layers composited")
+                else:
+                    print("Warning: Background merge enabled but no matching background found")
+            
+            canvas = LayeredCanvas(height, width, base_image)
+        
+        # Step 3: Face Mesh
+        if config.enable_mesh:
+            with self.profiler.stage('render_mesh'):
+                self._log("Drawing face mesh layer...")
+                # Mesh pixels are kept only where every channel is below the white level
+                mesh_colors = {
+                    name: color if color and max(color) < LayeredCanvas.WHITE_LEVEL else None
+                    for name, color in config.mesh_colors.items()
+                }
+                self.mesh_generator.draw_face_mesh_into(
+                    canvas.rgb, detection_result, config, mesh_colors
+                )
+                mesh_points = np.vstack([
+                    face_landmarks.pixels(width, height)
+                    for face_landmarks in detection_result.face_landmarks
+                ]) if detection_result.face_landmarks else np.zeros((0, 2), dtype=np.int32)
+                canvas.refresh_alpha(canvas.points_bbox(mesh_points, config.mesh_thickness + 2))
+                if config.save_intermediate_steps:
+                    results['mesh'] = self.mesh_generator.draw_face_mesh(
+                        np.full((height, width, 3), 255, dtype=np.uint8), detection_result, config
+                    )
+                self._log("Face mesh layer drawn")
+            
+        # Step 4: Construction Lines, darkened for better visibility
+        if config.enable_construction_lines:
+            with self.profiler.stage('render_construction_lines'):
+                self._log("Drawing construction lines layer...")
+                self.construction_generator.draw_construction_lines_into(
+                    canvas.rgb, landmarks, config,
+                    self._darkened_colors(config.construction_line_colors)
+                )
+                line_indices = sorted({
+                    idx for indices, _ in ConstructionLinesGenerator.CONSTRUCTION_LINES
+                    for idx in indices
+                })
+                canvas.refresh_alpha(canvas.points_bbox(
+                    landmarks.pixel_points(width, height, line_indices),
+                    config.construction_line_thickness + 2
+                ))
+                if config.save_intermediate_steps:
+                    results['construction_lines'] = self.construction_generator.draw_construction_lines(
+                        np.full((height, width, 3), 255, dtype=np.uint8), landmarks, config
+                    )
+                self._log("Construction lines layer drawn")
                 
-        # Step 5: Overlay Pose Landmarks (Top layer)  
-        if pose_landmarks_layer is not None:
-            print("Overlaying pose landmarks layer...")
-            # More lenient mask detection - not pure white (255,255,255)
-            pose_mask = ~np.all(pose_landmarks_layer == 255, axis=2)
-            pose_pixel_count = np.sum(pose_mask)
-            if pose_pixel_count > 0:
-                # Make pose landmarks darker for better visibility
-                darkened_pose = np.clip(pose_landmarks_layer[pose_mask] * 0.8, 0, 180)
-                current_image[pose_mask] = darkened_pose
-                print(f"Pose landmarks overlaid: {pose_pixel_count} pixels")
+        # Step 5: Pose Landmarks, darkened for better visibility
+        if config.enable_pose_landmarks and self.pose_landmarker_generator:
+            pose_landmarks = context.pose_landmarks
+            if pose_landmarks:
+                with self.profiler.stage('render_pose'):
+                    self._log("Drawing pose landmarks layer...")
+                    pose_generator = self.pose_landmarker_generator
+                    pose_generator.draw_pose_landmarks_into(
+                        canvas.rgb, pose_landmarks, config,
+                        self._darkened_colors(config.pose_colors)
+                    )
+                    pose_indices = pose_generator.drawn_landmark_indices(len(pose_landmarks))
+                    canvas.refresh_alpha(canvas.points_bbox(
+                        pose_landmarks.pixel_points(width, height, pose_indices),
+                        max(config.pose_line_thickness, config.pose_point_radius) + 2
+                    ))
+                    if config.save_intermediate_steps:
+                        results['pose_landmarks'] = pose_generator.draw_pose_landmarks(
+                            np.full((height, width, 3), 255, dtype=np.uint8), pose_landmarks, config
+                        )
+                    self._log("Pose landmarks layer drawn")
             else:
-                print("WARNING: No pose landmark pixels found")
+                self._log("No pose landmarks detected")
                 
-        # Step 6: Overlay DexiNed Outline (if enabled)
-        if dexined_layer is not None:
-            print("Overlaying DexiNed outline layer...")
-            outline_mask = np.all(dexined_layer < 250, axis=2)
-            outline_pixel_count = np.sum(outline_mask)
-            if outline_pixel_count > 0:
-                current_image[outline_mask] = dexined_layer[outline_mask]
-                print(f"DexiNed outline overlaid: {outline_pixel_count} pixels")
-        
-        print("Final layer composition completed")
+        # Step 6: DexiNed Outline (if enabled)
+        if config.enable_dexined_outline and context.edge_map is not None:
+            with self.profiler.stage('render_dexined'):
+                self._log("Drawing DexiNed outline layer...")
+                with self.profiler.stage('dexined_postprocess'):
+                    edge_mask = self._get_edge_mask(context, config)
+                if max(config.dexined_color) < LayeredCanvas.WHITE_LEVEL:
+                    canvas.paint_mask(edge_mask, config.dexined_color)
+                if config.save_intermediate_steps:
+                    results['dexined_outline'] = self._get_outline(context, config)
+                self._log("DexiNed outline layer drawn")
+        
+        self._log("Final layer composition completed")
 
         # Apply background removal if needed to produce RGBA output
-        if self.config.output_format == "rgba":
-            rgba_image = BackgroundRemover.create_wireframe_rgba(
-                current_image, landmarks, self.config.background_removal_method
-            )
+        if config.output_format == "rgba":
+            with self.profiler.stage('rgba'):
+                if config.background_removal_method == "lines_only":
+                    # The canvas already tracks which pixels hold lines
+                    rgba_image = canvas.to_rgba()
+                else:
+                    rgba_image = BackgroundRemover.create_wireframe_rgba(
+                        canvas.rgb, landmarks, config.background_removal_method
+                    )
             results['final_rgba'] = rgba_image
             final_result = rgba_image
         else:
-            results['final_rgb'] = current_image
-            final_result = current_image
+            results['final_rgb'] = canvas.rgb
+            final_result = canvas.rgb
         
         # Generate SVG if requested
-        svg_content = None
-        if self.config.enable_svg_export or self.config.output_format == "svg":
-            svg_content = self._generate_svg(image, landmarks, detection_result)
-            results['svg_content'] = svg_content
-            
+        if config.enable_svg_export or config.output_format == "svg":
+            with self.profiler.stage('svg_build'):
+                results['svg_content'] = self._generate_svg(context, config)
+        
+        if save:
+            self.save_outputs(results, output_path, config)
+        
+        return results
+    
+    def save_outputs(self, results: Dict[str, np.ndarray], output_path: Optional[str],
+                     config: Optional[WireframeConfig] = None):
+        """
+        Write the SVG and raster outputs of :meth:`render_context`
+        
+        Args:
+            results: Results dictionary returned by :meth:`render_context`
+            output_path: Path to save the result to (None writes only an
+                explicitly configured SVG path)
+            config: Configuration the results were rendered with (defaults to
+                the processor's configuration)
+        """
+        if config is None:
+            config = self.config
+        final_result = results.get('final_rgba', results.get('final_rgb'))
+        svg_content = results.get('svg_content')
+        svg_path = None
+        if 'svg_content' in results:
             # Save SVG file
-            if self.config.svg_output_path:
-                svg_path = self.config.svg_output_path
+            if config.svg_output_path:
+                svg_path = config.svg_output_path
             elif output_path:
                 svg_path = os.path.splitext(output_path)[0] + '.svg'
             else:
                 svg_path = None
                 
             if svg_path and svg_content:
-                with open(svg_path, 'w', encoding='utf-8') as f:
-                    f.write(svg_content)
-                print(f"Saved SVG wireframe to: {svg_path}")
+                with self.profiler.stage('encode_write'):
+                    svg_dir = os.path.dirname(svg_path)
+                    if svg_dir:
+                        os.makedirs(svg_dir, exist_ok=True)
+                    with open(svg_path, 'w', encoding='utf-8') as f:
+                        f.write(svg_content)
+                self._log(f"Saved SVG wireframe to: {svg_path}")
         
         # Save raster result if output path specified and not SVG-only mode
-        if output_path and self.config.output_format not in ["svg"]:
+        if output_path and config.output_format not in ["svg"]:
             self._save_image(final_result, output_path)
-        elif output_path and self.config.output_format == "svg":
+        elif output_path and config.output_format == "svg":
             if not svg_content:
                 # If SVG format requested but no SVG generated, save as PNG instead
                 png_path = os.path.splitext(output_path)[0] + '.png'
                 self._save_image(final_result, png_path)
                 print(f"Note: SVG generation failed, saved as PNG: {png_path}")
             else:
-                print(f"SVG-only mode: raster output skipped, SVG saved to: {svg_path if 'svg_path' in locals() else 'specified path'}")
+                self._log(f"SVG-only mode: raster output skipped, SVG saved to: {svg_path or 'specified path'}")
+    
+    def process_variants(self, image_path: str,
+                         variants: Dict[str, WireframeConfig],
+                         output_paths: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Render several configurations of one image from a single detection pass
         
-        return results
+        The processor should be built from :func:`merge_feature_configs` over
+        the variants so every detector any variant needs is available.
+        
+        Args:
+            image_path: Path to input image
+            variants: Configurations to render, keyed by variant name
+            output_paths: Optional output path per variant name
+            
+        Returns:
+            Results dictionary per variant name (empty if no face was found)
+        """
+        self.profiler.begin(image_path)
+        variant_results = {}
+        with self.profiler.stage('total'):
+            image = self._load_image(image_path)
+            context = self.build_inference_context(image, image_path) if image is not None else None
+            if context is not None and not context.landmarks:
+                self._log("No face detected in image")
+            elif context is not None:
+                output_paths = output_paths or {}
+                for name, variant_config in variants.items():
+                    self._log(f"\nRendering variant: {name}")
+                    variant_results[name] = self.render_context(
+                        context, output_paths.get(name), variant_config
+                    )
+        
+        # Stages shared by all variants (load, detection) are counted once
+        timings = self._finish_profile()
+        if timings is not None:
+            for results in variant_results.values():
+                results['timings'] = timings
+        return variant_results
+    
+    def process_batch(self, image_paths: List[str],
+                      output_paths: Optional[List[Optional[str]]] = None,
+                      variants: Optional[Dict[str, WireframeConfig]] = None) -> List[Dict]:
+        """
+        Process several images, running DexiNed over them in micro-batches
+        
+        Images are loaded and face/pose detection runs per image as usual;
+        DexiNed then runs once over every image with a face (in batches of
+        ``config.dexined_batch_size``) before each image is rendered. Timings
+        of the batched DexiNed call are shared evenly between its images.
+        
+        Args:
+            image_paths: Paths of the input images
+            output_paths: Optional output path per image (with ``variants``,
+                the base path :func:`variant_output_paths` derives from)
+            variants: Optional configurations rendered per image, as in
+                :meth:`process_variants`
+            
+        Returns:
+            Per image, the results dictionary (or the per-variant results
+            dictionaries when ``variants`` is given); empty if no face was found
+        """
+        output_paths = output_paths or [None] * len(image_paths)
+        
+        # Load and detect per image, leaving DexiNed for the whole batch
+        contexts = []
+        image_timings = []
+        for image_path in image_paths:
+            self.profiler.begin(image_path)
+            with self.profiler.stage('total'):
+                image = self._load_image(image_path)
+                context = (self.build_inference_context(image, image_path, detect_edges=False)
+                           if image is not None else None)
+            contexts.append(context)
+            image_timings.append(self.profiler.finish() if self.profiler.enabled else None)
+        
+        with_faces = [context for context in contexts if context is not None and context.landmarks]
+        self.profiler.begin(f"batch of {len(with_faces)} images")
+        with self.profiler.stage('total'):
+            self.add_edge_maps(with_faces)
+        batch_timings = self.profiler.finish() if self.profiler.enabled else None
+        
+        all_results = []
+        for context, output_path, timings in zip(contexts, output_paths, image_timings):
+            if context is None:
+                all_results.append({})
+                continue
+            
+            self.profiler.begin(context.image_path)
+            results = {}
+            with self.profiler.stage('total'):
+                if not context.landmarks:
+                    self._log("No face detected in image")
+                elif variants:
+                    paths = variant_output_paths(output_path, list(variants)) if output_path else {}
+                    for name, variant_config in variants.items():
+                        self._log(f"\nRendering variant: {name}")
+                        results[name] = self.render_context(context, paths.get(name), variant_config)
+                else:
+                    results = self.render_context(context, output_path)
+            
+            if self.profiler.enabled:
+                timings = merge_timings(timings, self.profiler.finish())
+                if batch_timings and context.landmarks:
+                    timings = merge_timings(timings, batch_timings, 1.0 / len(with_faces))
+                if self.config.profile or self.config.profile_memory:
+                    print(f"\nStage timings for {context.image_path}:")
+                    print(format_timings(timings))
+                for variant_results in (results.values() if variants else [results]):
+                    if variant_results:
+                        variant_results['timings'] = timings
+            all_results.append(results)
+        
+        return all_results
+    
+    def passes_prefilter(self, image_path: str) -> bool:
+        """Whether the face-presence prefilter (if enabled) lets an image through"""
+        if self.face_prefilter is None:
+            return True
+        with self.profiler.stage('prefilter'):
+            has_face = self.face_prefilter.has_face(image_path)
+        if not has_face:
+            self._log(f"No face found by prefilter, skipping: {image_path}")
+        return has_face
     
     def _load_image(self, image_path: str) -> Any:
-        """Load and preprocess image"""
+        """Load and preprocess image (None if the prefilter rejects it)"""
+        if self.prefilter_on_load and not self.passes_prefilter(image_path):
+            return None
+        with self.profiler.stage('load'):
+            return self._read_image(image_path)
+    
+    def _read_image(self, image_path: str) -> Any:
+        """Read an image file as RGB (transparent images composited over white)"""
         if not os.path.exists(image_path):
             print(f"Image not found: {image_path}")
             return None
@@ -1127,23 +2088,53 @@ class WireframePortraitProcessor:
         
         return image_rgb
     
-    def _detect_landmarks(self, image: np.ndarray) -> Tuple[Any, Any]:
-        """Detect face landmarks using MediaPipe"""
+    def detection_proxy(self, image: np.ndarray) -> DetectionProxy:
+        """Bounded-size detector input for ``image``, shared by face and pose detection"""
+        return DetectionProxy(image, self.config.detection_max_side)
+    
+    def _detect_landmarks(self, image: np.ndarray, mp_image: Any = None,
+                          raise_errors: bool = False) -> Tuple[Any, Any]:
+        """
+        Detect face landmarks using MediaPipe (on the detection proxy)
+        
+        Args:
+            image: Input RGB image
+            mp_image: Prepared MediaPipe image of the detection proxy of
+                ``image`` (built here when omitted)
+            raise_errors: Let detector errors propagate instead of reporting
+                them as "no face" (so callers can tell the two apart)
+            
+        Returns:
+            (landmarks, detection result), both None when no face was found
+        """
         if self.detector is None:
             return None, None
         
         try:
-            # Convert to MediaPipe format and run the face landmarker
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
-            detection_result = self.detector.detect(mp_image)
+            # Run the face landmarker on the bounded-size proxy; its normalized
+            # landmarks apply unchanged to the full-resolution image
+            if mp_image is None:
+                mp_image = self.detection_proxy(image).mp_image
+            if self.running_mode == 'video':
+                # Tracks the face from the previous frame instead of re-detecting
+                detection_result = self.detector.detect_for_video(mp_image, self.frame_timestamp_ms)
+            elif self.running_mode == 'live_stream':
+                # Never blocks on the landmarker: use the newest finished result
+                self.detector.detect_async(mp_image, self.frame_timestamp_ms)
+                detection_result = self._latest_face_result
+            else:
+                detection_result = self.detector.detect(mp_image)
             
-            if detection_result.face_landmarks:
-                landmarks = detection_result.face_landmarks[0]
-                return landmarks, detection_result
+            if detection_result is not None and detection_result.face_landmarks:
+                # Convert once; every drawing/export path reads the array
+                landmarks = LandmarkArray.from_landmarks(detection_result.face_landmarks[0])
+                return landmarks, face_result_from_landmarks(landmarks)
             else:
                 return None, None
                 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error in landmark detection: {e}")
             return None, None
     
@@ -1168,21 +2159,59 @@ class WireframePortraitProcessor:
         
         return result
     
-    def _generate_svg(self, image: np.ndarray, landmarks: List, detection_result) -> str:
+    @staticmethod
+    def _darkened_colors(colors: Dict[str, Tuple[int, int, int]]) -> Dict[str, Optional[Tuple[int, int, int]]]:
+        """
+        Colours construction/pose layers are composited with: pure white is
+        treated as background (None) and everything else is darkened
+        """
+        return {
+            name: None if tuple(color) == (255, 255, 255)
+            else tuple(min(int(channel * 0.8), 180) for channel in color)
+            for name, color in colors.items()
+        }
+    
+    def _get_outline(self, context: InferenceContext, config: WireframeConfig) -> np.ndarray:
+        """Threshold the context's edge map into an outline image (memoized)"""
+        key = (config.dexined_threshold, tuple(config.dexined_color))
+        if key not in context.outlines:
+            context.outlines[key] = DexiNedGenerator.colorize_mask(
+                self._get_edge_mask(context, config), config.dexined_color
+            )
+        return context.outlines[key]
+    
+    def _get_edge_mask(self, context: InferenceContext, config: WireframeConfig) -> np.ndarray:
+        """Threshold the context's edge map into a binary mask (memoized by the map)"""
+        return DexiNedGenerator.edge_mask(context.edge_map, context.image.shape, config)
+    
+    def _get_contours(self, context: InferenceContext, config: WireframeConfig) -> List[np.ndarray]:
+        """Extract SVG contours from the context's outline (memoized)"""
+        key = (config.dexined_threshold, tuple(config.dexined_color))
+        if key not in context.contours:
+            # The outline's grey plane, built from the mask without an RGB image
+            gray_value = cv2.cvtColor(np.uint8([[config.dexined_color]]), cv2.COLOR_RGB2GRAY)[0, 0]
+            gray = np.full(context.image.shape[:2], 255, dtype=np.uint8)
+            gray[self._get_edge_mask(context, config) > 0] = gray_value
+            context.contours[key] = self._extract_contours_from_outline(gray)
+        return context.contours[key]
+    
+    def _generate_svg(self, context: InferenceContext, config: WireframeConfig) -> str:
         """
         Generate SVG representation of wireframe elements
         
         Args:
-            image: Original input image
-            landmarks: Face landmarks
-            detection_result: MediaPipe detection result
+            context: Detection results for the image
+            config: Configuration selecting and styling the SVG layers
             
         Returns:
             SVG content as string
         """
-        height, width = image.shape[:2]
+        landmarks = context.landmarks
+        detection_result = context.detection_result
+        height, width = context.image.shape[:2]
         
         # Create SVG generator
+        from svg_generator import SVGGenerator
         svg_generator = SVGGenerator(width, height, "white")
         
         # Add metadata
@@ -1192,63 +2221,54 @@ class WireframePortraitProcessor:
             'resolution': f'{width}x{height}'
         }
         
-        # Convert landmarks to numpy array for SVG processing
-        landmark_coords = []
-        if landmarks:
-            for landmark in landmarks:
-                landmark_coords.append([landmark.x, landmark.y, landmark.z])
-        landmark_array = np.array(landmark_coords)
+        # Normalized landmark coordinates for SVG processing
+        landmark_array = landmarks.normalized() if landmarks else np.zeros((0, 3))
         
         # Add construction lines if enabled
-        if self.config.enable_construction_lines:
+        if config.enable_construction_lines:
             construction_config = {
-                'color': f'rgb{self.config.construction_line_colors["vertical_center"]}',
-                'thickness': self.config.construction_line_thickness
+                'color': f'rgb{config.construction_line_colors["vertical_center"]}',
+                'thickness': config.construction_line_thickness
             }
             svg_generator.add_construction_lines(landmark_array, construction_config)
             metadata['features'].append('construction_lines')
         
         # Add face mesh if enabled
-        if self.config.enable_mesh and detection_result.face_landmarks:
+        if config.enable_mesh and detection_result.face_landmarks:
             # Get MediaPipe face mesh connections
-            mp_face_mesh = mp.solutions.face_mesh
-            connections = list(mp_face_mesh.FACEMESH_TESSELATION)
+            connections = face_mesh_renderer.FACEMESH_TESSELATION.tolist()
             
             mesh_config = {
-                'color': f'rgb{self.config.mesh_colors["tesselation"]}',
-                'thickness': self.config.mesh_thickness
+                'color': f'rgb{config.mesh_colors["tesselation"]}',
+                'thickness': config.mesh_thickness
             }
             svg_generator.add_face_mesh(landmark_array, connections, mesh_config)
             metadata['features'].append('face_mesh')
         
         # Add DexiNed outline if enabled
-        if self.config.enable_dexined_outline and self.dexined_generator:
-            # Generate edge outline and convert to contours
-            outline_image = self.dexined_generator.generate_outline(image, self.config)
-            contours = self._extract_contours_from_outline(outline_image)
+        if config.enable_dexined_outline and context.edge_map is not None:
+            # Reuse the edge map computed for the raster output
+            contours = self._get_contours(context, config)
             
             dexined_config = {
-                'color': f'rgb{self.config.dexined_color}',
-                'thickness': self.config.dexined_line_thickness
+                'color': f'rgb{config.dexined_color}',
+                'thickness': config.dexined_line_thickness
             }
             svg_generator.add_dexined_outline(contours, dexined_config)
             metadata['features'].append('dexined_outline')
         
         # Add pose landmarks if enabled
-        if self.config.enable_pose_landmarks and self.pose_landmarker_generator:
-            pose_landmarks = self.pose_landmarker_generator.detect_pose_landmarks(image, self.config)
+        if config.enable_pose_landmarks and self.pose_landmarker_generator:
+            pose_landmarks = context.pose_landmarks
             if pose_landmarks:
                 # Convert pose landmarks to format compatible with SVG generator
-                pose_landmark_coords = []
-                for landmark in pose_landmarks:
-                    pose_landmark_coords.append([landmark.x, landmark.y, landmark.z])
-                pose_landmark_array = np.array(pose_landmark_coords)
+                pose_landmark_array = pose_landmarks.normalized()
                 
                 pose_config = {
-                    'line_color': f'rgb{self.config.pose_colors["body_connections"]}',
-                    'point_color': f'rgb{self.config.pose_colors["landmark_points"]}',
-                    'line_thickness': self.config.pose_line_thickness,
-                    'point_radius': self.config.pose_point_radius,
+                    'line_color': f'rgb{config.pose_colors["body_connections"]}',
+                    'point_color': f'rgb{config.pose_colors["landmark_points"]}',
+                    'line_thickness': config.pose_line_thickness,
+                    'point_radius': config.pose_point_radius,
                     'connections': self.pose_landmarker_generator.pose_connections,
                     'excluded_landmarks': self.pose_landmarker_generator.excluded_landmarks
                 }
@@ -1308,20 +2328,21 @@ class WireframePortraitProcessor:
     
     def _save_image(self, image: np.ndarray, output_path: str):
         """Save image to file"""
-        output_dir = os.path.dirname(output_path)
-        if output_dir:  # Only create directory if dirname is not empty
-            os.makedirs(output_dir, exist_ok=True)
-        
-        if len(image.shape) == 3 and image.shape[2] == 4:  # RGBA
-            # Convert RGBA to BGRA for OpenCV
-            bgra_image = cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA)
-            success = cv2.imwrite(output_path, bgra_image)
-        else:  # RGB
-            bgr_image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-            success = cv2.imwrite(output_path, bgr_image)
+        with self.profiler.stage('encode_write'):
+            output_dir = os.path.dirname(output_path)
+            if output_dir:  # Only create directory if dirname is not empty
+                os.makedirs(output_dir, exist_ok=True)
+            
+            if len(image.shape) == 3 and image.shape[2] == 4:  # RGBA
+                # Convert RGBA to BGRA for OpenCV
+                bgra_image = cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA)
+                success = cv2.imwrite(output_path, bgra_image)
+            else:  # RGB
+                bgr_image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+                success = cv2.imwrite(output_path, bgr_image)
         
         if success:
-            print(f"Saved wireframe to: {output_path}")
+            self._log(f"Saved wireframe to: {output_path}")
         else:
             print(f"Failed to save wireframe to: {output_path}")
 
@@ -1394,14 +2415,38 @@ def create_preset_configs() -> Dict[str, WireframeConfig]:
     
     return presets
 
-def main():
-    """Command line interface"""
-    parser = argparse.ArgumentParser(description='Wireframe Portrait Processor')
+def merge_feature_configs(configs: List[WireframeConfig]) -> WireframeConfig:
+    """
+    Build a processor configuration covering every feature of several configs
     
-    # Input/Output
-    parser.add_argument('input', help='Input image path')
-    parser.add_argument('-o', '--output', help='Output image path')
+    Used for multi-variant rendering: a processor created from the merged
+    configuration loads each detector that any variant needs, so one
+    detection pass can serve all of them.
     
+    Args:
+        configs: Variant configurations
+        
+    Returns:
+        Copy of the first configuration with feature toggles OR-ed together
+        and model paths taken from whichever variant provides them
+    """
+    merged = replace(configs[0])
+    for config in configs[1:]:
+        merged.enable_construction_lines |= config.enable_construction_lines
+        merged.enable_mesh |= config.enable_mesh
+        merged.enable_dexined_outline |= config.enable_dexined_outline
+        merged.enable_pose_landmarks |= config.enable_pose_landmarks
+        merged.dexined_model_path = merged.dexined_model_path or config.dexined_model_path
+        merged.pose_model_path = merged.pose_model_path or config.pose_model_path
+    return merged
+
+def variant_output_paths(output_path: str, names: List[str]) -> Dict[str, str]:
+    """Derive per-variant output paths: ``out/portrait.png`` → ``out/portrait_<name>.png``"""
+    root, extension = os.path.splitext(output_path)
+    return {name: f"{root}_{name}{extension or '.png'}" for name in names}
+
+def add_wireframe_arguments(parser: argparse.ArgumentParser):
+    """Register the feature, preset and output options shared by the CLIs"""
     # Feature toggles
     parser.add_argument('--construction-lines', action='store_true', 
                        help='Enable construction lines')
@@ -1416,11 +2461,42 @@ def main():
     parser.add_argument('--preset', choices=['beginner', 'intermediate', 'advanced', 
                                            'outline_only', 'mesh_only'],
                        help='Use preset configuration')
+    parser.add_argument('--presets',
+                       help='Comma-separated presets (or "all") rendered from one detection pass; '
+                            'each output gets a _<preset> suffix')
     
     # Advanced options
     parser.add_argument('--dexined-model', 
                        default='../DexiNed/checkpoints/BIPED2CLASSIC/10_model.pth',
                        help='Path to DexiNed model')
+    parser.add_argument('--dexined-backend', choices=['torch', 'onnx'], default='torch',
+                       help='DexiNed inference backend; onnx exports the checkpoint once and '
+                            'runs it with ONNX Runtime (default: torch)')
+    parser.add_argument('--dexined-onnx',
+                       help='Exported DexiNed ONNX model (default: checkpoint path with .onnx)')
+    parser.add_argument('--dexined-mode', choices=['fp32', 'cpu_fast'], default='fp32',
+                       help='PyTorch DexiNed variant; cpu_fast quantizes the conv blocks to INT8 '
+                            'and uses channels_last (default: fp32)')
+    parser.add_argument('--dexined-calibration',
+                       help='Calibration images for --dexined-mode cpu_fast (directory or glob)')
+    parser.add_argument('--dexined-batch-size', type=int, default=4,
+                       help='Images per DexiNed forward pass in batch processing (default: 4)')
+    parser.add_argument('--dexined-roi', action='store_true',
+                       help='Add a near-native DexiNed pass on the face crop to the coarse global pass')
+    parser.add_argument('--dexined-roi-size', type=int, default=512,
+                       help='Largest model input side for ROI crops (default: 512)')
+    parser.add_argument('--dexined-roi-pose', action='store_true',
+                       help='Also run an ROI pass on the pose (body) bounding box')
+    parser.add_argument('--detection-max-side', type=int, default=DEFAULT_MAX_SIDE,
+                       help='Longest side of the downscaled copy landmark detectors run on '
+                            f'(0 = full resolution, default: {DEFAULT_MAX_SIDE})')
+    parser.add_argument('--face-prefilter', action='store_true',
+                       help='Skip images without a face on a quick thumbnail check before '
+                            'running the landmarkers and DexiNed (verdicts cached with --cache-dir)')
+    parser.add_argument('--prefilter-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE,
+                       help=f'Face score an image needs to pass the prefilter (default: {DEFAULT_MIN_CONFIDENCE})')
+    parser.add_argument('--prefilter-size', type=int, default=DEFAULT_THUMBNAIL_SIZE,
+                       help=f'Longest prefilter thumbnail side (default: {DEFAULT_THUMBNAIL_SIZE})')
     parser.add_argument('--pose-model',
                        default='../mediapipe_practice/pose_landmarker.task',
                        help='Path to pose landmarker model')
@@ -1453,8 +2529,43 @@ def main():
     parser.add_argument('--background-opacity', type=int,
                        help='Deprecated: use --background-transparency instead')
 
-    args = parser.parse_args()
+    # Geometry cache
+    parser.add_argument('--cache-dir',
+                       help='Cache face/pose landmarks and DexiNed edge maps in this directory')
+    parser.add_argument('--cache-max-mb', type=int, default=1024,
+                       help='Geometry cache size limit in MB (least recently used entries are evicted)')
+
+    # Instrumentation
+    parser.add_argument('--profile', action='store_true',
+                       help='Print wall/CPU time and peak RSS for each processing stage')
+    parser.add_argument('--profile-memory', action='store_true',
+                       help='Also measure per-stage peak memory with tracemalloc '
+                            '(implies --profile; slows processing down several times)')
+    parser.add_argument('--trace',
+                       help='Append per-stage timings to this JSON-lines file')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Suppress per-stage progress messages')
+
+def variant_configs_from_args(args: argparse.Namespace) -> Dict[str, WireframeConfig]:
+    """Build one configuration per preset named by ``--presets`` (empty if unset)"""
+    if not args.presets:
+        return {}
+    
+    available = list(create_preset_configs().keys())
+    names = available if args.presets == 'all' else [name.strip() for name in args.presets.split(',')]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown presets {unknown}; available: {available}")
     
+    variants = {}
+    for name in names:
+        variant_args = argparse.Namespace(**vars(args))
+        variant_args.preset = name
+        variants[name] = config_from_args(variant_args)
+    return variants
+
+def config_from_args(args: argparse.Namespace) -> WireframeConfig:
+    """Build a WireframeConfig from options registered by add_wireframe_arguments"""
     # Create configuration
     if args.preset:
         presets = create_preset_configs()
@@ -1497,6 +2608,25 @@ def main():
             background_transparency=bg_transparency
         )
     
+    config.geometry_cache_dir = args.cache_dir or ""
+    config.geometry_cache_max_mb = args.cache_max_mb
+    config.profile = args.profile
+    config.profile_memory = args.profile_memory
+    config.trace_path = args.trace or ""
+    config.quiet = args.quiet
+    config.dexined_batch_size = max(1, args.dexined_batch_size)
+    config.dexined_backend = args.dexined_backend
+    config.dexined_onnx_path = args.dexined_onnx or ""
+    config.dexined_mode = args.dexined_mode
+    config.dexined_calibration_images = args.dexined_calibration or ""
+    config.detection_max_side = max(0, args.detection_max_side)
+    config.dexined_roi_mode = args.dexined_roi
+    config.dexined_roi_size = max(16, args.dexined_roi_size // 16 * 16)
+    config.dexined_roi_pose = args.dexined_roi_pose
+    config.face_prefilter = args.face_prefilter
+    config.face_prefilter_confidence = args.prefilter_confidence
+    config.face_prefilter_size = max(64, args.prefilter_size)
+    
     # Set DexiNed model path - use absolute path
     if args.dexined_model.startswith('../'):
         # Convert relative path to absolute
@@ -1512,6 +2642,40 @@ def main():
     else:
         config.pose_model_path = args.pose_model
     
+    return config
+
+def main():
+    """Command line interface"""
+    parser = argparse.ArgumentParser(description='Wireframe Portrait Processor')
+    
+    # Input/Output
+    parser.add_argument('input', help='Input image path')
+    parser.add_argument('-o', '--output', help='Output image path')
+    
+    add_wireframe_arguments(parser)
+
+    args = parser.parse_args()
+    
+    try:
+        variants = variant_configs_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    if variants:
+        # Multi-preset fan-out: detect once, render every preset
+        for variant_config in variants.values():
+            variant_config.svg_output_path = ""
+        processor = WireframePortraitProcessor(merge_feature_configs(list(variants.values())))
+        output_paths = variant_output_paths(args.output, list(variants)) if args.output else None
+        variant_results = processor.process_variants(args.input, variants, output_paths)
+        
+        if variant_results:
+            print(f"Wireframe processing completed for presets: {', '.join(variant_results)}")
+        else:
+            print("Wireframe processing failed!")
+        return
+    
+    config = config_from_args(args)
+    
     # Process image
     processor = WireframePortraitProcessor(config)
     results = processor.process_image(args.input, args.output)
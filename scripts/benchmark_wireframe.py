@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the wireframe pipeline
+==========================================
+
+Times every stage of WireframePortraitProcessor, HighResolutionWireframeProcessor,
+SVGGenerator and run_cutout.predict_mask across presets and resolutions, using
+deterministic synthetic portraits (optionally plus local AIC samples). Reports
+latency percentiles, throughput and peak RSS per case and compares them with a
+stored baseline so regressions show up before deploy.
+
+Examples:
+  # Everything at HD/4K/8K (each case in a fresh process for honest peak RSS)
+  python scripts/benchmark_wireframe.py -o benchmark_results.json
+
+  # Quick check of two presets at HD
+  python scripts/benchmark_wireframe.py --suites wireframe --presets beginner,mesh_only \\
+      --resolutions HD --iterations 10
+
+  # Record a baseline, later compare against it (exit code 1 on regressions)
+  python scripts/benchmark_wireframe.py --save-baseline benchmarks/baseline.json
+  python scripts/benchmark_wireframe.py --baseline benchmarks/baseline.json --fail-on-regression
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+# Add project directories to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / 'image_processing'))
+
+from stage_profiler import StageProfiler, _max_rss_mb
+
+RESOLUTIONS = {
+    'HD': (1920, 1080),
+    '4K': (3840, 2160),
+    '8K': (7680, 4320),
+}
+SUITES = ['wireframe', 'highres', 'svg', 'cutout']
+BASELINE_VERSION = 1
+DEFAULT_AIC_SOURCE = project_root / 'download_data' / 'aic_sample' / 'metadata.jsonl'
+DEFAULT_CUTOUT_MODEL = project_root / 'image_processing' / 'models' / 'BiRefNet-general-epoch_244.onnx'
+
+
+def synthetic_portrait(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """
+    Draw a deterministic head-and-shoulders portrait
+
+    The drawing is simple but has enough facial structure (shaded face, eyes,
+    brows, nose, mouth, hair, neck, shoulders) for MediaPipe to find all face
+    landmarks, so every stage of the pipeline is exercised.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        seed: Seed of the sensor-noise pattern
+
+    Returns:
+        RGB uint8 image
+    """
+    rng = np.random.default_rng(seed)
+    scale = min(width, height) / 1000.0
+    cx, cy = width / 2, height * 0.45
+
+    def px(value: float) -> int:
+        return max(1, int(value * scale))
+
+    # Background gradient
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    image = np.dstack([60 + 40 * yy / height, 80 + 30 * xx / width, 110 + 20 * yy / height])
+
+    # Shoulders, neck and hair
+    cv2.ellipse(image, (int(cx), int(height * 0.98)), (px(380), px(220)), 0, 180, 360, (70, 60, 120), -1)
+    cv2.rectangle(image, (int(cx - 70 * scale), int(cy + 180 * scale)),
+                  (int(cx + 70 * scale), int(height * 0.82)), (170, 130, 110), -1)
+    cv2.ellipse(image, (int(cx), int(cy - 40 * scale)), (px(190), px(240)), 0, 0, 360, (40, 30, 25), -1)
+
+    # Face with radial shading
+    face = np.zeros((height, width), dtype=np.uint8)
+    cv2.ellipse(face, (int(cx), int(cy)), (px(150), px(200)), 0, 0, 360, 255, -1)
+    radius = (xx - cx) ** 2 / (150 * scale) ** 2 + (yy - cy) ** 2 / (200 * scale) ** 2
+    shade = 1.0 - 0.35 * np.clip(radius, 0, 1)
+    inside = face > 0
+    image[inside] = np.dstack([215 * shade, 170 * shade, 140 * shade])[inside]
+
+    # Eyes and brows
+    for dx in (-60, 60):
+        ex, ey = int(cx + dx * scale), int(cy - 30 * scale)
+        cv2.ellipse(image, (ex, ey), (px(32), px(15)), 0, 0, 360, (245, 245, 245), -1)
+        cv2.circle(image, (ex, ey), px(12), (70, 50, 30), -1)
+        cv2.circle(image, (ex, ey), px(5), (10, 10, 10), -1)
+        cv2.ellipse(image, (ex, int(ey - 30 * scale)), (px(40), px(8)), 0, 180, 360, (60, 40, 30), px(5))
+
+    # Nose and mouth
+    nose = np.array([[cx, cy - 10 * scale], [cx - 18 * scale, cy + 55 * scale],
+                     [cx + 18 * scale, cy + 55 * scale]], dtype=np.int32)
+    cv2.polylines(image, [nose], False, (160, 110, 90), px(4))
+    cv2.ellipse(image, (int(cx), int(cy + 105 * scale)), (px(45), px(14)), 0, 0, 180, (150, 60, 60), px(8))
+
+    image += rng.normal(0, 4, image.shape).astype(np.float32)
+    image = cv2.GaussianBlur(image, (0, 0), 1.2 * scale + 0.5)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def write_synthetic_portrait(work_dir: str, resolution: str) -> str:
+    """Write the synthetic portrait for a resolution as PNG (reused if present)"""
+    path = os.path.join(work_dir, f"synthetic_{resolution}.png")
+    if not os.path.exists(path):
+        width, height = RESOLUTIONS[resolution]
+        cv2.imwrite(path, cv2.cvtColor(synthetic_portrait(width, height), cv2.COLOR_RGB2BGR))
+    return path
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """Summary statistics of a list of millisecond samples"""
+    values = np.asarray(samples, dtype=np.float64)
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    return {
+        'n': int(values.size),
+        'mean': float(values.mean()),
+        'min': float(values.min()),
+        'p50': float(p50),
+        'p90': float(p90),
+        'p95': float(p95),
+        'p99': float(p99),
+        'max': float(values.max()),
+    }
+
+
+class CaseRecorder:
+    """Collects per-stage millisecond samples over the iterations of one case"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def add(self, timings: Dict[str, Dict[str, float]]):
+        """Add one iteration's timing dictionary (as returned by StageProfiler)"""
+        for stage, entry in timings.items():
+            self.samples.setdefault(stage, []).append(entry['wall_ms'])
+
+
+def _quiet_call(function, *args, **kwargs):
+    """Call ``function`` with its progress output swallowed"""
+    with redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+def _measure(recorder: CaseRecorder, profiler: StageProfiler, label: str,
+             function, iterations: int, warmup: int):
+    """Run ``function`` warmup + iterations times, recording profiled iterations"""
+    for iteration in range(warmup + iterations):
+        profiler.begin(label)
+        with profiler.stage('total'):
+            _quiet_call(function)
+        timings = profiler.finish()
+        if iteration >= warmup:
+            recorder.add(timings)
+
+
+def bench_wireframe(spec: dict, recorder: CaseRecorder):
+    """Time WireframePortraitProcessor.process_image for one preset"""
+    from dataclasses import replace
+    from wireframe_portrait_processor import WireframePortraitProcessor, create_preset_configs
+
+    config = replace(create_preset_configs()[spec['preset']], quiet=True)
+    config.dexined_model_path = spec['dexined_model']
+    processor = _quiet_call(WireframePortraitProcessor, config)
+    profiler = StageProfiler(enabled=True)
+    processor.attach_profiler(profiler)
+
+    images = spec['images']
+    output_path = os.path.join(spec['work_dir'], f"{spec['case_id'].replace('/', '_')}.png")
+    for iteration in range(spec['warmup'] + spec['iterations']):
+        image_path = images[iteration % len(images)]
+        results = _quiet_call(processor.process_image, image_path, output_path)
+        if not results:
+            raise RuntimeError(f"No face detected in {image_path}")
+        if iteration >= spec['warmup']:
+            recorder.add(results['timings'])
+
+
+def bench_highres(spec: dict, recorder: CaseRecorder):
+    """Time HighResolutionWireframeProcessor.process_image for one preset"""
+    from high_resolution_wireframe_processor import (
+        HighResolutionWireframeProcessor, create_high_resolution_presets
+    )
+
+    config = create_high_resolution_presets()[f"{spec['preset']}_{spec['resolution']}"]
+    config.quiet = True
+    config.dexined_model_path = spec['dexined_model']
+    processor = _quiet_call(HighResolutionWireframeProcessor, config)
+    profiler = StageProfiler(enabled=True)
+    processor.attach_profiler(profiler)
+
+    # The high-resolution processor upscales its input to the target size
+    image_path = spec['images'][0]
+    output_path = os.path.join(spec['work_dir'], f"{spec['case_id'].replace('/', '_')}.png")
+    _measure(recorder, profiler, image_path,
+             lambda: processor.process_image(image_path, output_path),
+             spec['iterations'], spec['warmup'])
+
+
+def bench_svg(spec: dict, recorder: CaseRecorder):
+    """Time each SVGGenerator layer and serialization on detected geometry"""
+    from wireframe_portrait_processor import WireframePortraitProcessor, create_preset_configs
+    from svg_generator import SVGGenerator
+    import face_mesh_renderer
+
+    config = create_preset_configs()['beginner']
+    config.quiet = True
+    config.dexined_model_path = spec['dexined_model']
+    processor = _quiet_call(WireframePortraitProcessor, config)
+    image_path = spec['images'][0]
+    image = processor._load_image(image_path)
+    context = _quiet_call(processor.build_inference_context, image, image_path)
+    if not context.landmarks:
+        raise RuntimeError(f"No face detected in {image_path}")
+
+    height, width = image.shape[:2]
+    landmarks = context.landmarks.normalized()
+    connections = face_mesh_renderer.FACEMESH_TESSELATION.tolist()
+    profiler = StageProfiler(enabled=True)
+
+    def build_svg():
+        svg = SVGGenerator(width, height, "white")
+        with profiler.stage('svg_construction_lines'):
+            svg.add_construction_lines(landmarks, {'thickness': config.construction_line_thickness})
+        with profiler.stage('svg_face_mesh'):
+            svg.add_face_mesh(landmarks, connections, {'thickness': config.mesh_thickness})
+        if context.edge_map is not None:
+            with profiler.stage('svg_contours'):
+                # Fresh context cache each time so contour extraction is timed
+                context.contours.clear()
+                contours = processor._get_contours(context, config)
+            with profiler.stage('svg_dexined_outline'):
+                svg.add_dexined_outline(contours, {'thickness': config.dexined_line_thickness})
+        if context.pose_landmarks:
+            with profiler.stage('svg_pose_landmarks'):
+                svg.add_pose_landmarks(context.pose_landmarks.normalized(), {
+                    'connections': processor.pose_landmarker_generator.pose_connections,
+                    'excluded_landmarks': processor.pose_landmarker_generator.excluded_landmarks,
+                })
+        with profiler.stage('svg_serialize'):
+            svg.to_string(pretty=True)
+
+    _measure(recorder, profiler, image_path, build_svg, spec['iterations'], spec['warmup'])
+
+
+def bench_cutout(spec: dict, recorder: CaseRecorder):
+    """Time run_cutout.predict_mask (BiRefNet) on one image"""
+    import run_cutout
+
+    session = _quiet_call(run_cutout.make_session, spec['cutout_model'])
+    image = cv2.cvtColor(cv2.imread(spec['images'][0]), cv2.COLOR_BGR2RGB)
+    profiler = StageProfiler(enabled=True)
+
+    def predict():
+        with profiler.stage('to_float'):
+            image_float = image.astype(np.float32) / 255.0
+        with profiler.stage('predict_mask'):
+            run_cutout.predict_mask(session, image_float, spec['cutout_size'])
+
+    _measure(recorder, profiler, spec['images'][0], predict, spec['iterations'], spec['warmup'])
+
+
+BENCHMARKS = {
+    'wireframe': bench_wireframe,
+    'highres': bench_highres,
+    'svg': bench_svg,
+    'cutout': bench_cutout,
+}
+
+
+def run_case(spec: dict) -> dict:
+    """
+    Run one benchmark case
+
+    Args:
+        spec: Case description built by :func:`build_cases`
+
+    Returns:
+        Case result with per-stage latency statistics, throughput and peak RSS
+        (or an ``error`` entry if the case could not run)
+    """
+    recorder = CaseRecorder()
+    cv2.setNumThreads(spec['threads'])
+    start = time.perf_counter()
+    try:
+        BENCHMARKS[spec['suite']](spec, recorder)
+    except Exception as e:
+        return {**_case_header(spec), 'error': f"{type(e).__name__}: {e}"}
+    elapsed = time.perf_counter() - start
+
+    stages = {stage: latency_stats(samples) for stage, samples in recorder.samples.items()}
+    total = stages.get('total')
+    return {
+        **_case_header(spec),
+        'stages': stages,
+        'throughput_ips': 1000.0 / total['mean'] if total and total['mean'] > 0 else 0.0,
+        'peak_rss_mb': _max_rss_mb(),
+        'elapsed_s': elapsed,
+    }
+
+
+def _case_header(spec: dict) -> dict:
+    """Fields identifying a case in the results file"""
+    return {key: spec[key] for key in ('suite', 'preset', 'resolution', 'source', 'iterations')}
+
+
+def build_cases(args: argparse.Namespace, work_dir: str) -> List[dict]:
+    """Expand the command line into the list of benchmark cases"""
+    from wireframe_portrait_processor import create_preset_configs
+
+    suites = SUITES if args.suites == 'all' else [s.strip() for s in args.suites.split(',')]
+    presets = (list(create_preset_configs()) if args.presets == 'all'
+               else [p.strip() for p in args.presets.split(',')])
+    resolutions = [r.strip() for r in args.resolutions.split(',')]
+    for name, allowed, values in (('suite', SUITES, suites),
+                                  ('preset', list(create_preset_configs()), presets),
+                                  ('resolution', list(RESOLUTIONS), resolutions)):
+        unknown = [value for value in values if value not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown {name}s {unknown}; available: {allowed}")
+
+    common = {
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+        'threads': args.threads,
+        'work_dir': work_dir,
+        'dexined_model': os.path.abspath(args.dexined_model),
+        'cutout_model': os.path.abspath(args.cutout_model),
+        'cutout_size': args.cutout_size,
+    }
+
+    cases = []
+
+    def add(suite: str, preset: str, resolution: str, source: str, images: List[str]):
+        case_id = '/'.join(part for part in (suite, preset, resolution, source) if part)
+        cases.append({**common, 'case_id': case_id, 'suite': suite, 'preset': preset,
+                      'resolution': resolution, 'source': source, 'images': images})
+
+    for resolution in resolutions:
+        synthetic = [write_synthetic_portrait(work_dir, resolution)]
+        hd_synthetic = [write_synthetic_portrait(work_dir, 'HD')]
+        for suite in suites:
+            if suite in ('wireframe', 'highres'):
+                for preset in presets:
+                    # The high-resolution processor upscales an HD source
+                    add(suite, preset, resolution, 'synthetic',
+                        hd_synthetic if suite == 'highres' else synthetic)
+            else:
+                add(suite, '', resolution, 'synthetic', synthetic)
+
+    if args.aic_samples and 'wireframe' in suites:
+        from batch_wireframe_processor import collect_input_images
+        aic_images = sorted(collect_input_images(str(args.aic_source)))[:args.aic_samples]
+        if aic_images:
+            for preset in presets:
+                add('wireframe', preset, 'native', 'aic', aic_images)
+        else:
+            print(f"Warning: no AIC samples found at {args.aic_source}")
+
+    return cases
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float,
+                          min_delta_ms: float, rss_tolerance: float) -> List[str]:
+    """
+    Compare p50 stage latencies and peak RSS with a baseline
+
+    Returns:
+        Human-readable regression descriptions (empty when none)
+    """
+    regressions = []
+    for case_id, case in results['cases'].items():
+        base_case = baseline.get('cases', {}).get(case_id)
+        if not base_case or 'stages' not in case or 'stages' not in base_case:
+            continue
+        for stage, stats in case['stages'].items():
+            base_stats = base_case['stages'].get(stage)
+            if not base_stats:
+                continue
+            delta = stats['p50'] - base_stats['p50']
+            if delta > min_delta_ms and stats['p50'] > base_stats['p50'] * (1 + tolerance):
+                regressions.append(
+                    f"{case_id} {stage}: p50 {base_stats['p50']:.1f}ms -> {stats['p50']:.1f}ms "
+                    f"(+{100 * delta / base_stats['p50']:.0f}%)"
+                )
+        rss, base_rss = case.get('peak_rss_mb'), base_case.get('peak_rss_mb')
+        if rss and base_rss and rss > base_rss * (1 + rss_tolerance):
+            regressions.append(f"{case_id} peak RSS: {base_rss:.0f}MB -> {rss:.0f}MB")
+    return regressions
+
+
+def print_report(results: dict, show_stages: bool):
+    """Print a per-case summary table"""
+    print("\n" + "=" * 96)
+    print("Benchmark results (latency in ms)")
+    print("=" * 96)
+    header = f"{'Case':<40} {'p50':>9} {'p90':>9} {'p99':>9} {'img/s':>8} {'RSS MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for case_id, case in results['cases'].items():
+        if 'error' in case:
+            print(f"{case_id:<40} skipped: {case['error']}")
+            continue
+        total = case['stages']['total']
+        rss = case['peak_rss_mb']
+        print(f"{case_id:<40} {total['p50']:>9.1f} {total['p90']:>9.1f} {total['p99']:>9.1f} "
+              f"{case['throughput_ips']:>8.2f} {rss if rss is not None else float('nan'):>8.0f}")
+        if show_stages:
+            for stage, stats in case['stages'].items():
+                if stage != 'total':
+                    print(f"  {stage:<38} {stats['p50']:>9.1f} {stats['p90']:>9.1f} {stats['p99']:>9.1f}")
+
+
+def environment_info() -> dict:
+    """Versions and hardware the numbers were measured on"""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+    }
+    try:
+        import mediapipe
+        info['mediapipe'] = mediapipe.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def main():
+    """Command line interface"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark the wireframe pipeline across presets and resolutions',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('Examples:')[1]
+    )
+    parser.add_argument('--suites', default='all',
+                       help=f'Comma-separated suites or "all" ({", ".join(SUITES)})')
+    parser.add_argument('--presets', default='all',
+                       help='Comma-separated wireframe presets or "all"')
+    parser.add_argument('--resolutions', default='HD,4K,8K',
+                       help=f'Comma-separated resolutions ({", ".join(RESOLUTIONS)})')
+    parser.add_argument('--iterations', type=int, default=5,
+                       help='Measured iterations per case')
+    parser.add_argument('--warmup', type=int, default=1,
+                       help='Unmeasured warm-up iterations per case')
+    parser.add_argument('--threads', type=int, default=0,
+                       help='OpenCV threads (0 = OpenCV default)')
+    parser.add_argument('--in-process', action='store_true',
+                       help='Run all cases in this process (faster, but peak RSS is cumulative)')
+    parser.add_argument('--aic-samples', type=int, default=0,
+                       help='Also run the wireframe suite on this many local AIC images')
+    parser.add_argument('--aic-source', default=str(DEFAULT_AIC_SOURCE),
+                       help='AIC image directory or manifest')
+    parser.add_argument('--dexined-model',
+                       default=str(project_root / 'DexiNed/checkpoints/BIPED2CLASSIC/10_model.pth'),
+                       help='Path to DexiNed model')
+    parser.add_argument('--cutout-model', default=str(DEFAULT_CUTOUT_MODEL),
+                       help='BiRefNet ONNX model for the cutout suite')
+    parser.add_argument('--cutout-size', type=int, default=1024,
+                       help='BiRefNet input size')
+    parser.add_argument('--work-dir', help='Directory for synthetic inputs and outputs (default: temporary)')
+    parser.add_argument('--stages', action='store_true',
+                       help='Show the per-stage breakdown of every case')
+    parser.add_argument('-o', '--output', help='Write results as JSON')
+    parser.add_argument('--save-baseline', help='Write results as the new baseline file')
+    parser.add_argument('--baseline', help='Compare against this baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                       help='Allowed relative p50 slowdown before a stage counts as regressed')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                       help='Ignore slowdowns smaller than this many milliseconds')
+    parser.add_argument('--rss-tolerance', type=float, default=0.10,
+                       help='Allowed relative peak RSS growth')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                       help='Exit with status 1 when a regression is found')
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='wireframe_bench_')
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        cases = build_cases(args, work_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Running {len(cases)} benchmark cases ({args.warmup} warm-up + "
+          f"{args.iterations} measured iterations each)")
+
+    results = {
+        'version': BASELINE_VERSION,
+        'created': datetime.now().isoformat(),
+        'environment': environment_info(),
+        'settings': {key: getattr(args, key) for key in
+                     ('iterations', 'warmup', 'threads', 'in_process', 'cutout_size')},
+        'cases': {},
+    }
+
+    if args.in_process:
+        for spec in cases:
+            print(f"  {spec['case_id']}...", flush=True)
+            results['cases'][spec['case_id']] = run_case(spec)
+    else:
+        # A fresh process per case so peak RSS belongs to that case alone
+        context = multiprocessing.get_context('spawn')
+        for spec in cases:
+            print(f"  {spec['case_id']}...", flush=True)
+            with context.Pool(1) as pool:
+                results['cases'][spec['case_id']] = pool.apply(run_case, (spec,))
+
+    print_report(results, args.stages)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            output_dir = os.path.dirname(path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"\nSaved results to: {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance,
+                                            args.min_delta_ms, args.rss_tolerance)
+        print(f"\nCompared with baseline {args.baseline} "
+              f"(created {baseline.get('created', 'unknown')})")
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s):")
+            for regression in regressions:
+                print(f"  - {regression}")
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print("✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ and validates the output for various user scenarios.
 
 import os
 import sys
+import tempfile
 import cv2
 import numpy as np
 from pathlib import Path
@@ -18,8 +19,15 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root / 'image_processing'))
 
 from wireframe_portrait_processor import (
-    WireframePortraitProcessor, WireframeConfig, create_preset_configs
+    WireframePortraitProcessor, WireframeConfig, create_preset_configs,
+    merge_feature_configs
 )
+from geometry_cache import FACE_LANDMARKS, GeometryCache
+from edge_probability import EdgeMapMemo, EdgeProbabilityMap
+from staged_pipeline import Stage, StagedPipeline
+from landmark_array import LandmarkArray
+from landmark_tracker import LandmarkTracker
+from png_stream import StreamingPNGWriter
 
 def test_basic_functionality():
     """Test basic wireframe functionality"""
@@ -258,6 +266,256 @@ def test_error_handling():
     print("✅ Error handling tests completed")
     return True
 
+def test_geometry_cache():
+    """Round-trip landmarks through the on-disk cache and check eviction"""
+    print("\n💾 Testing Geometry Cache")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(3)
+    image = rng.integers(0, 256, (32, 32, 3), dtype=np.uint8)
+    landmarks = rng.random((478, 3)).astype(np.float32)
+    passed = True
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = GeometryCache(tmp_dir, max_size_mb=1)
+        key = cache.image_key(image)
+        cache.put(key, FACE_LANDMARKS, "model-a", landmarks)
+        cached = cache.get(key, FACE_LANDMARKS, "model-a")
+        if cached is None or not np.array_equal(cached, landmarks):
+            print("  ❌ Cached landmarks differ from the stored ones")
+            passed = False
+        elif cache.get(key, FACE_LANDMARKS, "model-b") is not None:
+            print("  ❌ A different model identity hit the cache")
+            passed = False
+        else:
+            print("  ✅ Landmarks round-trip exactly and are keyed by model")
+        
+        # ~2.4MB of entries against a 1MB limit
+        for index in range(12):
+            cache.put(f"filler{index}", FACE_LANDMARKS, "model-a",
+                      rng.random((256, 256), dtype=np.float32))
+        if cache.size_bytes > cache.max_bytes:
+            print(f"  ❌ Cache grew to {cache.size_bytes} bytes over a {cache.max_bytes} byte limit")
+            passed = False
+        elif cache.get("filler11", FACE_LANDMARKS, "model-a") is None:
+            print("  ❌ Eviction removed the newest entry")
+            passed = False
+        elif cache.get("filler0", FACE_LANDMARKS, "model-a") is not None:
+            print("  ❌ Eviction kept the oldest entry")
+            passed = False
+        else:
+            print(f"  ✅ Eviction kept the cache at {cache.size_bytes / 1024:.0f}KB")
+        
+        # A reopened cache sees the entries that survived
+        if GeometryCache(tmp_dir, max_size_mb=1).size_bytes != cache.size_bytes:
+            print("  ❌ Reopened cache disagrees about its size on disk")
+            passed = False
+    return passed
+
+def test_png_stream():
+    """Round-trip band-by-band PNGs through OpenCV and check aborted writes"""
+    print("\n🧱 Testing Streaming PNG Writer")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(0)
+    # Uneven band heights, including an empty band; the noise does not
+    # compress, so the image spans several IDAT chunks
+    band_heights = [1, 7, 0, 130, 64, 398]
+    height, width = sum(band_heights), 700
+    passed = True
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for channels in (3, 4):
+            image = rng.integers(0, 256, (height, width, channels), dtype=np.uint8)
+            path = os.path.join(tmp_dir, f"stream_{channels}.png")
+            with StreamingPNGWriter(path, width, height, channels=channels) as writer:
+                row = 0
+                for band_height in band_heights:
+                    writer.write_rows(image[row:row + band_height])
+                    row += band_height
+            
+            decoded = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            code = cv2.COLOR_BGR2RGB if channels == 3 else cv2.COLOR_BGRA2RGBA
+            if decoded is not None and np.array_equal(cv2.cvtColor(decoded, code), image):
+                print(f"  ✅ {channels}-channel PNG matches after decoding")
+            else:
+                print(f"  ❌ {channels}-channel PNG differs after decoding")
+                passed = False
+        
+        # Closing early must fail and leave neither the PNG nor its temp file
+        path = os.path.join(tmp_dir, "partial.png")
+        writer = StreamingPNGWriter(path, width, height, channels=4)
+        writer.write_rows(np.zeros((10, width, 4), dtype=np.uint8))
+        try:
+            writer.close()
+            print("  ❌ Closing an incomplete PNG did not raise")
+            passed = False
+        except ValueError:
+            leftovers = os.listdir(tmp_dir)
+            if any(name.startswith("partial.png") for name in leftovers):
+                print(f"  ❌ Incomplete PNG left files behind: {leftovers}")
+                passed = False
+            else:
+                print("  ✅ Incomplete PNG raised and left no file behind")
+    
+    return passed
+
+def test_tiled_high_resolution():
+    """Compare tiled and untiled high-resolution rendering of one portrait"""
+    print("\n🧩 Testing Tiled High-Resolution Output")
+    print("=" * 50)
+    
+    from benchmark_wireframe import synthetic_portrait
+    from high_resolution_wireframe_processor import (
+        HighResolutionWireframeProcessor, create_high_resolution_presets
+    )
+    
+    passed = True
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Deterministic portrait, fitted onto a canvas past the 4096px
+        # threshold above which process_image tiles
+        image_path = os.path.join(tmp_dir, "portrait.png")
+        cv2.imwrite(image_path, cv2.cvtColor(synthetic_portrait(600, 750), cv2.COLOR_RGB2BGR))
+        
+        for output_format in ('rgba', 'rgb'):
+            outputs = {}
+            for tiled in (False, True):
+                config = create_high_resolution_presets()['intermediate_4K']
+                config.output_format = output_format
+                config.target_resolution = (4400, 3520)
+                config.tile_processing = tiled
+                config.tile_size, config.tile_overlap = (1536, 1536), 128
+                config.quiet = True
+                output_path = os.path.join(tmp_dir, f"{output_format}_{tiled}.png")
+                HighResolutionWireframeProcessor(config).process_image(image_path, output_path)
+                outputs[tiled] = cv2.imread(output_path, cv2.IMREAD_UNCHANGED)
+            
+            if outputs[False] is None or outputs[True] is None:
+                print(f"  ❌ {output_format}: no output (face not detected?)")
+                passed = False
+                continue
+            if outputs[False].shape != outputs[True].shape:
+                print(f"  ❌ {output_format}: tiled canvas {outputs[True].shape} "
+                      f"differs from untiled {outputs[False].shape}")
+                passed = False
+                continue
+            difference = np.abs(outputs[True].astype(np.int16) - outputs[False].astype(np.int16))
+            # Tiles cross-fade their overlaps, so only stray edge pixels may differ
+            changed = (difference > 8).mean()
+            if difference.mean() < 0.5 and changed < 0.001:
+                print(f"  ✅ {output_format}: tiled matches untiled "
+                      f"(mean diff {difference.mean():.3f}, {changed:.4%} pixels changed)")
+            else:
+                print(f"  ❌ {output_format}: tiled differs from untiled "
+                      f"(mean diff {difference.mean():.3f}, {changed:.4%} pixels changed)")
+                passed = False
+    return passed
+
+def test_edge_probability_maps():
+    """Check edge map thresholding and the memo's memory/disk round trip"""
+    print("\n🗺️  Testing Edge Probability Maps")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(2)
+    raw = rng.random((64, 48), dtype=np.float32)
+    edge_map = EdgeProbabilityMap(raw)
+    passed = True
+    
+    expected = (raw.astype(np.float16).astype(np.float32) > 0.5).astype(np.uint8) * 255
+    if edge_map.data.dtype == np.float16 and np.array_equal(edge_map.mask((48, 64), 0.5), expected):
+        print("  ✅ float16 map thresholds like the raw model output")
+    else:
+        print("  ❌ Edge mask differs from the thresholded map")
+        passed = False
+    
+    # In-memory LRU only: the oldest map is evicted once the memo is full
+    memo = EdgeMapMemo(max_entries=2)
+    for index in range(3):
+        memo.put(f"image{index}", "model", EdgeProbabilityMap(raw + index))
+    hits = [memo.get(f"image{index}", "model") is not None for index in range(3)]
+    if len(memo) != 2 or hits != [False, True, True]:
+        print(f"  ❌ In-memory LRU holds {len(memo)} maps, hits {hits}")
+        passed = False
+    else:
+        print("  ✅ LRU evicted the oldest map")
+    
+    # With a disk cache attached, a forgotten map comes back unchanged
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memo = EdgeMapMemo(max_entries=2, cache=GeometryCache(tmp_dir))
+        memo.put("image0", "model", edge_map)
+        memo.clear()
+        restored = memo.get("image0", "model")
+        if len(memo) != 1 or restored is None or not np.array_equal(restored.data, edge_map.data):
+            print("  ❌ Edge map did not survive the on-disk cache")
+            passed = False
+        else:
+            print("  ✅ The disk cache restored a forgotten map unchanged")
+    return passed
+
+def test_staged_pipeline():
+    """Push items through threaded, batched and failing stages"""
+    print("\n🏭 Testing Staged Pipeline")
+    print("=" * 50)
+    
+    def check(value):
+        # Item 7 arrives as 7 * 7 + 1
+        if value == 50:
+            raise RuntimeError("bad item")
+        return value
+    
+    pipeline = StagedPipeline([
+        Stage('square', lambda: lambda value: value * value, workers=2),
+        Stage('offset', lambda: lambda values: [value + 1 for value in values],
+              batched=True, batch_size=4),
+        Stage('check', lambda: check),
+    ], queue_size=2)
+    outputs = list(pipeline.run(range(20)))
+    
+    values = sorted(item for item, error in outputs if error is None)
+    errors = [item for item, error in outputs if error is not None]
+    expected = sorted(value * value + 1 for value in range(20) if value != 7)
+    if values != expected or errors != [50]:
+        print(f"  ❌ Unexpected pipeline output: {values}, errors {errors}")
+        return False
+    if [pipeline.stats[name].items for name in ('square', 'offset', 'check')] != [20, 20, 20]:
+        print(f"  ❌ Unexpected stage counts: {pipeline.stats}")
+        return False
+    print("  ✅ Every item came out once; the failing item carried its error")
+    return True
+
+def test_landmark_tracker():
+    """Track synthetic landmarks across a known image shift"""
+    print("\n🎯 Testing Landmark Tracker")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(1)
+    texture = cv2.GaussianBlur(rng.integers(0, 256, (360, 480), dtype=np.uint8), (0, 0), 2.0)
+    shift = np.array([3.0, 2.0])
+    moved = cv2.warpAffine(texture, np.float32([[1, 0, shift[0]], [0, 1, shift[1]]]),
+                           (texture.shape[1], texture.shape[0]), borderMode=cv2.BORDER_REFLECT)
+    
+    xs, ys = np.meshgrid(np.linspace(0.2, 0.8, 12), np.linspace(0.2, 0.8, 10))
+    coords = np.stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)], axis=1)
+    tracker = LandmarkTracker(keyframe_interval=5, max_points=48)
+    tracker.reset(texture, {'face': LandmarkArray(coords)})
+    tracked = tracker.track(moved)
+    if tracked is None:
+        print("  ❌ Tracking was lost on a pure translation")
+        return False
+    
+    scale = np.array([texture.shape[1], texture.shape[0]])
+    error = np.abs((tracked['face'].coords[:, :2] - coords[:, :2]) * scale - shift).max()
+    if error > 0.5:
+        print(f"  ❌ Tracked landmarks off by up to {error:.2f}px")
+        return False
+    print(f"  ✅ All {len(coords)} landmarks followed the shift (max error {error:.2f}px)")
+    
+    if tracker.track(rng.integers(0, 256, texture.shape, dtype=np.uint8)) is not None:
+        print("  ❌ Tracking did not report loss on an unrelated frame")
+        return False
+    print("  ✅ Tracking loss detected on an unrelated frame")
+    return True
+
 def create_demo_outputs():
     """Create demo outputs showing different user scenarios"""
     print("\n🎭 Creating Demo Outputs")
@@ -316,21 +574,22 @@ def create_demo_outputs():
         )
     }
     
-    for scenario_name, config in scenarios.items():
+    # Render every scenario from one detection pass
+    processor = WireframePortraitProcessor(merge_feature_configs(list(scenarios.values())))
+    output_paths = {name: str(demo_dir / f"{name}.png") for name in scenarios}
+    
+    try:
+        variant_results = processor.process_variants(test_image, scenarios, output_paths)
+    except Exception as e:
+        print(f"  ❌ Error: {e}")
+        variant_results = {}
+    
+    for scenario_name in scenarios:
         print(f"Creating demo: {scenario_name}")
-        
-        try:
-            processor = WireframePortraitProcessor(config)
-            output_path = demo_dir / f"{scenario_name}.png"
-            results = processor.process_image(test_image, str(output_path))
-            
-            if results:
-                print(f"  ✅ Created: {output_path}")
-            else:
-                print(f"  ❌ Failed to create demo")
-                
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
+        if variant_results.get(scenario_name):
+            print(f"  ✅ Created: {output_paths[scenario_name]}")
+        else:
+            print(f"  ❌ Failed to create demo")
     
     # Create README for demo
     readme_content = """# Wireframe Portrait Demo
@@ -401,6 +660,20 @@ def main():
         print(f"❌ Error handling test failed: {e}")
         all_passed = False
     
+    # Self-contained checks of the supporting modules (synthetic data)
+    for name, test in (("Geometry cache", test_geometry_cache),
+                       ("Streaming PNG", test_png_stream),
+                       ("Tiled high-resolution", test_tiled_high_resolution),
+                       ("Edge probability map", test_edge_probability_maps),
+                       ("Staged pipeline", test_staged_pipeline),
+                       ("Landmark tracker", test_landmark_tracker)):
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"❌ {name} test failed: {e}")
+            all_passed = False
+    
     try:
         if not create_demo_outputs():
             all_passed = False